@@ -0,0 +1,233 @@
+"""
+Benchmark headless de la chaîne capture -> inférence -> dessin -> affichage.
+
+    python benchmarks/bench_pipeline.py --frames 300 --out bench.json
+    python benchmarks/bench_pipeline.py --weights myapp/resources/handdet.pt --imgsz 320,640
+    python benchmarks/bench_pipeline.py --out new.json --compare bench.json
+    python benchmarks/bench_pipeline.py --source clip.myraw     # replay brut, sans décodage
+
+Sans --weights, l'inférence passe par un processor factice basé sur ExampleEngine
+(letterbox à imgsz + détections synthétiques) : tourne sans modèle ni GPU.
+Résultats : latences p50/p95/p99 par étage (ms), FPS soutenu et pic RSS, en JSON.
+Chaque configuration tourne dans un process neuf : le pic RSS (ru_maxrss, maximum sur la vie du
+process) est ainsi propre à la configuration et comparable d'une ligne à l'autre.
+"""
+from __future__ import annotations
+import argparse, json, multiprocessing, os, platform, resource, subprocess, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from myapp.engines.Example import ExampleEngine
+from myapp.engines.detections import Detections
+from myapp.engines.overlay import OverlayRenderer
+from myapp.processing.base import VideoProcessor
+from myapp.video.sources import SyntheticSource, open_source, source_config
+
+STAGES = ("capture", "infer", "draw", "display")
+
+
+class StubHandProcessor(VideoProcessor):
+    """Processor sans poids : ExampleEngine + letterbox à imgsz + 2 mains synthétiques (21 keypoints)."""
+    def __init__(self, *args, imgsz: int = 640, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.engine = ExampleEngine()
+        self.imgsz = int(imgsz)
+        self.renderer = OverlayRenderer()
+
+    def analyze(self, frame):
+        h, w = frame.shape[:2]
+        r = self.imgsz / max(h, w)
+        blob = cv2.resize(frame, (int(w * r), int(h * r)))
+        self.engine.infer(blob)
+        boxes = np.array([[w * .2, h * .3, w * .4, h * .7], [w * .6, h * .3, w * .8, h * .7]], np.float32)
+        kx = boxes[:, :1] + (boxes[:, 2:3] - boxes[:, :1]) * np.linspace(0, 1, 21, dtype=np.float32)
+        ky = boxes[:, 1:2] + (boxes[:, 3:4] - boxes[:, 1:2]) * np.linspace(1, 0, 21, dtype=np.float32)
+        kpts = np.stack([kx, ky, np.ones_like(kx)], axis=-1)
+        return Detections(boxes, np.array([.9, .8], np.float32), np.zeros(2, np.int32), kpts)
+
+    def render(self, frame, results):
+        return self.renderer.draw(frame, results)
+
+    def process_frame(self, frame):
+        return self.render(frame, self.analyze(frame))
+
+
+def _display_fn(size: tuple[int, int]):
+    """Chemin d'affichage de VideoView (réduction + QImage sans copie) si PySide6 est installé, sinon None."""
+    try:
+        from myapp.ui.video_view import fit_frame, to_qimage
+    except Exception:
+        return None
+    state = {"buf": None}
+
+    def display(frame):
+        out = fit_frame(frame, size[0], size[1], state["buf"])
+        if out is not frame:
+            state["buf"] = out
+        return to_qimage(np.ascontiguousarray(out))
+    return display
+
+
+def _percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {}
+    a = np.asarray(samples) * 1000.0
+    p50, p95, p99 = np.percentile(a, [50, 95, 99])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3), "mean": round(float(a.mean()), 3)}
+
+
+def _peak_rss_mb() -> float:
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(kb / 1024.0 if sys.platform != "darwin" else kb / 1024.0 / 1024.0, 1)
+
+
+def _make_processor(weights: str | None, imgsz: int, fast_path: bool):
+    if not weights:
+        return StubHandProcessor(name="StubHand", imgsz=imgsz), "stub"
+    from myapp.processing.hand_yolo import HandYolo
+    proc = HandYolo(name="HandYolo", weights=weights, imgsz=imgsz, task="pose", fast_path=fast_path)
+    return proc, "yolo-fast" if fast_path else "yolo"
+
+
+def bench_one(resolution, imgsz: int, frames: int, warmup: int, weights: str | None,
+              fast_path: bool, display_size=(960, 540), source: str | None = None) -> dict:
+    # source enregistrée (.myraw, vidéo, images) rejouée en boucle, sinon générateur synthétique
+    cam = open_source({**source_config(source), "loop": True}) if source else SyntheticSource(resolution)
+    proc, engine = _make_processor(weights, imgsz, fast_path)
+    to_qimage = _display_fn(display_size)
+    times = {s: [] for s in STAGES}
+    t_start = None
+    for i in range(warmup + frames):
+        if i == warmup:
+            t_start = time.perf_counter()
+        t0 = time.perf_counter()
+        frame = cam.get_frame()
+        t1 = time.perf_counter()
+        if resolution is None:
+            resolution = (frame.shape[1], frame.shape[0])
+        res = proc.analyze(frame)
+        t2 = time.perf_counter()
+        frame = proc.render(frame, res)
+        t3 = time.perf_counter()
+        if to_qimage is not None:
+            to_qimage(frame)
+        t4 = time.perf_counter()
+        if i >= warmup:
+            times["capture"].append(t1 - t0)
+            times["infer"].append(t2 - t1)
+            times["draw"].append(t3 - t2)
+            if to_qimage is not None:
+                times["display"].append(t4 - t3)
+    elapsed = time.perf_counter() - t_start
+    proc.close()
+    cam.release()
+    return {
+        "resolution": list(resolution),
+        "imgsz": imgsz,
+        "engine": engine,
+        "source": source or "synthetic",
+        "frames": frames,
+        "stages": {s: _percentiles(v) for s, v in times.items() if v},
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def bench_isolated(*args) -> dict:
+    """bench_one dans un process neuf (spawn) : pic RSS sans l'héritage des configurations précédentes."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as ex:
+        return ex.submit(bench_one, *args).result()
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def _run_key(run: dict) -> tuple:
+    return (tuple(run["resolution"]), run["imgsz"], run["engine"])
+
+
+def compare(new: dict, base: dict) -> list[str]:
+    """Lignes de comparaison p50/p95 par étage et FPS entre deux fichiers de résultats."""
+    base_runs = {_run_key(r): r for r in base.get("runs", [])}
+    lines = []
+    for run in new.get("runs", []):
+        old = base_runs.get(_run_key(run))
+        if old is None:
+            continue
+        w, h = run["resolution"]
+        lines.append(f"{w}x{h} imgsz={run['imgsz']} [{run['engine']}] fps {old['fps']} -> {run['fps']}")
+        for stage, st in run["stages"].items():
+            ost = old["stages"].get(stage)
+            if not ost:
+                continue
+            d = (st["p50"] - ost["p50"]) / ost["p50"] * 100 if ost["p50"] else 0.0
+            lines.append(f"  {stage:<8} p50 {ost['p50']:.2f} -> {st['p50']:.2f} ms ({d:+.1f}%)"
+                         f"  p95 {ost['p95']:.2f} -> {st['p95']:.2f} ms")
+    return lines
+
+
+def _parse_res(text: str) -> list[tuple[int, int]]:
+    return [tuple(int(v) for v in r.lower().split("x")) for r in text.split(",") if r]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--resolutions", default="640x480,1280x720,1920x1080")
+    ap.add_argument("--imgsz", default="320,640")
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--warmup", type=int, default=20)
+    ap.add_argument("--weights", default=None, help="poids YOLO ; absent = processor factice")
+    ap.add_argument("--fast-path", action="store_true", help="utilise YoloEngine(fast_path=True)")
+    ap.add_argument("--source", default=None, help="vidéo, dossier d'images ou .myraw rejoué à la place du générateur")
+    ap.add_argument("--display-size", default="960x540", help="taille de la zone vidéo simulée")
+    ap.add_argument("--out", default="bench.json")
+    ap.add_argument("--compare", default=None, help="fichier de résultats de référence")
+    ap.add_argument("--in-process", action="store_true",
+                    help="toutes les configurations dans ce process (plus rapide ; pic RSS cumulatif)")
+    args = ap.parse_args(argv)
+
+    cv2.setNumThreads(max(1, os.cpu_count() or 1))
+    runs = []
+    run = bench_one if args.in_process else bench_isolated
+    for res in ([None] if args.source else _parse_res(args.resolutions)):
+        for imgsz in (int(v) for v in args.imgsz.split(",") if v):
+            r = run(res, imgsz, args.frames, args.warmup, args.weights, args.fast_path,
+                          _parse_res(args.display_size)[0], args.source)
+            runs.append(r)
+            st = r["stages"]
+            w, h = r["resolution"]
+            print(f"{w}x{h} imgsz={imgsz} [{r['engine']}] {r['fps']} fps  "
+                  + "  ".join(f"{k}={v['p50']:.2f}ms" for k, v in st.items()))
+    out = {
+        "meta": {
+            "commit": _git_rev(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+        },
+        "runs": runs,
+    }
+    Path(args.out).write_text(json.dumps(out, indent=2), encoding="utf-8")
+    print(f"Résultats écrits dans {args.out}")
+    if args.compare:
+        base = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print("\n".join(compare(out, base)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+from __future__ import annotations
+import argparse, json, logging, multiprocessing, os, queue, threading, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import cv2
+
+from myapp.utils.config import camera_configs, load_settings
+from myapp.utils.logger import ChildLogForwarder, setup_child_logging, setup_logging
+from myapp.utils.plugin_loader import load_modules
+from myapp.engines.detections import Detections
+from myapp.processing.pipeline import build_pipeline
+from myapp.video.sources import FrameSource, open_source
+
+_END = object()
+
+log = logging.getLogger("myapp.batch")
+
+
+# --- Sources ---
+def iter_frames(spec):
+    """Itère (index, frame BGR) sur une source : chemin (vidéo, dossier d'images, .myraw) ou config `camera`."""
+    src = open_source(spec)
+    try:
+        yield from src
+    finally:
+        src.release()
+
+
+def source_label(spec, i: int = 0) -> Path:
+    """Nom des sorties : le chemin d'entrée, ou `name` / type+index pour une source de settings.yaml."""
+    if isinstance(spec, dict):
+        return Path(spec.get("path") or spec.get("name") or f"{spec.get('source', 'camera')}{i}")
+    return Path(spec)
+
+
+# --- Traitement ---
+def _to_record(results):
+    if results is None:
+        return None
+    if isinstance(results, Detections):
+        return results.to_dict()
+    if getattr(results, "boxes", None) is not None:
+        return Detections.from_results(results).to_dict()
+    return None
+
+
+class FrameRunner:
+    """Applique la chaîne de processors configurée ; retourne (frame annotée | None, détections)."""
+    def __init__(self, settings: dict, annotate: bool):
+        self.annotate = annotate
+        if (settings.get("processing", {}).get("pipeline", {}) or {}).get("enabled", False):
+            # modules en parallèle, synchrones pour que les résultats restent alignés sur la frame
+            self.processors = [build_pipeline(settings, sync=True)]
+        else:
+            self.processors = load_modules(settings)
+        if not self.processors:
+            log.warning("Aucun module activé dans processing.modules")
+
+    def __call__(self, frame):
+        record = {}
+        for p in self.processors:
+            if p.supports_split:
+                res = p.analyze(frame)
+                if isinstance(res, dict):  # pipeline : un résultat par module
+                    record.update({name: _to_record(r) for name, r in res.items()})
+                else:
+                    record[p.name] = _to_record(res)
+                if self.annotate:
+                    frame = p.render(frame, res)
+            elif self.annotate:
+                frame = p.process_frame(frame)
+        return (frame if self.annotate else None), record
+
+    def close(self):
+        for p in self.processors:
+            try:
+                p.close()
+            except Exception:
+                log.exception("close() %s", p.name)
+
+
+_RUNNER: FrameRunner | None = None
+
+
+def _init_worker(settings: dict, annotate: bool, log_q):
+    global _RUNNER
+    setup_child_logging(log_q, settings.get("logging"))
+    _RUNNER = FrameRunner(settings, annotate)
+
+
+def run_frame(runner: FrameRunner, idx: int, frame) -> tuple:
+    """
+    (index, frame annotée | None, détections) ; une frame qui fait échouer un module donne un
+    résultat vide (détections None) au lieu d'interrompre le lot. Les erreurs répétées sont
+    résumées par le handler de logging (dédup).
+    """
+    try:
+        return (idx, *runner(frame))
+    except Exception:
+        log.exception("Erreur de traitement (frame ignorée)")
+        return idx, (frame if runner.annotate else None), None
+
+
+def _run_in_worker(idx: int, frame):
+    return run_frame(_RUNNER, idx, frame)
+
+
+# --- Écriture ---
+def output_stems(labels: list[Path]) -> list[str]:
+    """Nom de base des sorties par entrée ; suffixe _<index> si deux entrées donneraient le même nom."""
+    stems = [p.stem or p.name for p in labels]
+    return [f"{s}_{i}" if stems.count(s) > 1 else s for i, s in enumerate(stems)]
+
+
+class _Writer(threading.Thread):
+    def __init__(self, source: Path, out_dir: Path, fmt: str, fps: float, maxsize: int, stem: str | None = None):
+        super().__init__(name="batch-writer", daemon=True)
+        self.q: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.source, self.fps = source, fps
+        stem = stem or source.stem or source.name
+        self.jsonl = open(out_dir / f"{stem}.jsonl", "w", encoding="utf-8") if fmt in ("jsonl", "both") else None
+        self.video_path = out_dir / f"{stem}_annotated.mp4" if fmt in ("video", "both") else None
+        self.video = None
+        self.error: BaseException | None = None
+
+    def _write(self, idx, frame, record):
+        if self.jsonl is not None:
+            line = {"source": str(self.source), "frame": idx, "detections": record or {}}
+            if record is None:
+                line["error"] = True  # traitement échoué pour cette frame
+            self.jsonl.write(json.dumps(line) + "\n")
+        if self.video_path is not None and frame is not None:
+            if self.video is None:
+                h, w = frame.shape[:2]
+                self.video = cv2.VideoWriter(str(self.video_path), cv2.VideoWriter_fourcc(*"mp4v"), self.fps, (w, h))
+            self.video.write(frame if frame.ndim == 3 else cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR))
+
+    def run(self):
+        try:
+            while True:
+                item = self.q.get()
+                if item is _END:
+                    break
+                if self.error is not None:
+                    continue  # on continue de vider la file pour ne pas bloquer les producteurs
+                try:
+                    self._write(*item)
+                except Exception as e:
+                    self.error = e
+                    log.exception("Écriture %s", self.source)
+        finally:
+            if self.jsonl is not None:
+                self.jsonl.close()
+            if self.video is not None:
+                self.video.release()
+
+
+def _decode(source: FrameSource, q: queue.Queue, stop: threading.Event):
+    try:
+        for item in source:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.2)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                break
+    except Exception:
+        log.exception("Décodage %s", source)
+    finally:
+        q.put(_END)
+
+
+def process_source(spec, out_dir: Path, fmt: str, runner: FrameRunner | None,
+                   pool: ProcessPoolExecutor | None, queue_size: int, label: Path | None = None,
+                   stem: str | None = None) -> int:
+    """
+    Pipeline borné décodage -> inférence -> écriture pour une source (chemin ou config `camera`).
+    Au plus `queue_size` frames en attente à chaque étage : mémoire constante quelle que soit la durée.
+    """
+    source = label or source_label(spec)
+    reader = open_source(spec)
+    frames: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    decoder = threading.Thread(target=_decode, args=(reader, frames, stop), name="batch-decode", daemon=True)
+    writer = _Writer(source, out_dir, fmt, reader.fps, queue_size, stem)
+    decoder.start(); writer.start()
+
+    n, t0 = 0, time.perf_counter()
+    inflight: deque = deque()
+    failed = 0
+
+    def put(result):
+        nonlocal failed
+        failed += result[2] is None
+        writer.q.put(result)
+
+    try:
+        while True:
+            item = frames.get()
+            if item is _END:
+                break
+            idx, frame = item
+            if pool is None:
+                put(run_frame(runner, idx, frame))
+            else:
+                inflight.append(pool.submit(_run_in_worker, idx, frame))
+                if len(inflight) >= queue_size:
+                    put(inflight.popleft().result())
+            n += 1
+            if writer.error is not None:
+                raise RuntimeError(f"Échec écriture pour {source}") from writer.error
+        while inflight:
+            put(inflight.popleft().result())
+    finally:
+        stop.set()
+        writer.q.put(_END)
+        writer.join()
+        decoder.join(timeout=1.0)
+        reader.release()
+    dt = time.perf_counter() - t0
+    log.info("%s : %d frames en %.1fs (%.1f fps)", source, n, dt, n / dt if dt > 0 else 0.0)
+    if failed:
+        log.warning("%s : %d frames en erreur (résultat vide)", source, failed)
+    return n
+
+
+def run(inputs: list, settings: dict, out_dir: str, fmt: str = "jsonl",
+        workers: int = 0, queue_size: int = 8) -> int:
+    """`inputs` : chemins (vidéo, dossier d'images, .myraw) ou configs de source (settings.yaml)."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    annotate = fmt in ("video", "both")
+    runner, pool, logs = None, None, None
+    if workers > 0:
+        ctx = multiprocessing.get_context("spawn")
+        logs = ChildLogForwarder(ctx)  # un seul écrivain par fichier de log
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                   initializer=_init_worker, initargs=(settings, annotate, logs.queue))
+        queue_size = max(queue_size, 2 * workers)
+    else:
+        runner = FrameRunner(settings, annotate)
+    total = 0
+    labels = [source_label(src, i) for i, src in enumerate(inputs)]
+    stems = output_stems(labels)  # a/clip.mp4 et b/clip.avi ne s'écrasent pas
+    try:
+        for src, label, stem in zip(inputs, labels, stems):
+            total += process_source(src, out, fmt, runner, pool, queue_size, label=label, stem=stem)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+            logs.stop()
+        if runner is not None:
+            runner.close()
+    return total
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="myapp batch", description="Traitement hors-ligne de vidéos / dossiers d'images.")
+    parser.add_argument("inputs", nargs="*",
+                        help="fichiers vidéo, dossiers d'images ou .myraw (défaut : sources `camera` de settings.yaml)")
+    parser.add_argument("-o", "--out", default="batch_out", help="dossier de sortie (défaut: batch_out)")
+    parser.add_argument("-f", "--format", choices=("jsonl", "video", "both"), default="jsonl",
+                        help="détections JSONL, vidéo annotée, ou les deux")
+    parser.add_argument("-w", "--workers", type=int, default=0,
+                        help="nb de processus d'inférence (0 = dans le process courant)")
+    parser.add_argument("-q", "--queue", type=int, default=8, help="profondeur max des files entre étages")
+    parser.add_argument("-s", "--settings", default="settings.yaml", help="fichier de configuration")
+    args = parser.parse_args(argv)
+
+    settings = load_settings([args.settings])
+    setup_logging(settings.get("logging"))
+    for src in args.inputs:
+        if not os.path.exists(src):
+            parser.error(f"introuvable: {src}")
+    inputs = args.inputs
+    if not inputs:
+        # sources de settings.yaml ; caméra, générateur ou lecture en boucle : bornés par max_frames
+        cfgs = camera_configs(settings)
+        unbounded = [c for c in cfgs if not c.get("max_frames")
+                     and (c.get("source", "camera") in ("camera", "synthetic") or c.get("loop"))]
+        inputs = [c for c in cfgs if c not in unbounded]
+        rejected = ", ".join(str(source_label(c, cfgs.index(c))) for c in unbounded)
+        if not inputs:
+            parser.error("aucune entrée : donner des fichiers ou une source bornée (max_frames) dans `camera`"
+                         + (f" ; sans fin : {rejected}" if rejected else ""))
+        if unbounded:
+            log.warning("Sources sans fin ignorées (ajouter max_frames) : %s", rejected)
+    run(inputs, settings, args.out, args.format, max(0, args.workers), max(1, args.queue))
+    return 0
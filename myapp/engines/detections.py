@@ -0,0 +1,120 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class Detections:
+    """
+    Résultat compact en numpy (coordonnées image d'origine) :
+    - boxes: (N, 4) float32 xyxy
+    - scores: (N,) float32
+    - classes: (N,) int32
+    - keypoints: (N, K, 3) float32 (x, y, visibilité) ou None
+    - track_ids: (N,) int32 identifiants de piste stables (si suivi actif) ou None
+    """
+    boxes: np.ndarray
+    scores: np.ndarray
+    classes: np.ndarray
+    keypoints: np.ndarray | None = None
+    track_ids: np.ndarray | None = None
+
+    @classmethod
+    def empty(cls, with_keypoints: bool = False, nkpt: int = 21) -> "Detections":
+        kpts = np.zeros((0, nkpt, 3), np.float32) if with_keypoints else None
+        return cls(np.zeros((0, 4), np.float32), np.zeros((0,), np.float32), np.zeros((0,), np.int32), kpts)
+
+    @classmethod
+    def from_results(cls, results) -> "Detections":
+        """Convertit un Results Ultralytics en un seul transfert par tableau (pas d'accès boîte par boîte)."""
+        boxes = getattr(results, "boxes", None)
+        if boxes is None or len(boxes) == 0:
+            return cls.empty()
+        data = boxes.data.cpu().numpy()  # (N, 6) : xyxy, conf, cls
+        kpts = None
+        if getattr(results, "keypoints", None) is not None:
+            k = results.keypoints.data.cpu().numpy().astype(np.float32, copy=False)
+            if k.shape[-1] == 2:  # pas de visibilité : on la met à 1
+                k = np.concatenate([k, np.ones(k.shape[:-1] + (1,), np.float32)], axis=-1)
+            kpts = k
+        return cls(
+            data[:, :4].astype(np.float32, copy=False),
+            data[:, 4].astype(np.float32, copy=False),
+            data[:, 5].astype(np.int32),
+            kpts,
+        )
+
+    def to_dict(self, decimals: int = 1) -> dict:
+        """Version sérialisable (JSON) des détections."""
+        out = {
+            "boxes": np.round(self.boxes, decimals).tolist(),
+            "scores": np.round(self.scores, 3).tolist(),
+            "classes": self.classes.tolist(),
+        }
+        if self.keypoints is not None:
+            out["keypoints"] = np.round(self.keypoints, decimals).tolist()
+        if self.track_ids is not None:
+            out["track_ids"] = self.track_ids.tolist()
+        return out
+
+    def __len__(self) -> int:
+        return int(self.boxes.shape[0])
+
+    def select(self, idx) -> "Detections":
+        """Sous-ensemble (indices ou masque booléen)."""
+        return Detections(
+            self.boxes[idx], self.scores[idx], self.classes[idx],
+            None if self.keypoints is None else self.keypoints[idx],
+            None if self.track_ids is None else self.track_ids[idx],
+        )
+
+    def translated(self, dx: float, dy: float) -> "Detections":
+        """Copie décalée de (dx, dy) : coordonnées d'un crop -> image complète."""
+        boxes = self.boxes + np.array([dx, dy, dx, dy], np.float32)
+        kpts = None
+        if self.keypoints is not None:
+            kpts = self.keypoints.copy()
+            kpts[..., 0] += dx
+            kpts[..., 1] += dy
+        return Detections(boxes, self.scores, self.classes, kpts, self.track_ids)
+
+    @classmethod
+    def concat(cls, items: list["Detections"]) -> "Detections":
+        items = [d for d in items if d is not None and len(d)]
+        if not items:
+            return cls.empty()
+        with_kpts = all(d.keypoints is not None for d in items)
+        with_ids = all(d.track_ids is not None for d in items)
+        return cls(
+            np.concatenate([d.boxes for d in items]),
+            np.concatenate([d.scores for d in items]),
+            np.concatenate([d.classes for d in items]),
+            np.concatenate([d.keypoints for d in items]) if with_kpts else None,
+            np.concatenate([d.track_ids for d in items]) if with_ids else None,
+        )
+
+
+def nms(dets: Detections, iou_thres: float = 0.5, class_aware: bool = True) -> Detections:
+    """NMS glouton vectorisé en numpy (fusion de résultats de crops/tuiles qui se recouvrent)."""
+    n = len(dets)
+    if n <= 1:
+        return dets
+    boxes = dets.boxes.astype(np.float32, copy=False)
+    if class_aware:
+        # décale chaque classe dans son propre espace pour ne jamais supprimer entre classes
+        boxes = boxes + (dets.classes.astype(np.float32) * (boxes.max() + 1))[:, None]
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-dets.scores)
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-6)
+        order = rest[iou <= iou_thres]
+    return dets.select(np.asarray(keep, np.int64))
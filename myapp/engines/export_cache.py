@@ -0,0 +1,77 @@
+from __future__ import annotations
+import importlib.util, logging, os, shutil, threading
+
+from myapp.engines.registry import file_digest
+
+# backend -> (format d'export Ultralytics, module runtime requis)
+BACKENDS = {
+    "onnxruntime": ("onnx", "onnxruntime"),
+    "openvino": ("openvino", "openvino"),
+}
+
+_lock = threading.Lock()
+_in_progress: set[str] = set()
+log = logging.getLogger("myapp.export")
+
+
+def runtime_available(backend: str) -> bool:
+    return backend in BACKENDS and importlib.util.find_spec(BACKENDS[backend][1]) is not None
+
+
+def artifact_path(weights: str, imgsz, backend: str, cache_dir: str = "cache/exports") -> str:
+    """Chemin de l'export en cache : <cache_dir>/<hash>_<imgsz>_<backend>[.onnx]."""
+    fmt = BACKENDS[backend][0]
+    size = "x".join(str(int(v)) for v in imgsz) if isinstance(imgsz, (list, tuple)) else str(int(imgsz))
+    stem = f"{file_digest(weights)[:16]}_{size}_{backend}"
+    name = stem + ".onnx" if fmt == "onnx" else stem  # openvino : dossier
+    return os.path.abspath(os.path.join(cache_dir, name))
+
+
+def cached_artifact(weights: str, imgsz, backend: str, cache_dir: str = "cache/exports") -> str | None:
+    path = artifact_path(weights, imgsz, backend, cache_dir)
+    return path if os.path.exists(path) else None
+
+
+def export(weights: str, imgsz, backend: str, cache_dir: str = "cache/exports") -> str:
+    """
+    Exporte les poids vers le backend demandé et range l'artefact dans le cache.
+    Bloquant (plusieurs secondes) : à appeler depuis un thread de fond uniquement.
+    """
+    target = artifact_path(weights, imgsz, backend, cache_dir)
+    if os.path.exists(target):
+        return target
+    from ultralytics import YOLO
+
+    fmt = BACKENDS[backend][0]
+    log.info("Export %s de %s (imgsz=%s)…", backend, weights, imgsz)
+    out = YOLO(weights).export(format=fmt, imgsz=imgsz, dynamic=False, half=False, verbose=False)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = target + ".tmp"
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp) if os.path.isdir(tmp) else os.remove(tmp)
+    shutil.move(str(out), tmp)
+    os.replace(tmp, target)  # l'artefact n'apparaît qu'une fois complet
+    log.info("Export %s en cache: %s", backend, target)
+    return target
+
+
+def export_in_background(weights: str, imgsz, backend: str, cache_dir: str = "cache/exports") -> threading.Thread | None:
+    """Lance export() dans un thread démon, sauf si le même export est déjà en cours."""
+    target = artifact_path(weights, imgsz, backend, cache_dir)
+    with _lock:
+        if target in _in_progress:
+            return None
+        _in_progress.add(target)
+
+    def _run():
+        try:
+            export(weights, imgsz, backend, cache_dir)
+        except Exception:
+            log.exception("Export %s échoué pour %s", backend, weights)
+        finally:
+            with _lock:
+                _in_progress.discard(target)
+
+    t = threading.Thread(target=_run, name=f"export-{backend}", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,117 @@
+from __future__ import annotations
+import time
+import cv2
+import numpy as np
+
+from myapp.engines.detections import Detections
+
+try:  # emplacement selon la version d'Ultralytics
+    from ultralytics.utils.nms import non_max_suppression
+except ImportError:  # pragma: no cover
+    from ultralytics.utils.ops import non_max_suppression
+
+
+class Letterbox:
+    """
+    Letterbox + normalisation dans des buffers préalloués pour une taille d'entrée fixe.
+    Le canevas n'est re-rempli (gris 114) que si la géométrie de la source change.
+    """
+    def __init__(self, imgsz, device, half: bool = False):
+        import torch
+        self._torch = torch
+        self.h, self.w = (imgsz, imgsz) if isinstance(imgsz, int) else tuple(imgsz)
+        self.canvas = np.full((self.h, self.w, 3), 114, np.uint8)
+        self.tensor = torch.empty((1, 3, self.h, self.w), device=device,
+                                  dtype=torch.float16 if half else torch.float32)
+        self._src_hw: tuple[int, int] | None = None
+        self._resized: np.ndarray | None = None
+        self.ratio = 1.0
+        self.pad = (0, 0)
+
+    def _set_geometry(self, fh: int, fw: int):
+        r = min(self.h / fh, self.w / fw)
+        nw, nh = int(round(fw * r)), int(round(fh * r))
+        self.ratio = r
+        self.pad = ((self.w - nw) // 2, (self.h - nh) // 2)
+        self._resized = np.empty((nh, nw, 3), np.uint8)
+        self.canvas[:] = 114
+        self._src_hw = (fh, fw)
+
+    def __call__(self, frame_bgr):
+        fh, fw = frame_bgr.shape[:2]
+        if self._src_hw != (fh, fw):
+            self._set_geometry(fh, fw)
+        nh, nw = self._resized.shape[:2]
+        px, py = self.pad
+        if (nh, nw) == (fh, fw):
+            np.copyto(self._resized, frame_bgr)
+        else:
+            cv2.resize(frame_bgr, (nw, nh), dst=self._resized, interpolation=cv2.INTER_LINEAR)
+        # BGR -> RGB directement dans la zone utile du canevas
+        self.canvas[py:py + nh, px:px + nw] = self._resized[:, :, ::-1]
+        self.tensor[0].copy_(self._torch.from_numpy(self.canvas).permute(2, 0, 1))
+        self.tensor.mul_(1.0 / 255.0)
+        return self.tensor
+
+
+class FastPathRunner:
+    """
+    Inférence directe sur le nn.Module (sans le predictor générique d'Ultralytics) :
+    letterbox préalloué, torch.inference_mode(), NMS sur la sortie brute,
+    résultat compact Detections (un seul transfert GPU/CPU -> numpy).
+    """
+    def __init__(self, yolo, *, imgsz=640, device=None, half: bool = False):
+        import torch
+        self.torch = torch
+        dev = torch.device("cpu" if device in (None, "", "cpu") else
+                           (f"cuda:{device}" if str(device).isdigit() else str(device)))
+        self.half = bool(half) and dev.type != "cpu"
+        net = yolo.model.fuse() if hasattr(yolo.model, "fuse") else yolo.model
+        net = net.to(dev).eval()
+        self.net = net.half() if self.half else net.float()
+        self.nc = len(getattr(yolo, "names", {}) or {}) or 1
+        kpt_shape = getattr(net, "kpt_shape", None) or (getattr(net, "yaml", {}) or {}).get("kpt_shape")
+        self.kpt_shape = tuple(kpt_shape) if kpt_shape else None
+        self.letterbox = Letterbox(imgsz, dev, self.half)
+        self.speed: dict[str, float] = {}  # ms, mêmes clés que Results.speed
+
+    def _sync(self):
+        if self.letterbox.tensor.is_cuda:
+            self.torch.cuda.synchronize()
+
+    def __call__(self, frame_bgr, conf: float, iou: float, classes=None) -> Detections:
+        t0 = time.perf_counter()
+        x = self.letterbox(frame_bgr)
+        tp = time.perf_counter()
+        with self.torch.inference_mode():
+            preds = self.net(x)
+            preds = preds[0] if isinstance(preds, (list, tuple)) else preds
+            self._sync()
+            t1 = time.perf_counter()
+            det = non_max_suppression(preds, conf, iou, classes=classes, nc=self.nc)[0]
+            det = det.float().cpu().numpy()
+        t2 = time.perf_counter()
+        self.speed = {"preprocess": (tp - t0) * 1000.0, "inference": (t1 - tp) * 1000.0,
+                      "postprocess": (t2 - t1) * 1000.0}
+        if det.shape[0] == 0:
+            return Detections.empty(self.kpt_shape is not None, self.kpt_shape[0] if self.kpt_shape else 21)
+
+        px, py = self.letterbox.pad
+        r = self.letterbox.ratio
+        fh, fw = frame_bgr.shape[:2]
+        boxes = det[:, :4]
+        boxes -= (px, py, px, py)
+        boxes /= r
+        np.clip(boxes[:, 0::2], 0, fw, out=boxes[:, 0::2])
+        np.clip(boxes[:, 1::2], 0, fh, out=boxes[:, 1::2])
+
+        kpts = None
+        if self.kpt_shape is not None and det.shape[1] > 6:
+            nk, nd = self.kpt_shape
+            kpts = det[:, 6:6 + nk * nd].reshape(-1, nk, nd)
+            kpts[..., 0] = (kpts[..., 0] - px) / r
+            kpts[..., 1] = (kpts[..., 1] - py) / r
+            if nd == 2:
+                kpts = np.concatenate([kpts, np.ones(kpts.shape[:-1] + (1,), np.float32)], axis=-1)
+        return Detections(boxes.astype(np.float32, copy=False), det[:, 4].copy(),
+                          det[:, 5].astype(np.int32), kpts)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+from dataclasses import dataclass, fields
+
+import cv2
+import numpy as np
+
+from myapp.engines.detections import Detections
+
+# Squelette de la main (21 points, convention wrist/thumb/index/middle/ring/pinky)
+HAND_SKELETON = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+@dataclass
+class OverlayStyle:
+    """Style de l'overlay (couleurs BGR). Construit depuis engines.yolo.overlay."""
+    box_color: tuple = (0, 255, 0)
+    box_thickness: int = 2
+    font_scale: float = 0.6
+    text_thickness: int = 2
+    kpt_color: tuple = (0, 0, 255)
+    kpt_radius: int = 3
+    kpt_conf: float = 0.5
+    line_color: tuple = (255, 200, 0)
+    line_thickness: int = 2
+
+    @classmethod
+    def from_config(cls, cfg: dict | None) -> "OverlayStyle":
+        cfg = cfg or {}
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: tuple(v) if isinstance(v, list) else v for k, v in cfg.items() if k in known})
+
+
+class OverlayRenderer:
+    """
+    Dessine en place des Detections sur la frame (copie BGR si elle est en niveaux de gris,
+    d'où l'usage obligatoire de la valeur renvoyée) : toutes les coordonnées sont converties
+    en une passe numpy, les segments du squelette sont tracés en un seul appel polylines.
+    """
+    def __init__(self, style: OverlayStyle | None = None, skeleton=HAND_SKELETON):
+        self.style = style or OverlayStyle()
+        self.skeleton = np.asarray(skeleton, np.int32).reshape(-1, 2)
+
+    @staticmethod
+    def label(cls_id: int, conf: float) -> str:
+        return f"hand {conf:.2f}" if cls_id in (-1, 0, 1) else f"id{cls_id} {conf:.2f}"
+
+    def draw(self, frame, dets: Detections, draw_scores: bool = True, draw_pose: bool = True):
+        if dets is None or len(dets) == 0:
+            return frame
+        if frame.ndim == 2 or frame.shape[2] == 1:  # camera.grayscale : couleurs BGR perdues sur 1 canal
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        st = self.style
+        boxes = np.rint(dets.boxes).astype(np.int32)
+        for x1, y1, x2, y2 in boxes.tolist():
+            cv2.rectangle(frame, (x1, y1), (x2, y2), st.box_color, st.box_thickness)
+        if draw_scores:
+            ids = dets.track_ids.tolist() if dets.track_ids is not None else [None] * len(dets)
+            for (x1, y1, _, _), conf, cls_id, tid in zip(boxes.tolist(), dets.scores.tolist(), dets.classes.tolist(), ids):
+                text = self.label(cls_id, conf) if tid is None else f"#{tid} {self.label(cls_id, conf)}"
+                cv2.putText(frame, text, (x1, max(0, y1 - 6)),
+                            cv2.FONT_HERSHEY_SIMPLEX, st.font_scale, st.box_color, st.text_thickness, cv2.LINE_AA)
+        if draw_pose and dets.keypoints is not None and dets.keypoints.size:
+            self._draw_keypoints(frame, dets.keypoints)
+        return frame
+
+    def _draw_keypoints(self, frame, kpts: np.ndarray):
+        st = self.style
+        xy = np.rint(kpts[..., :2]).astype(np.int32)   # (N, K, 2)
+        visible = kpts[..., 2] >= st.kpt_conf           # (N, K)
+        nk = kpts.shape[1]
+        edges = self.skeleton[(self.skeleton < nk).all(axis=1)]
+        if len(edges):
+            ok = visible[:, edges[:, 0]] & visible[:, edges[:, 1]]          # (N, E)
+            segs = np.stack([xy[:, edges[:, 0]], xy[:, edges[:, 1]]], axis=2)  # (N, E, 2, 2)
+            segs = segs[ok]
+            if len(segs):
+                cv2.polylines(frame, list(segs), False, st.line_color, st.line_thickness, cv2.LINE_AA)
+        for x, y in xy[visible].tolist():
+            cv2.circle(frame, (x, y), st.kpt_radius, st.kpt_color, -1, cv2.LINE_AA)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import hashlib, logging, os, threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+_DIGESTS: dict[tuple, str] = {}
+
+
+def file_digest(path: str) -> str:
+    """sha1 du fichier, mis en cache par (chemin, taille, mtime) pour ne pas relire les poids."""
+    st = os.stat(path)
+    sig = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _DIGESTS.get(sig)
+    if digest is None:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = _DIGESTS[sig] = h.hexdigest()
+    return digest
+
+
+def _imgsz_key(imgsz) -> tuple:
+    return tuple(imgsz) if isinstance(imgsz, (list, tuple)) else (int(imgsz), int(imgsz))
+
+
+class ModelRegistry:
+    """
+    Cache process-wide des modèles chargés (LRU).
+    Clé : (chemin absolu des poids, hash du fichier, task, device, imgsz, backend, variante).
+    La variante sépare les modèles modifiés en place (fast_path : fusionné, déplacé, fp16/fp32).
+    Le plafond mémoire est estimé à partir de la taille des fichiers de poids.
+    """
+    def __init__(self, max_models: int = 4, max_mb: float | None = None):
+        self.log = logging.getLogger("myapp.registry")
+        self.max_models = max(1, int(max_models))
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+        self._lock = threading.RLock()
+        self._entries: OrderedDict[tuple, dict] = OrderedDict()
+        self._loading: dict[tuple, threading.Event] = {}
+
+    def configure(self, max_models: int | None = None, max_mb: float | None = None):
+        with self._lock:
+            if max_models:
+                self.max_models = max(1, int(max_models))
+            self.max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+            self._enforce_cap()
+
+    @staticmethod
+    def make_key(weights: str, task: str = "detect", device: str | None = None,
+                 imgsz=640, backend: str = "torch", variant: str = "") -> tuple:
+        path = os.path.abspath(weights)
+        digest = file_digest(path) if os.path.isfile(path) else ""
+        return (path, digest, task, str(device), _imgsz_key(imgsz), backend, variant)
+
+    def get(self, key: tuple, loader: Callable[[], Any]) -> dict:
+        """
+        Retourne l'entrée {"model", "bytes", "warm", "lock"} pour la clé, en la chargeant si besoin.
+        "lock" sérialise les appels au modèle partagé (le predictor Ultralytics n'est pas thread-safe).
+        Un seul chargement par clé même si plusieurs threads la demandent en même temps.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    return entry
+                pending = self._loading.get(key)
+                if pending is None:
+                    pending = self._loading[key] = threading.Event()
+                    break
+            pending.wait()  # chargé par un autre thread : on relit le cache
+
+        try:
+            model = loader()
+            size = os.path.getsize(key[0]) if os.path.isfile(key[0]) else 0
+            entry = {"model": model, "bytes": size, "warm": False, "lock": threading.Lock()}
+            with self._lock:
+                self._entries[key] = entry
+                self._enforce_cap()
+            self.log.info("Modèle chargé en cache: %s (%s, %s)", os.path.basename(key[0]), key[2], key[5])
+            return entry
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            pending.set()
+
+    def evict(self, key: tuple | None = None):
+        """Retire une entrée (ou toutes si key=None)."""
+        with self._lock:
+            keys = [key] if key is not None else list(self._entries)
+            for k in keys:
+                if self._entries.pop(k, None) is not None:
+                    self.log.info("Modèle retiré du cache: %s", os.path.basename(k[0]))
+
+    def _enforce_cap(self):
+        def over():
+            if len(self._entries) > self.max_models:
+                return True
+            if self.max_bytes is not None:
+                return sum(e["bytes"] for e in self._entries.values()) > self.max_bytes
+            return False
+        # on garde toujours au moins l'entrée la plus récente
+        while len(self._entries) > 1 and over():
+            k, _ = self._entries.popitem(last=False)
+            self.log.info("Cache modèles plein, éviction: %s", os.path.basename(k[0]))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def keys(self) -> list[tuple]:
+        with self._lock:
+            return list(self._entries)
+
+
+_REGISTRY = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+    return _REGISTRY
+
+
+def preload_models(settings: dict) -> threading.Thread | None:
+    """
+    Charge et préchauffe en arrière-plan les moteurs listés dans model_cache.preload.
+    Retourne le thread lancé (ou None si rien à précharger).
+    """
+    cache_cfg = settings.get("model_cache", {}) or {}
+    _REGISTRY.configure(cache_cfg.get("max_models"), cache_cfg.get("max_mb"))
+    names = cache_cfg.get("preload") or []
+    if not names:
+        return None
+    log = logging.getLogger("myapp.registry")
+
+    def _run():
+        from myapp.engines.yolo_engine import YoloEngine
+        for name in names:
+            cfg = dict(settings.get("engines", {}).get(name, {}))
+            if not cfg.get("weights"):
+                continue
+            try:
+                cfg["export_wait"] = True  # on est déjà hors du thread GUI
+                YoloEngine(**cfg).warmup()
+                log.info("Moteur préchargé: %s", name)
+            except Exception:
+                log.exception("Préchargement du moteur %s échoué", name)
+
+    t = threading.Thread(target=_run, name="model-preload", daemon=True)
+    t.start()
+    return t
@@ -1,10 +1,31 @@
 from __future__ import annotations
+import threading
+import logging
+from myapp.engines.registry import get_registry
+from myapp.engines import export_cache
+from myapp.engines.detections import Detections
+from myapp.engines.overlay import OverlayRenderer, OverlayStyle
+
+
+def _bgr(frame):
+    """Les modèles attendent 3 canaux : frames en niveaux de gris (camera.grayscale) reconverties."""
+    if frame.ndim == 3 and frame.shape[2] == 3:
+        return frame
+    import cv2
+    return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR if frame.ndim == 2 or frame.shape[2] == 1 else cv2.COLOR_BGRA2BGR)
 
 class YoloEngine:
     """
     Wrapper Ultralytics YOLO pour la détection/pose de mains.
     - task: "detect" (boîtes) | "pose" (keypoints) selon les poids fournis
     - weights: chemin .pt
+    - cache: réutilise le modèle déjà chargé du registre process-wide (pas de rechargement des poids)
+    - backend: "torch" | "onnxruntime" | "openvino". Les exports sont mis en cache sur disque
+      (export_dir) ; tant que l'export n'existe pas, il est lancé en arrière-plan et le moteur
+      reste sur torch (sauf export_wait=True, utilisé par le préchargement).
+    - fast_path: inférence directe sur le nn.Module (backend torch) avec buffers préalloués ;
+      infer() retourne alors un Detections numpy au lieu d'un Results Ultralytics.
+    - overlay: style de dessin (couleurs, épaisseurs, seuil des keypoints), cf. OverlayStyle
     """
     def __init__(
         self,
@@ -17,6 +38,12 @@ class YoloEngine:
         imgsz: int | tuple[int, int] = 640,
         half: bool = False,
         device: str | None = None,
+        cache: bool = True,
+        backend: str = "torch",
+        export_dir: str = "cache/exports",
+        export_wait: bool = False,
+        fast_path: bool = False,
+        overlay: dict | None = None,
         **kwargs
     ):
         try:
@@ -27,7 +54,22 @@ class YoloEngine:
             ) from e
 
         self.YOLO = YOLO
-        self.model = YOLO(weights)
+        self.log = logging.getLogger("myapp.engine.yolo")
+        self.backend, model_path = self._resolve_backend(weights, imgsz, backend, export_dir, export_wait)
+        if self.backend == "torch":
+            loader = lambda: YOLO(model_path)
+        else:
+            loader = lambda: YOLO(model_path, task=task)  # les exports ne portent pas toujours la task
+        if cache:
+            registry = get_registry()
+            # fast_path modifie le nn.Module partagé (fuse, device, half) : entrée de cache à part
+            variant = f"fast-{'fp16' if half else 'fp32'}" if fast_path and self.backend == "torch" else ""
+            self.cache_key = registry.make_key(weights, task, device, imgsz, self.backend, variant)
+            self._entry = registry.get(self.cache_key, loader)
+        else:
+            self.cache_key = None
+            self._entry = {"model": loader(), "bytes": 0, "warm": False, "lock": threading.Lock()}
+        self.model = self._entry["model"]
         self.task = task
         self.conf = float(conf)
         self.iou = float(iou)
@@ -35,43 +77,136 @@ class YoloEngine:
         self.imgsz = imgsz
         self.half = half
         self.device = device
+        self.renderer = OverlayRenderer(OverlayStyle.from_config(overlay))
+        self.last_speed: dict[str, float] = {}  # ms par étage de la dernière inférence
+        self._warned_batch = False
+
+        self.fast_path = None
+        if fast_path:
+            if self.backend != "torch":
+                self.log.warning("fast_path ignoré : uniquement disponible avec le backend torch")
+            else:
+                from myapp.engines.fast_path import FastPathRunner
+                with self._entry["lock"]:
+                    self.fast_path = FastPathRunner(self.model, imgsz=imgsz, device=device, half=half)
+
+    def set_imgsz(self, imgsz) -> bool:
+        """Change la taille d'entrée à chaud ; impossible pour les exports à taille fixe."""
+        if self.backend != "torch":
+            self.log.warning("imgsz fixe pour le backend %s : changement ignoré", self.backend)
+            return False
+        with self._entry["lock"]:
+            self.imgsz = imgsz
+            if self.fast_path is not None:
+                from myapp.engines.fast_path import Letterbox
+                lb = self.fast_path.letterbox
+                self.fast_path.letterbox = Letterbox(imgsz, lb.tensor.device, self.fast_path.half)
+        return True
+
+    def set_thresholds(self, **params):
+        """Seuils à chaud (conf, iou, classes) : pris en compte dès l'inférence suivante."""
+        if "conf" in params:
+            self.conf = float(params["conf"])
+        if "iou" in params:
+            self.iou = float(params["iou"])
+        if "classes" in params:
+            self.classes = params["classes"]
+
+    def set_overlay(self, overlay: dict | None):
+        self.renderer = OverlayRenderer(OverlayStyle.from_config(overlay))
+
+    def _resolve_backend(self, weights, imgsz, backend, export_dir, export_wait) -> tuple[str, str]:
+        """Retourne (backend effectif, chemin du modèle à charger)."""
+        if backend in (None, "", "torch"):
+            return "torch", weights
+        if backend not in export_cache.BACKENDS:
+            self.log.warning("Backend inconnu '%s', utilisation de torch", backend)
+            return "torch", weights
+        if not export_cache.runtime_available(backend):
+            self.log.warning("Runtime %s non installé, utilisation de torch", backend)
+            return "torch", weights
+        path = export_cache.cached_artifact(weights, imgsz, backend, export_dir)
+        if path is None and export_wait:
+            path = export_cache.export(weights, imgsz, backend, export_dir)
+        if path is None:
+            export_cache.export_in_background(weights, imgsz, backend, export_dir)
+            self.log.warning("Export %s absent du cache : export lancé en arrière-plan, torch en attendant", backend)
+            return "torch", weights
+        return backend, path
 
     def infer(self, frame_bgr):
-        results = self.model(
-            source=frame_bgr,
-            conf=self.conf,
-            iou=self.iou,
-            classes=self.classes,
-            imgsz=self.imgsz,
-            device=self.device,
-            verbose=False
-        )
+        frame_bgr = _bgr(frame_bgr)
+        if self.fast_path is not None:
+            with self._entry["lock"]:
+                dets = self.fast_path(frame_bgr, self.conf, self.iou, self.classes)
+            self._entry["warm"] = True
+            self.last_speed = self.fast_path.speed
+            return dets
+        with self._entry["lock"]:
+            results = self.model(
+                source=frame_bgr,
+                conf=self.conf,
+                iou=self.iou,
+                classes=self.classes,
+                imgsz=self.imgsz,
+                device=self.device,
+                verbose=False
+            )
+        self._entry["warm"] = True
+        self.last_speed = dict(getattr(results[0], "speed", None) or {})
         return results[0]
 
+    def infer_batch(self, frames: list, imgsz=None) -> list:
+        """
+        Inférence d'une liste d'images en un seul appel au modèle (un lot).
+        Passe toujours par le predictor Ultralytics (Results) ; `imgsz` remplace celui du moteur.
+        Exports onnxruntime/openvino (batch 1, imgsz fixe) : une image à la fois à l'imgsz exporté.
+        """
+        if not frames:
+            return []
+        if self.backend != "torch":
+            if not self._warned_batch:
+                self.log.warning("Backend %s exporté en batch 1 à imgsz=%s : lot traité image par image%s",
+                                 self.backend, self.imgsz,
+                                 f" (imgsz={imgsz} ignoré)" if imgsz and imgsz != self.imgsz else "")
+                self._warned_batch = True
+            results, speed = [], {}
+            for f in frames:
+                results.append(self.infer(f))
+                for k, v in self.last_speed.items():
+                    speed[k] = speed.get(k, 0.0) + v
+            self.last_speed = speed
+            return results
+        with self._entry["lock"]:
+            results = self.model(
+                source=[_bgr(f) for f in frames],
+                conf=self.conf,
+                iou=self.iou,
+                classes=self.classes,
+                imgsz=imgsz or self.imgsz,
+                device=self.device,
+                verbose=False
+            )
+        self._entry["warm"] = True
+        speed = dict(getattr(results[0], "speed", None) or {})
+        self.last_speed = {k: v * len(results) for k, v in speed.items()}  # speed = moyenne par image
+        return list(results)
+
+    def warmup(self):
+        """Première inférence sur une image noire (allocations, fusion des couches) ; no-op si déjà faite."""
+        if self._entry["warm"]:
+            return
+        import numpy as np
+        h, w = (self.imgsz, self.imgsz) if isinstance(self.imgsz, int) else tuple(self.imgsz)
+        self.infer(np.zeros((h, w, 3), dtype=np.uint8))
+
     def draw(self, frame_bgr, results, draw_scores: bool = True, draw_pose: bool = True):
-        import cv2
+        """Dessine (Results Ultralytics ou Detections) via l'OverlayRenderer ; utiliser la frame renvoyée."""
         if results is None:
             return frame_bgr
-
-        # POSE
-        if self.task == "pose" and getattr(results, "keypoints", None) is not None:
-            annotated = results.plot()
-            return annotated
-
-        # DETECT
-        if getattr(results, "boxes", None) is not None and results.boxes is not None:
-            boxes = results.boxes
-            for b in boxes:
-                xyxy = b.xyxy[0].tolist()
-                conf = float(b.conf[0]) if b.conf is not None else None
-                cls_id = int(b.cls[0]) if b.cls is not None else -1
-                x1, y1, x2, y2 = map(int, xyxy)
-                cv2.rectangle(frame_bgr, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                if draw_scores and conf is not None:
-                    label = f"hand {conf:.2f}" if cls_id in (-1, 0, 1) else f"id{cls_id} {conf:.2f}"
-                    cv2.putText(frame_bgr, label, (x1, max(0, y1 - 6)),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2, cv2.LINE_AA)
-        return frame_bgr
+        dets = results if isinstance(results, Detections) else Detections.from_results(results)
+        return self.renderer.draw(frame_bgr, dets, draw_scores=draw_scores,
+                                  draw_pose=draw_pose and self.task == "pose")
 
     def close(self):
         pass
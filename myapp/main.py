@@ -1,16 +1,45 @@
 import sys
-from PySide6.QtWidgets import QApplication
-from myapp.utils.config import load_settings
-from myapp.utils.logger import setup_logging
-from myapp.ui.main_window import MainWindow
+
 
 def main():
-    settings = load_settings(["settings.yaml"])
-    setup_logging(settings.get("logging"))
+    # Sous-commandes headless : pas d'import Qt
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from myapp.batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "probe":
+        from myapp.video.probe import main as probe_main
+        sys.exit(probe_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "record":
+        from myapp.video.sources import main as record_main
+        sys.exit(record_main(sys.argv[2:]))
+
+    # --profile-startup : durée de chaque phase + jalons asynchrones (caméra, 1re image, modèle)
+    from myapp.utils.startup import start_profiler
+    argv = [a for a in sys.argv if a != "--profile-startup"]
+    prof = start_profiler(len(argv) != len(sys.argv))
 
-    app = QApplication(sys.argv)
-    win = MainWindow(settings)
-    win.show()
+    with prof.phase("config + logging"):
+        from myapp.utils.config import load_settings
+        from myapp.utils.logger import setup_logging
+        settings = load_settings(["settings.yaml"])
+        setup_logging(settings.get("logging"))
+    with prof.phase("import Qt"):
+        from PySide6.QtWidgets import QApplication
+        from PySide6.QtCore import QTimer
+    with prof.phase("QApplication"):
+        app = QApplication(argv)
+    with prof.phase("import MainWindow"):
+        from myapp.ui.main_window import MainWindow
+    with prof.phase("préchargement modèles (lancement)"):
+        from myapp.engines.registry import preload_models
+        preload_models(settings)  # chargement + warm-up des poids en arrière-plan
+    with prof.phase("MainWindow()"):
+        win = MainWindow(settings)
+    with prof.phase("show()"):
+        win.show()
+    QTimer.singleShot(0, lambda: prof.mark("fenêtre visible"))
+    # sans caméra, le rapport sort quand même
+    QTimer.singleShot(10000, prof.report)
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+from __future__ import annotations
+import logging
+
+import numpy as np
+
+from myapp.utils.metrics import Metrics
+
+# étages qui composent la latence d'une détection (hors affichage)
+_DETECT_STAGES = ("preprocess", "inference", "postprocess")
+
+
+def build_levels(cfg: dict, base: dict | None = None) -> list[dict]:
+    """
+    Échelle de qualité, de la meilleure à la plus légère : on baisse d'abord imgsz,
+    puis on espace les inférences (stride), puis on réduit la résolution caméra.
+    Le palier 0 est la configuration de l'utilisateur (`base` : imgsz, stride, resolution) ;
+    seuls les paliers plus légers que celle-ci sont retenus.
+    """
+    base = base or {}
+    imgsz = [int(v) for v in cfg.get("imgsz_steps", [640, 512, 416, 320])]
+    strides = [int(v) for v in cfg.get("stride_steps", [1, 2, 3])]
+    res = [list(map(int, r)) for r in cfg.get("resolution_steps", [])]
+    size = base.get("imgsz") or imgsz[0]
+    if isinstance(size, (list, tuple)):
+        # [w, h] (YoloEngine, dialogue) : gardé tel quel au palier 0, le plus grand côté sert de repère
+        size = [int(v) for v in size]
+        imgsz0 = max(size)
+    else:
+        size = imgsz0 = int(size)
+    stride0 = int(base.get("stride") or strides[0])
+    res0 = list(map(int, base["resolution"])) if base.get("resolution") else (res[0] if res else None)
+    imgsz = [size] + [s for s in imgsz if s < imgsz0]
+    strides = [stride0] + [k for k in strides if k > stride0]
+    res = [res0] + [r for r in res if res0 and r[0] * r[1] < res0[0] * res0[1]]
+    levels = [{"imgsz": s, "stride": strides[0], "resolution": res[0]} for s in imgsz]
+    levels += [{"imgsz": imgsz[-1], "stride": k, "resolution": res[0]} for k in strides[1:]]
+    levels += [{"imgsz": imgsz[-1], "stride": strides[-1], "resolution": r} for r in res[1:]]
+    return levels
+
+
+class QualityController:
+    """
+    Régulateur à paliers sur la latence mesurée (p95) et le FPS d'affichage.
+    Hystérésis : on dégrade au-dessus de cible*(1+h) pendant `patience` évaluations,
+    on remonte sous cible*(1-h) pendant `2*patience` évaluations ; pause après chaque changement.
+    """
+    def __init__(self, cfg: dict, base: dict | None = None):
+        self.log = logging.getLogger("myapp.adaptive")
+        self.target_s = float(cfg.get("target_latency_ms", 80)) / 1000.0
+        self.target_fps = float(cfg.get("target_fps", 0) or 0)
+        self.hyst = float(cfg.get("hysteresis", 0.15))
+        self.patience = max(1, int(cfg.get("patience", 3)))
+        self.cooldown = int(cfg.get("cooldown", self.patience))
+        self.levels = build_levels(cfg, base)
+        self.index = 0
+        self._over = 0
+        self._under = 0
+        self._wait = 0
+        self._marks: dict[str, int] = {}
+
+    @property
+    def level(self) -> dict:
+        return self.levels[self.index]
+
+    def _window_p95(self, metrics: Metrics, stages) -> float | None:
+        """p95 de la somme des étages, sur les échantillons arrivés depuis la dernière évaluation."""
+        total = None
+        for stage in stages:
+            rb = metrics.series(stage)
+            if rb is None:
+                continue
+            vals = rb.since(self._marks.get(stage, 0))
+            self._marks[stage] = rb.count
+            if vals.size:
+                p = float(np.percentile(vals, 95))
+                total = p if total is None else total + p
+        return total
+
+    def evaluate(self, metrics: Metrics) -> dict | None:
+        """Retourne le nouveau palier à appliquer, ou None si rien ne change."""
+        e2e = self._window_p95(metrics, ("end_to_end",))
+        det = self._window_p95(metrics, _DETECT_STAGES)
+        latency = max(v for v in (e2e, det, 0.0) if v is not None)
+        fps = metrics.rate("display")
+        if self._wait > 0:
+            self._wait -= 1
+            return None
+        if latency == 0.0:
+            return None
+
+        too_slow = latency > self.target_s * (1 + self.hyst) or (
+            self.target_fps and 0 < fps < self.target_fps * (1 - self.hyst))
+        fast_enough = latency < self.target_s * (1 - self.hyst) and (
+            not self.target_fps or fps >= self.target_fps * (1 - self.hyst / 2))
+        self._over = self._over + 1 if too_slow else 0
+        self._under = self._under + 1 if fast_enough else 0
+
+        new = self.index
+        if self._over >= self.patience and self.index < len(self.levels) - 1:
+            new = self.index + 1
+        elif self._under >= 2 * self.patience and self.index > 0:
+            new = self.index - 1
+        if new == self.index:
+            return None
+        self.log.info("Qualité %s -> %s (latence p95 %.0f ms, cible %.0f ms, %.1f fps)",
+                      self.levels[self.index], self.levels[new], latency * 1000, self.target_s * 1000, fps)
+        self.index = new
+        self._over = self._under = 0
+        self._wait = self.cooldown
+        return self.level
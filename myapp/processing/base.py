@@ -2,19 +2,65 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+from myapp.utils.metrics import get_metrics
+
+
+class ProcessorFailed(RuntimeError):
+    """Module hors service de façon durable (ex: workers qui ne démarrent pas) : l'appelant doit le retirer."""
+
+
 class VideoProcessor:
     """
     Base pour tous les modules de traitement.
     Un module doit implémenter process_frame(frame) -> frame (np.ndarray BGR ou GRAY).
+
+    Optionnellement, un module peut séparer la partie lourde du dessin :
+    - analyze(frame) -> résultats (inférence, sans modifier la frame)
+    - render(frame, résultats) -> frame annotée
+    Cela permet d'exécuter analyze() hors du thread GUI et de redessiner
+    les derniers résultats sur des images plus récentes.
+
+    Les modules mesurent leurs étages via `with self.timed("inference"): ...`
+    (ou self.metrics.observe) ; voir myapp.utils.metrics.STAGES.
     """
     def __init__(self, name: str | None = None, config: dict | None = None, **kwargs: Any):
         self.name = name or self.__class__.__name__
         self.config = config or {}
         self.kwargs = kwargs
         self.log = logging.getLogger(f"myapp.proc.{self.name}")
+        self.metrics = get_metrics()
+
+    def timed(self, stage: str):
+        return self.metrics.timer(stage)
 
     def process_frame(self, frame):
         raise NotImplementedError("Implémentez process_frame(frame)")
 
+    def analyze(self, frame):
+        raise NotImplementedError("Module sans séparation analyze/render")
+
+    def analyze_batch(self, frames: list) -> list:
+        """analyze() sur plusieurs frames (une par caméra) ; à surcharger pour un vrai lot."""
+        return [self.analyze(f) for f in frames]
+
+    def render(self, frame, results):
+        return frame
+
+    def set_quality(self, **params):
+        """Réglages de qualité à chaud (ex: imgsz, stride) ; ignorés par défaut."""
+        pass
+
+    def reconfigure(self, changes: dict) -> bool:
+        """
+        Applique à chaud des paramètres modifiés (clé -> nouvelle valeur).
+        False = non supporté : l'appelant doit reconstruire le module.
+        """
+        return False
+
+    @property
+    def supports_split(self) -> bool:
+        """True si le module surcharge analyze() (et donc render())."""
+        return type(self).analyze is not VideoProcessor.analyze
+
     def close(self):
         pass
@@ -1,21 +1,206 @@
 from __future__ import annotations
 from myapp.processing.base import VideoProcessor
+from myapp.engines.detections import Detections, nms
 
 class HandYolo(VideoProcessor):
     """
     Détection/pose des mains via Ultralytics YOLO.
     kwargs (depuis engines.yolo) : weights, task, conf, iou, classes, imgsz, device, draw_scores, draw_pose
+    Suivi optionnel (engines.yolo.tracking) : le détecteur ne tourne qu'une frame sur
+    `detect_every` (ou quand la confiance des pistes passe sous `min_conf`) ; entre deux,
+    un HandTracker (Kalman + IoU) prolonge boîtes et keypoints avec des identifiants stables.
+    ROI optionnelles (engines.yolo.roi) : inférence sur des crops autour des mains précédentes,
+    en lot à un imgsz réduit, avec une passe pleine image toutes les `full_every` détections.
+    Porte de mouvement optionnelle (engines.yolo.motion_gate) : scène immobile -> pas
+    d'inférence, les derniers résultats sont réutilisés (rafraîchis au plus tard après max_age_s).
+    Tuiles optionnelles (engines.yolo.tiling) : les passes pleine image des grandes frames (4K...)
+    sont découpées en tuiles recouvrantes inférées en un lot, puis fusionnées par NMS.
     """
+    # paramètres de engines.yolo modifiables sans recharger les poids
+    LIVE_KEYS = {"conf", "iou", "classes", "imgsz", "draw_scores", "draw_pose", "overlay"}
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         from myapp.engines.yolo_engine import YoloEngine
         self.draw_scores = bool(self.kwargs.pop("draw_scores", True))
         self.draw_pose = bool(self.kwargs.pop("draw_pose", True))
+        track_cfg = self.kwargs.pop("tracking", None) or {}
+        roi_cfg = self.kwargs.pop("roi", None) or {}
+        gate_cfg = self.kwargs.pop("motion_gate", None) or {}
+        tile_cfg = self.kwargs.pop("tiling", None) or {}
         self.engine = YoloEngine(**self.kwargs)
 
+        self.tracker = None
+        self.detect_every = max(1, int(track_cfg.get("detect_every", 1)))
+        self.min_track_conf = float(track_cfg.get("min_conf", 0.3))
+        if track_cfg.get("enabled", False):
+            from myapp.processing.tracking import HandTracker
+            self.tracker = HandTracker(
+                iou_thres=track_cfg.get("iou", 0.3),
+                max_age=track_cfg.get("max_age", 3 * self.detect_every),
+                decay=track_cfg.get("decay", 0.95),
+            )
+        self._since_detect = 0
+        self._last_results = None
+
+        self.gate = None
+        self._gated_results = None
+        if gate_cfg.get("enabled", False):
+            from myapp.processing.motion_gate import MotionGate
+            self.gate = MotionGate(
+                threshold=gate_cfg.get("threshold", 2.0),
+                size=gate_cfg.get("size", 64),
+                max_age_s=gate_cfg.get("max_age_s", 2.0),
+                pixel_delta=gate_cfg.get("pixel_delta", 12),
+            )
+
+        self.roi = None
+        self._last_dets: Detections | None = None
+        if roi_cfg.get("enabled", False):
+            from myapp.processing.roi import RoiPlanner
+            self.roi = RoiPlanner(
+                margin=roi_cfg.get("margin", 0.5),
+                min_size=roi_cfg.get("min_size", 160),
+                full_every=roi_cfg.get("full_every", 15),
+            )
+            self.roi_imgsz = int(roi_cfg.get("imgsz", 320))
+
+        self.tiler = None
+        if tile_cfg.get("enabled", False):
+            from myapp.processing.tiling import TilePlanner
+            self.tiler = TilePlanner(
+                tile=tile_cfg.get("tile", 640),
+                overlap=tile_cfg.get("overlap", 128),
+                min_side=tile_cfg.get("min_side", 1280),
+                coarse=tile_cfg.get("coarse", False),
+                margin=tile_cfg.get("margin", 1.0),
+            )
+            self.tile_imgsz = int(tile_cfg.get("imgsz") or self.tiler.tile)
+
+    def analyze(self, frame):
+        if self.gate is not None:
+            with self.timed("gate"):
+                moved = self.gate.should_infer(frame)
+            if not moved and self._gated_results is not None:
+                self.metrics.set("gate_skipped", self.gate.skipped)
+                return self._gated_results
+            self._gated_results = self._analyze(frame)
+            return self._gated_results
+        return self._analyze(frame)
+
+    def _analyze(self, frame):
+        if self.tracker is None:
+            # sans suivi, un stride > 1 réutilise simplement les derniers résultats
+            if self._last_results is not None and self._since_detect + 1 < self.detect_every:
+                self._since_detect += 1
+                return self._last_results
+            self._since_detect = 0
+            self._last_results = self._detect(frame)
+            return self._last_results
+        due = self._since_detect + 1 >= self.detect_every or self.tracker.min_confidence() < self.min_track_conf
+        if not due:
+            self._since_detect += 1
+            with self.timed("track"):
+                return self.tracker.predict()
+        self._since_detect = 0
+        dets = self._detect(frame)
+        if not isinstance(dets, Detections):
+            dets = Detections.from_results(dets)
+        with self.timed("track"):
+            return self.tracker.update(dets)
+
+    def analyze_batch(self, frames: list) -> list:
+        """
+        Un seul appel modèle pour toutes les caméras. Sans état par flux : suivi, ROI,
+        porte de mouvement et stride ne s'appliquent qu'au mode mono-caméra.
+        """
+        if (self.tracker or self.roi or self.gate or self.tiler) and not getattr(self, "_warned_batch", False):
+            self.log.warning("tracking/roi/motion_gate/tiling ignorés en mode multi-caméras")
+            self._warned_batch = True
+        results = self.engine.infer_batch(frames)
+        for stage, ms in self.engine.last_speed.items():
+            self.metrics.observe(stage, ms / 1000.0)
+        self.metrics.tick("inference")
+        return results
+
+    def _detect(self, frame):
+        if self.roi is not None:
+            results = self._detect_roi(frame)
+        else:
+            results = self._full_pass(frame)
+        # découpage pre/inférence/post fourni par le moteur (ms)
+        for stage, ms in self.engine.last_speed.items():
+            self.metrics.observe(stage, ms / 1000.0)
+        self.metrics.tick("inference")
+        return results
+
+    def _detect_roi(self, frame) -> Detections:
+        rects = self.roi.plan(self._last_dets, frame.shape)
+        if rects is None:
+            res = self._full_pass(frame)
+            dets = res if isinstance(res, Detections) else Detections.from_results(res)
+        else:
+            crops = [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in rects.tolist()]
+            results = self.engine.infer_batch(crops, imgsz=self.roi_imgsz)
+            dets = Detections.concat([
+                Detections.from_results(r).translated(x0, y0)
+                for r, (x0, y0, _, _) in zip(results, rects.tolist())
+            ])
+            dets = nms(dets, self.engine.iou)
+        self._last_dets = dets
+        return dets
+
+    def _full_pass(self, frame):
+        """Passe pleine image : inférence directe, ou tuiles en un lot si la frame est grande."""
+        if self.tiler is None or max(frame.shape[:2]) <= self.tiler.min_side:
+            return self.engine.infer(frame)
+        coarse = None
+        if self.tiler.coarse:
+            res = self.engine.infer(frame)
+            coarse = res if isinstance(res, Detections) else Detections.from_results(res)
+        tiles = self.tiler.plan(frame.shape, coarse)
+        if not len(tiles):
+            return coarse
+        from myapp.processing.tiling import merge_tiles
+        rects = tiles.tolist()
+        results = self.engine.infer_batch([frame[y0:y1, x0:x1] for x0, y0, x1, y1 in rects], imgsz=self.tile_imgsz)
+        parts = [merge_tiles([Detections.from_results(r) for r in results], tiles, frame.shape)]
+        if coarse is not None:
+            parts.append(coarse)
+        self.metrics.set("tiles", len(rects))
+        return nms(Detections.concat(parts), self.engine.iou)
+
+    def set_quality(self, imgsz=None, stride=None, **_):
+        if imgsz is not None and imgsz != self.engine.imgsz:
+            self.engine.set_imgsz(imgsz)
+        if stride is not None:
+            self.detect_every = max(1, int(stride))
+
+    def warmup(self):
+        """Première inférence à vide (allocations, noyaux) avant la première vraie frame."""
+        self.engine.warmup()
+
+    def reconfigure(self, changes: dict) -> bool:
+        if not set(changes) <= self.LIVE_KEYS:
+            return False
+        if "imgsz" in changes and not self.engine.set_imgsz(changes["imgsz"]):
+            return False
+        self.engine.set_thresholds(**{k: v for k, v in changes.items() if k in ("conf", "iou", "classes")})
+        if "overlay" in changes:
+            self.engine.set_overlay(changes["overlay"])
+        if "draw_scores" in changes:
+            self.draw_scores = bool(changes["draw_scores"])
+        if "draw_pose" in changes:
+            self.draw_pose = bool(changes["draw_pose"])
+        self.log.info("Paramètres appliqués à chaud: %s", changes)
+        return True
+
+    def render(self, frame, results):
+        with self.timed("draw"):
+            return self.engine.draw(frame, results, draw_scores=self.draw_scores, draw_pose=self.draw_pose)
+
     def process_frame(self, frame):
-        results = self.engine.infer(frame)
-        return self.engine.draw(frame, results, draw_scores=self.draw_scores, draw_pose=self.draw_pose)
+        return self.render(frame, self.analyze(frame))
 
     def close(self):
         if self.engine:
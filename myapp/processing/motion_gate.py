@@ -0,0 +1,70 @@
+from __future__ import annotations
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Décide s'il faut relancer l'inférence. Sur une vignette en niveaux de gris, un pixel
+    « bouge » si son écart absolu avec la dernière frame inférée dépasse `pixel_delta` (0-255,
+    filtre le bruit capteur). Le score est la part de pixels qui bougent, ramenée en 0-255
+    (255 = toute l'image) : threshold=2.0 correspond à ~0,8 % des pixels.
+    Sous `threshold`, les résultats en cache sont réutilisés, au plus `max_age_s` secondes.
+    Augmenter `pixel_delta` ignore les petites variations (bruit, éclairage) ; baisser
+    `threshold` réagit à des mouvements plus petits (moins de pixels).
+    """
+    def __init__(self, threshold: float = 2.0, size: int = 64, max_age_s: float = 2.0, pixel_delta: int = 12):
+        self.threshold = float(threshold)
+        self.size = int(size)
+        self.max_age_s = float(max_age_s)
+        self.pixel_delta = int(pixel_delta)
+        self._ref: np.ndarray | None = None
+        self._cur: np.ndarray | None = None
+        self._diff: np.ndarray | None = None
+        self._ref_time = 0.0
+        self.skipped = 0
+        self.last_score = 0.0
+
+    def _thumb(self, frame) -> np.ndarray:
+        h, w = frame.shape[:2]
+        r = self.size / max(h, w)
+        shape = (max(1, int(h * r)), max(1, int(w * r)))
+        if self._cur is None or self._cur.shape != shape:
+            self._cur = np.empty(shape, np.uint8)
+            self._ref = None
+        small = cv2.resize(frame, (shape[1], shape[0]), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._cur)
+        else:
+            np.copyto(self._cur, small)
+        return self._cur
+
+    def should_infer(self, frame) -> bool:
+        """True si la scène a bougé (ou cache trop vieux) ; la frame devient alors la référence."""
+        cur = self._thumb(frame)
+        now = time.monotonic()
+        if self._ref is None or now - self._ref_time >= self.max_age_s:
+            self._accept(cur, now)
+            return True
+        if self._diff is None or self._diff.shape != cur.shape:
+            self._diff = np.empty_like(cur)
+        cv2.absdiff(cur, self._ref, dst=self._diff)
+        # fraction de pixels qui changent vraiment (robuste au bruit capteur), ramenée en 0-255
+        self.last_score = float(np.count_nonzero(self._diff > self.pixel_delta)) * 255.0 / self._diff.size
+        if self.last_score >= self.threshold:
+            self._accept(cur, now)
+            return True
+        self.skipped += 1
+        return False
+
+    def _accept(self, cur, now):
+        if self._ref is None or self._ref.shape != cur.shape:
+            self._ref = cur.copy()
+        else:
+            np.copyto(self._ref, cur)
+        self._ref_time = now
+
+    def reset(self):
+        self._ref = None
@@ -0,0 +1,269 @@
+from __future__ import annotations
+import logging, multiprocessing as mp, queue, time, traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from myapp.engines.detections import Detections
+from myapp.engines.overlay import OverlayRenderer, OverlayStyle
+from myapp.processing.base import ProcessorFailed, VideoProcessor
+from myapp.utils.logger import ChildLogForwarder
+
+
+def _compact(res):
+    """Résultat renvoyé au process principal : tableaux numpy compacts, jamais d'objets torch."""
+    if res is None or isinstance(res, (Detections, np.ndarray)):
+        return res
+    if isinstance(res, dict):
+        return {k: _compact(v) for k, v in res.items()}
+    if getattr(res, "boxes", None) is not None:
+        return Detections.from_results(res)
+    return res
+
+
+def _worker_main(wid: int, class_path: str, kwargs: dict, settings: dict, log_q, req_q, res_q):
+    from myapp.utils.logger import setup_child_logging
+    from myapp.utils.plugin_loader import _resolve
+    setup_child_logging(log_q, settings.get("logging"))
+    log = logging.getLogger(f"myapp.mp.worker{wid}")
+    proc = _resolve(class_path)(name=kwargs.pop("name", None), config=settings, **kwargs)
+    split = proc.supports_split
+    shms: dict[str, shared_memory.SharedMemory] = {}
+    res_q.put((wid, -1, -1, None, -1, "ready", None))
+    try:
+        while True:
+            msg = req_q.get()
+            if msg is None:
+                break
+            if isinstance(msg, dict):  # paramètres de qualité diffusés par le process principal
+                proc.set_quality(**msg)
+                continue
+            seq, source, shm_name, slot, offset, shape, dtype = msg
+            shm = shms.get(shm_name)
+            if shm is None:
+                shm = shms[shm_name] = shared_memory.SharedMemory(name=shm_name)
+                try:  # le segment appartient au process principal : pas de nettoyage ici
+                    from multiprocessing import resource_tracker
+                    resource_tracker.unregister(shm._name, "shared_memory")
+                except Exception:
+                    pass
+            frame = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf, offset=offset)
+            try:
+                out = _compact(proc.analyze(frame) if split else proc.process_frame(frame.copy()))
+                res_q.put((wid, seq, source, shm_name, slot, out, None))
+            except Exception:
+                res_q.put((wid, seq, source, shm_name, slot, None, traceback.format_exc()))
+            del frame
+    finally:
+        proc.close()
+        for shm in shms.values():
+            shm.close()
+        log.info("Worker %d arrêté", wid)
+
+
+class SharedFrameRing:
+    """Anneau de slots en mémoire partagée ; seul un petit descripteur transite par les files."""
+    def __init__(self, slots: int, slot_bytes: int):
+        self.slots = int(slots)
+        self.slot_bytes = int(slot_bytes)
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+        self.free = list(range(self.slots))
+
+    def fits(self, frame) -> bool:
+        return frame.nbytes <= self.slot_bytes
+
+    def write(self, slot: int, frame) -> tuple:
+        offset = slot * self.slot_bytes
+        dst = np.ndarray(frame.shape, frame.dtype, buffer=self.shm.buf, offset=offset)
+        np.copyto(dst, frame)
+        del dst
+        return self.shm.name, slot, offset, frame.shape, frame.dtype.str
+
+    def close(self):
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class _Worker:
+    def __init__(self, wid: int, ctx, spec: tuple, res_q, failures: int = 0):
+        self.wid = wid
+        self.failures = failures  # morts consécutives sans résultat réussi entre deux
+        self.restart_at: float | None = None
+        self.req_q = ctx.Queue()
+        self.proc = ctx.Process(target=_worker_main, args=(wid, *spec, self.req_q, res_q),
+                                name=f"myapp-infer-{wid}", daemon=True)
+        self.proc.start()
+        self.job: tuple[int, int] | None = None  # (seq, slot) en cours
+        self.ready = False
+
+
+class MultiprocessProcessor(VideoProcessor):
+    """
+    Exécute un VideoProcessor (chemin de classe + kwargs) dans des process séparés, hors GIL.
+    Frames copiées dans un anneau en mémoire partagée ; résultats renvoyés en tableaux compacts
+    (Detections). Un worker mort est détecté et relancé avec un délai croissant (sa frame en cours
+    est abandonnée) ; après `max_restarts` morts consécutives, analyze() lève ProcessorFailed.
+    Avec plusieurs workers, les frames sont réparties : les modules à état (tracking, motion_gate)
+    voient alors un flux entrecoupé — à réserver aux modules sans état ou à workers=1.
+    """
+    def __init__(self, class_path: str, proc_kwargs: dict | None = None, workers: int = 2,
+                 sync: bool = False, timeout_s: float = 5.0, max_restarts: int = 5, **kwargs):
+        super().__init__(name=kwargs.pop("name", "Multiprocess"), **kwargs)
+        proc_kwargs = dict(proc_kwargs or {})
+        self.renderer = OverlayRenderer(OverlayStyle.from_config(proc_kwargs.get("overlay")))
+        self.draw_scores = bool(proc_kwargs.get("draw_scores", True))
+        self.draw_pose = bool(proc_kwargs.get("draw_pose", True)) and proc_kwargs.get("task") == "pose"
+        self.sync = bool(sync)
+        self.timeout_s = float(timeout_s)
+        self.max_restarts = int(max_restarts)
+        self.error: str | None = None
+        self._ctx = mp.get_context("spawn")
+        self._res_q = self._ctx.Queue()
+        self._logs = ChildLogForwarder(self._ctx)  # logs des workers écrits par ce process (rotation sûre)
+        self._spec = (class_path, proc_kwargs, self.config, self._logs.queue)
+        self.workers = [_Worker(i, self._ctx, self._spec, self._res_q) for i in range(max(1, int(workers)))]
+        self.ring: SharedFrameRing | None = None
+        self._seq = 0
+        self._latest: dict[int, tuple[int, object]] = {}  # source (caméra) -> (seq, résultat)
+        self.restarts = 0
+        self._quality: dict = {}
+
+    # --- gestion des workers ---
+    def _ensure_ring(self, frame):
+        if self.ring is not None and self.ring.fits(frame):
+            return
+        if self.ring is not None:
+            # frames plus grandes : on attend les jobs en cours avant de remplacer l'anneau
+            self._drain(until_idle=True)
+            for w in self.workers:
+                w.job = None  # jobs encore en cours (délai dépassé) : abandonnés avec l'ancien anneau
+            self.ring.close()
+        self.ring = SharedFrameRing(2 * len(self.workers), frame.nbytes)
+
+    def _check_alive(self):
+        if self.error:
+            raise ProcessorFailed(self.error)
+        now = time.monotonic()
+        for i, w in enumerate(self.workers):
+            if w.proc.is_alive():
+                continue
+            if w.restart_at is None:  # mort constatée
+                if w.job is not None and self.ring is not None:
+                    self.ring.free.append(w.job[1])
+                w.job = None
+                w.failures += 1
+                if w.failures > self.max_restarts:
+                    self.error = (f"worker {w.wid} mort {w.failures} fois de suite (code {w.proc.exitcode}), "
+                                  "abandon")
+                    self.log.error("%s", self.error)
+                    raise ProcessorFailed(self.error)
+                delay = min(30.0, 0.5 * 2 ** (w.failures - 1))
+                w.restart_at = now + delay
+                self.log.error("Worker %d mort (code %s), redémarrage dans %.1fs", w.wid, w.proc.exitcode, delay)
+            if now < w.restart_at:
+                continue
+            self.workers[i] = _Worker(w.wid, self._ctx, self._spec, self._res_q, failures=w.failures)
+            self.restarts += 1
+            self.metrics.set("mp_restarts", self.restarts)
+
+    def _handle(self, msg):
+        wid, seq, source, shm_name, slot, out, err = msg
+        w = next((w for w in self.workers if w.wid == wid), None)
+        if seq < 0:
+            if w is not None:
+                w.ready = True
+                if self._quality:  # worker (re)lancé : derniers réglages de qualité (imgsz, stride...)
+                    w.req_q.put(dict(self._quality))
+            return
+        if w is not None and w.job is not None and w.job[0] == seq:
+            w.job = None
+        # slot d'un anneau remplacé depuis (job abandonné) : ne rien rendre au nouvel anneau
+        if self.ring is not None and shm_name == self.ring.shm.name and slot not in self.ring.free:
+            self.ring.free.append(slot)
+        if err:
+            self.log.error("Erreur worker %d:\n%s", wid, err)
+            return
+        if w is not None:
+            w.failures = 0
+        if seq > self._latest.get(source, (0, None))[0]:
+            self._latest[source] = (seq, out)
+
+    def _drain(self, until_seq: int | None = None, until_idle: bool = False):
+        deadline = time.monotonic() + self.timeout_s
+        while True:
+            waiting = until_seq is not None and any(w.job and w.job[0] == until_seq for w in self.workers)
+            busy = until_idle and any(w.job for w in self.workers)
+            block = waiting or busy
+            try:
+                msg = self._res_q.get(timeout=0.05) if block else self._res_q.get_nowait()
+            except queue.Empty:
+                if not block:
+                    return
+                self._check_alive()
+                if time.monotonic() > deadline:
+                    self.log.warning("Pas de réponse des workers après %.1fs", self.timeout_s)
+                    return
+                continue
+            self._handle(msg)
+
+    # --- API VideoProcessor ---
+    def analyze(self, frame, source: int = 0):
+        """`source` : caméra d'origine ; chaque caméra ne reçoit que ses propres derniers résultats."""
+        self._check_alive()
+        self._drain()
+        self._ensure_ring(frame)
+        idle = next((w for w in self.workers if w.ready and w.job is None), None)
+        if idle is not None and self.ring.free:
+            self._seq += 1
+            slot = self.ring.free.pop()
+            desc = self.ring.write(slot, frame)
+            idle.job = (self._seq, slot)
+            idle.req_q.put((self._seq, source, *desc))
+            if self.sync:
+                self._drain(until_seq=self._seq)
+        else:
+            self.metrics.inc("mp_skipped")
+        self.metrics.tick("inference")
+        return self._latest.get(source, (0, None))[1]
+
+    def analyze_batch(self, frames: list) -> list:
+        return [self.analyze(f, source=i) for i, f in enumerate(frames)]
+
+    def render(self, frame, results):
+        if results is None:
+            return frame
+        if isinstance(results, np.ndarray):  # module sans analyze/render : frame annotée
+            return results
+        if isinstance(results, dict):
+            for r in results.values():
+                frame = self.render(frame, r)
+            return frame
+        if isinstance(results, Detections):
+            return self.renderer.draw(frame, results, draw_scores=self.draw_scores, draw_pose=self.draw_pose)
+        return frame
+
+    def process_frame(self, frame):
+        return self.render(frame, self.analyze(frame))
+
+    def set_quality(self, **params):
+        self._quality.update({k: v for k, v in params.items() if v is not None})
+        for w in self.workers:
+            w.req_q.put(dict(params))
+
+    def close(self):
+        for w in self.workers:
+            try:
+                w.req_q.put(None)
+            except Exception:
+                pass
+        for w in self.workers:
+            w.proc.join(timeout=2.0)
+            if w.proc.is_alive():
+                w.proc.terminate()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        self._logs.stop()
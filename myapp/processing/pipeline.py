@@ -0,0 +1,129 @@
+from __future__ import annotations
+import logging, threading, time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from myapp.processing.base import VideoProcessor
+from myapp.utils.plugin_loader import load_modules
+
+
+class _Node:
+    """Un module du graphe : sa cadence cible, son calcul en cours et son dernier résultat."""
+    def __init__(self, proc: VideoProcessor, rate_hz: float | None):
+        self.proc = proc
+        self.period = 1.0 / rate_hz if rate_hz else 0.0
+        self.last_start = 0.0
+        self.future: Future | None = None
+        self.results = None
+        self.skipped = 0
+
+    def due(self, now: float) -> bool:
+        return self.future is None and now - self.last_start >= self.period
+
+
+class ProcessorPipeline(VideoProcessor):
+    """
+    Exécute plusieurs modules d'analyse en parallèle sur la même frame (pool de threads),
+    puis une étape finale de composition qui dessine dans l'ordre des modules.
+
+    - chaque module a sa cadence cible (`rate_hz`, None = chaque frame) ;
+    - un module encore occupé est simplement sauté : un module lent ne bloque pas les autres,
+      ses derniers résultats restent affichés ;
+    - sync=True attend les modules lancés sur cette frame (mode batch, résultats alignés).
+    Les modules sans analyze/render (process_frame seul) sont appliqués en série au rendu.
+    """
+    def __init__(self, modules: list[VideoProcessor], rates: dict[str, float] | None = None,
+                 max_workers: int | None = None, sync: bool = False, **kwargs):
+        super().__init__(name=kwargs.pop("name", "Pipeline"), **kwargs)
+        rates = rates or {}
+        self.nodes = [_Node(m, rates.get(m.name)) for m in modules]
+        self.sync = bool(sync)
+        self._lock = threading.Lock()
+        n_split = sum(1 for n in self.nodes if n.proc.supports_split)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers or max(1, n_split), thread_name_prefix="pipeline")
+
+    def _run_node(self, node: _Node, frame):
+        t0 = time.perf_counter()
+        try:
+            res = node.proc.analyze(frame)
+        except Exception:
+            self.log.exception("Erreur module %s", node.proc.name)
+            res = node.results
+        self.metrics.observe(f"module:{node.proc.name}", time.perf_counter() - t0)
+        with self._lock:
+            node.results = res
+            node.future = None
+        return res
+
+    def analyze(self, frame):
+        now = time.monotonic()
+        launched = []
+        shared = None
+        with self._lock:
+            for node in self.nodes:
+                if not node.proc.supports_split:
+                    continue
+                if node.due(now):
+                    if shared is None:
+                        # sans attente, l'appelant dessine sur `frame` pendant que les modules la lisent
+                        shared = frame if self.sync else frame.copy()
+                    node.last_start = now
+                    node.future = self.pool.submit(self._run_node, node, shared)
+                    launched.append(node.future)
+                elif node.future is not None:
+                    node.skipped += 1
+        if self.sync and launched:
+            wait(launched)
+        with self._lock:
+            return {n.proc.name: n.results for n in self.nodes if n.proc.supports_split}
+
+    def analyze_batch(self, frames: list) -> list:
+        """Multi-caméras : chaque module traite le lot complet, modules en parallèle (synchrone)."""
+        nodes = [n for n in self.nodes if n.proc.supports_split]
+        futures = {n.proc.name: self.pool.submit(n.proc.analyze_batch, frames) for n in nodes}
+        per_module = {}
+        for name, fut in futures.items():
+            try:
+                per_module[name] = fut.result()
+            except Exception:
+                self.log.exception("Erreur module %s", name)
+                per_module[name] = [None] * len(frames)
+        return [{name: res[i] for name, res in per_module.items()} for i in range(len(frames))]
+
+    def render(self, frame, results):
+        results = results or {}
+        for node in self.nodes:
+            try:
+                if node.proc.supports_split:
+                    frame = node.proc.render(frame, results.get(node.proc.name))
+                else:
+                    frame = node.proc.process_frame(frame)
+            except Exception:
+                self.log.exception("Erreur rendu %s", node.proc.name)
+        return frame
+
+    def process_frame(self, frame):
+        return self.render(frame, self.analyze(frame))
+
+    def set_quality(self, **params):
+        for node in self.nodes:
+            node.proc.set_quality(**params)
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        for node in self.nodes:
+            try:
+                node.proc.close()
+            except Exception:
+                self.log.exception("close() %s", node.proc.name)
+
+
+def build_pipeline(settings: dict, sync: bool = False) -> ProcessorPipeline:
+    """Pipeline depuis processing.modules (plugin_loader) ; `rate_hz` par module, `pipeline.max_workers`."""
+    proc_cfg = settings.get("processing", {}) or {}
+    rates = {m.get("name"): m.get("rate_hz") for m in proc_cfg.get("modules", []) if m.get("rate_hz")}
+    modules = load_modules(settings)
+    logging.getLogger("myapp.pipeline").info(
+        "Pipeline: %s", ", ".join(f"{m.name}@{rates.get(m.name) or 'max'}Hz" for m in modules) or "(vide)")
+    pipe_cfg = proc_cfg.get("pipeline", {}) or {}
+    return ProcessorPipeline(modules, rates=rates, max_workers=pipe_cfg.get("max_workers"),
+                             sync=sync, config=settings)
@@ -0,0 +1,270 @@
+from __future__ import annotations
+import json, logging, os, queue, shutil, threading, time
+from pathlib import Path
+
+import numpy as np
+
+from myapp.engines.detections import Detections
+
+FRAME_DTYPE = np.dtype([("seq", "<i8"), ("ts", "<f8"), ("source", "<i2"), ("count", "<i4")])
+
+
+def det_dtype(nkpt: int = 21) -> np.dtype:
+    """Une ligne par détection ; `kpts` (K, 3) absent si nkpt=0 (modèles detect)."""
+    fields = [("seq", "<i8"), ("ts", "<f8"), ("source", "<i2"), ("box", "<f4", (4,)),
+              ("score", "<f4"), ("cls", "<i4"), ("track_id", "<i4")]
+    if nkpt:
+        fields.append(("kpts", "<f4", (int(nkpt), 3)))
+    return np.dtype(fields)
+
+
+def _parquet():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        return pa, pq
+    except ImportError:
+        return None
+
+
+def as_detections(results) -> Detections | None:
+    """Detections depuis un résultat de processor (Detections, Results Ultralytics, dict de pipeline)."""
+    if results is None or isinstance(results, Detections):
+        return results
+    if isinstance(results, dict):
+        return Detections.concat([as_detections(r) for r in results.values()])
+    if getattr(results, "boxes", None) is not None:
+        return Detections.from_results(results)
+    return None
+
+
+class DetectionRecorder:
+    """
+    Enregistre les détections par frame dans des tableaux numpy structurés préalloués
+    (double tampon) ; un thread écrit chaque tampon plein comme un chunk colonnaire
+    en ajout seul : `chunk_000001/` avec un .npy par colonne (mappable en mémoire), ou
+    un .parquet par table si format="parquet" et pyarrow est installé, plus un meta.json
+    (nombre de lignes, ts min/max) qui permet aux lecteurs d'écarter le chunk sans le lire.
+    add() ne fait que des copies vectorisées : aucune E/S ni sérialisation dans l'appelant.
+    """
+    def __init__(self, out_dir: str = "recordings", chunk_rows: int = 65536, nkpt: int = 21,
+                 fmt: str = "npy", max_buffers: int = 4):
+        self.log = logging.getLogger("myapp.recorder")
+        self.dir = Path(out_dir) / time.strftime("%Y%m%d-%H%M%S")
+        self.dir.mkdir(parents=True, exist_ok=True)
+        if fmt == "parquet" and _parquet() is None:
+            self.log.warning("pyarrow absent : enregistrement en .npy")
+            fmt = "npy"
+        self.fmt = fmt
+        self.chunk_rows = int(chunk_rows)
+        self.dtype = det_dtype(nkpt)
+        self.nkpt = int(nkpt)
+        self._free: queue.Queue = queue.Queue()
+        self._allocated = 0
+        self.max_buffers = max(2, int(max_buffers))
+        self._frames, self._dets = self._take_buffers()
+        self._nf = self._nd = 0
+        self._chunk = 0
+        self._lock = threading.Lock()
+        self._q: queue.Queue = queue.Queue()
+        self._mono_to_wall = time.time() - time.monotonic()
+        self.dropped_frames = 0
+        self.written_rows = 0
+        self._thread = threading.Thread(target=self._writer, name="recorder", daemon=True)
+        self._thread.start()
+        self.log.info("Enregistrement des détections dans %s (%s)", self.dir, self.fmt)
+
+    def _take_buffers(self):
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            if self._allocated >= self.max_buffers:
+                return None
+            self._allocated += 1
+            return np.zeros(self.chunk_rows, FRAME_DTYPE), np.zeros(self.chunk_rows, self.dtype)
+
+    def add(self, seq: int, ts: float, source: int, results):
+        """`ts` : horodatage monotonic de capture (converti en temps réel)."""
+        dets = as_detections(results)
+        n = min(len(dets), self.chunk_rows) if dets is not None else 0
+        wall = ts + self._mono_to_wall
+        with self._lock:
+            if self._nf >= self.chunk_rows or self._nd + n > self.chunk_rows:
+                self._flush_locked()
+            if self._frames is None:  # écrivain en retard et plus de tampon libre
+                self._frames, self._dets = self._take_buffers() or (None, None)
+                if self._frames is None:
+                    self.dropped_frames += 1
+                    return
+            f = self._frames[self._nf]
+            f["seq"], f["ts"], f["source"], f["count"] = seq, wall, source, n
+            self._nf += 1
+            if not n:
+                return
+            d = self._dets[self._nd:self._nd + n]
+            d["seq"], d["ts"], d["source"] = seq, wall, source
+            d["box"] = dets.boxes[:n]
+            d["score"] = dets.scores[:n]
+            d["cls"] = dets.classes[:n]
+            d["track_id"] = dets.track_ids[:n] if dets.track_ids is not None else -1
+            if self.nkpt:
+                k = dets.keypoints
+                d["kpts"] = k[:n] if k is not None and k.shape[1:] == (self.nkpt, 3) else np.nan
+            self._nd += n
+
+    def _flush_locked(self):
+        if self._frames is None or not self._nf:
+            return
+        self._chunk += 1
+        self._q.put((self._chunk, self._frames, self._nf, self._dets, self._nd))
+        self._frames, self._dets = self._take_buffers() or (None, None)
+        self._nf = self._nd = 0
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    # --- écriture (thread) ---
+    def _write_chunk(self, cid: int, frames, dets):
+        final = self.dir / f"chunk_{cid:06d}"
+        tmp = self.dir / f".chunk_{cid:06d}.tmp"
+        tmp.mkdir(exist_ok=True)
+        for table, arr in (("frames", frames), ("dets", dets)):
+            if self.fmt == "parquet":
+                pa, pq = _parquet()
+                cols = {}
+                for name in arr.dtype.names:
+                    col = np.ascontiguousarray(arr[name]).reshape(len(arr), -1)
+                    cols[name] = (pa.array(col[:, 0]) if col.shape[1] == 1 else
+                                  pa.FixedSizeListArray.from_arrays(pa.array(col.ravel()), col.shape[1]))
+                pq.write_table(pa.table(cols), tmp / f"{table}.parquet")
+            else:
+                for name in arr.dtype.names:
+                    np.save(tmp / f"{table}.{name}.npy", np.ascontiguousarray(arr[name]))
+        ts = dets["ts"]
+        meta = {"frames": len(frames), "dets": len(dets),
+                "ts_min": float(ts.min()) if len(ts) else None, "ts_max": float(ts.max()) if len(ts) else None}
+        (tmp / "meta.json").write_text(json.dumps(meta))
+        os.replace(tmp, final)  # chunk visible d'un bloc : les lecteurs ne voient jamais de chunk partiel
+
+    def _writer(self):
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            cid, frames, nf, dets, nd = item
+            try:
+                self._write_chunk(cid, frames[:nf], dets[:nd])
+                self.written_rows += nd
+            except Exception:
+                self.log.exception("Écriture du chunk %d", cid)
+                shutil.rmtree(self.dir / f".chunk_{cid:06d}.tmp", ignore_errors=True)
+            self._free.put((frames, dets))
+
+    def close(self):
+        self.flush()
+        self._q.put(None)
+        self._thread.join(timeout=10.0)
+        self.log.info("Enregistrement terminé : %d détections, %d frames perdues", self.written_rows, self.dropped_frames)
+
+
+class RecordingReader:
+    """
+    Lecture hors-ligne d'une session : colonnes mappées en mémoire chunk par chunk,
+    seules les colonnes demandées sont touchées.
+
+        rec = RecordingReader("recordings/20240101-120000")
+        hits = rec.query(t0=..., classes=[0], min_score=0.5, fields=("ts", "box"))
+    """
+    def __init__(self, path):
+        self.dir = Path(path)
+        self.chunks = sorted(p for p in self.dir.glob("chunk_*") if p.is_dir())
+
+    def _columns(self, chunk: Path, table: str, fields) -> dict:
+        pq_file = chunk / f"{table}.parquet"
+        if pq_file.exists():
+            pa, pq = _parquet()
+            t = pq.read_table(pq_file, columns=list(fields), memory_map=True)
+            out = {}
+            for name in fields:
+                col = t.column(name).combine_chunks()
+                if isinstance(col.type, pa.FixedSizeListType):
+                    out[name] = col.flatten().to_numpy().reshape(len(col), col.type.list_size)
+                else:
+                    out[name] = col.to_numpy()
+            if "kpts" in out:
+                out["kpts"] = out["kpts"].reshape(len(out["kpts"]), -1, 3)
+            return out
+        return {name: np.load(chunk / f"{table}.{name}.npy", mmap_mode="r") for name in fields}
+
+    def _ts_range(self, chunk: Path):
+        """(min, max) des `ts` de détection du chunk : meta.json, sinon calculé sur la colonne."""
+        try:
+            meta = json.loads((chunk / "meta.json").read_text())
+            return meta["ts_min"], meta["ts_max"]
+        except (OSError, ValueError, KeyError):
+            ts = self._columns(chunk, "dets", ("ts",))["ts"]
+            return (float(ts.min()), float(ts.max())) if len(ts) else (None, None)
+
+    def fields(self, table: str = "dets") -> list[str]:
+        if not self.chunks:
+            return []
+        c = self.chunks[0]
+        if (c / f"{table}.parquet").exists():
+            _, pq = _parquet()
+            return pq.read_schema(c / f"{table}.parquet").names
+        return sorted(p.name.split(".")[1] for p in c.glob(f"{table}.*.npy"))
+
+    def iter_chunks(self, table: str = "dets", fields=None):
+        """Un dict {colonne: tableau mappé} par chunk."""
+        fields = tuple(fields or self.fields(table))
+        for chunk in self.chunks:
+            yield self._columns(chunk, table, fields)
+
+    def frames(self, fields=None) -> dict:
+        return self._concat(self.iter_chunks("frames", fields))
+
+    def query(self, t0: float | None = None, t1: float | None = None, source: int | None = None,
+              classes=None, min_score: float | None = None, fields=None) -> dict:
+        """Détections filtrées ; seules les lignes retenues sont copiées hors des fichiers."""
+        fields = tuple(fields or self.fields("dets"))
+        keys = {"ts", "source", "cls", "score"}
+        parts = []
+        for chunk in self.chunks:
+            lo, hi = self._ts_range(chunk)
+            if lo is None or (t0 is not None and hi < t0) or (t1 is not None and lo > t1):
+                continue  # chunk vide ou hors de la fenêtre (plusieurs sources : ts non triés)
+            cols = self._columns(chunk, "dets", tuple(keys | set(fields)))
+            ts = cols["ts"]
+            mask = np.ones(len(ts), bool)
+            if t0 is not None:
+                mask &= ts >= t0
+            if t1 is not None:
+                mask &= ts <= t1
+            if source is not None:
+                mask &= cols["source"] == source
+            if classes is not None:
+                mask &= np.isin(cols["cls"], classes)
+            if min_score is not None:
+                mask &= cols["score"] >= min_score
+            idx = np.flatnonzero(mask)
+            if len(idx):
+                parts.append({f: np.asarray(cols[f][idx]) for f in fields})
+        return self._concat(iter(parts), fields)
+
+    @staticmethod
+    def _concat(chunks, fields=None) -> dict:
+        parts = list(chunks)
+        if not parts:
+            return {f: np.zeros(0) for f in (fields or ())}
+        return {k: np.concatenate([np.asarray(p[k]) for p in parts]) for k in parts[0]}
+
+    def summary(self) -> dict:
+        fr = self.frames(("ts", "count"))
+        n = len(fr.get("ts", ()))
+        return {
+            "chunks": len(self.chunks),
+            "frames": n,
+            "detections": int(fr["count"].sum()) if n else 0,
+            "duration_s": float(fr["ts"].max() - fr["ts"].min()) if n else 0.0,
+        }
@@ -0,0 +1,63 @@
+from __future__ import annotations
+import numpy as np
+
+from myapp.engines.detections import Detections
+
+
+def expand_boxes(boxes: np.ndarray, margin: float, min_size: int, shape) -> np.ndarray:
+    """Boîtes agrandies (marge relative au plus grand côté, taille min), bornées à l'image ; int32 xyxy."""
+    h, w = shape[:2]
+    cx = (boxes[:, 0] + boxes[:, 2]) / 2
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2
+    side = np.maximum(np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]) * (1 + 2 * margin), min_size)
+    half = side / 2
+    out = np.stack([cx - half, cy - half, cx + half, cy + half], axis=1)
+    out[:, 0::2] = np.clip(out[:, 0::2], 0, w)
+    out[:, 1::2] = np.clip(out[:, 1::2], 0, h)
+    return np.rint(out).astype(np.int32)
+
+
+def merge_rects(rects: np.ndarray) -> np.ndarray:
+    """Fusionne (union englobante) les rectangles qui se chevauchent, jusqu'à stabilité."""
+    rects = [r.copy() for r in rects]
+    merged = True
+    while merged and len(rects) > 1:
+        merged = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                a, b = rects[i], rects[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    rects[i] = np.array([min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])], np.int32)
+                    del rects[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return np.array(rects, np.int32).reshape(-1, 4)
+
+
+class RoiPlanner:
+    """
+    Choisit les régions à inférer d'après les détections précédentes :
+    boîtes + marge, fusionnées quand elles se chevauchent. Retourne None pour demander
+    une passe pleine image (périodique, pas de détection précédente, ou ROI trop étendues).
+    """
+    def __init__(self, margin: float = 0.5, min_size: int = 160, full_every: int = 15,
+                 max_area_ratio: float = 0.5):
+        self.margin = float(margin)
+        self.min_size = int(min_size)
+        self.full_every = max(1, int(full_every))
+        self.max_area_ratio = float(max_area_ratio)
+        self._count = 0
+
+    def plan(self, prev: Detections | None, shape) -> np.ndarray | None:
+        self._count += 1
+        if prev is None or len(prev) == 0 or self._count >= self.full_every:
+            self._count = 0
+            return None
+        rects = merge_rects(expand_boxes(prev.boxes, self.margin, self.min_size, shape))
+        area = float(((rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])).sum())
+        if area > self.max_area_ratio * shape[0] * shape[1]:
+            self._count = 0
+            return None
+        return rects
@@ -0,0 +1,146 @@
+from __future__ import annotations
+import numpy as np
+
+from myapp.engines.detections import Detections
+from myapp.processing.roi import expand_boxes
+
+
+def _starts(length: int, tile: int, overlap: int) -> np.ndarray:
+    """Origines des tuiles sur un axe : pas régulier, dernière tuile collée au bord."""
+    if length <= tile:
+        return np.zeros(1, np.int32)
+    n = int(np.ceil((length - overlap) / (tile - overlap)))
+    return np.rint(np.linspace(0, length - tile, max(2, n))).astype(np.int32)
+
+
+def tile_grid(shape, tile: int, overlap: int) -> np.ndarray:
+    """Grille de tuiles qui se recouvrent de `overlap` pixels ; int32 xyxy (M, 4)."""
+    h, w = shape[:2]
+    xs, ys = _starts(w, tile, overlap), _starts(h, tile, overlap)
+    gx, gy = np.meshgrid(xs, ys)
+    x0, y0 = gx.ravel(), gy.ravel()
+    return np.stack([x0, y0, np.minimum(x0 + tile, w), np.minimum(y0 + tile, h)], axis=1).astype(np.int32)
+
+
+def intersecting(tiles: np.ndarray, rects: np.ndarray) -> np.ndarray:
+    """Masque des tuiles qui touchent au moins un rectangle (broadcast (M, R))."""
+    if len(rects) == 0:
+        return np.zeros(len(tiles), bool)
+    t, r = tiles[:, None, :], rects[None, :, :]
+    hit = (t[..., 0] < r[..., 2]) & (r[..., 0] < t[..., 2]) & (t[..., 1] < r[..., 3]) & (r[..., 1] < t[..., 3])
+    return hit.any(axis=1)
+
+
+def cut_mask(dets: Detections, tile, shape, margin: int = 2) -> np.ndarray:
+    """Boîtes (coordonnées tuile) qui touchent un bord intérieur de la tuile ; les bords de l'image ne comptent pas."""
+    x0, y0, x1, y1 = tile
+    h, w = shape[:2]
+    b = dets.boxes
+    cut = np.zeros(len(dets), bool)
+    if x0 > 0:
+        cut |= b[:, 0] <= margin
+    if y0 > 0:
+        cut |= b[:, 1] <= margin
+    if x1 < w:
+        cut |= b[:, 2] >= (x1 - x0) - margin
+    if y1 < h:
+        cut |= b[:, 3] >= (y1 - y0) - margin
+    return cut
+
+
+def contained(boxes: np.ndarray, tiles: np.ndarray, shape, margin: int = 2) -> np.ndarray:
+    """Boîtes (coordonnées image) vues entières par au moins une tuile : à l'écart de ses bords intérieurs."""
+    if len(boxes) == 0 or len(tiles) == 0:
+        return np.zeros(len(boxes), bool)
+    h, w = shape[:2]
+    t, b = tiles[None, :, :], boxes[:, None, :]
+    inside = (((t[..., 0] == 0) | (b[..., 0] > t[..., 0] + margin))
+              & ((t[..., 1] == 0) | (b[..., 1] > t[..., 1] + margin))
+              & ((t[..., 2] == w) | (b[..., 2] < t[..., 2] - margin))
+              & ((t[..., 3] == h) | (b[..., 3] < t[..., 3] - margin)))
+    return inside.any(axis=1)
+
+
+def fuse_fragments(dets: Detections) -> Detections:
+    """
+    Réunit les morceaux d'une même main coupée par plusieurs tuiles (même classe, boîtes qui
+    se touchent) : boîte englobante, meilleur score, keypoints les plus sûrs de chaque morceau.
+    """
+    n = len(dets)
+    if n < 2:
+        return dets
+    b = dets.boxes
+    touch = ((b[:, None, 0] <= b[None, :, 2]) & (b[None, :, 0] <= b[:, None, 2])
+             & (b[:, None, 1] <= b[None, :, 3]) & (b[None, :, 1] <= b[:, None, 3])
+             & (dets.classes[:, None] == dets.classes[None, :]))
+    group = np.arange(n)
+    for i, j in zip(*np.nonzero(np.triu(touch, 1))):  # composantes connexes (n petit)
+        gi, gj = group[i], group[j]
+        if gi != gj:
+            group[group == gj] = gi
+    out = []
+    for g in np.unique(group):
+        idx = np.flatnonzero(group == g)
+        best = idx[np.argmax(dets.scores[idx])]
+        part = dets.select([best])
+        if len(idx) > 1:
+            part.boxes = np.concatenate([b[idx, :2].min(axis=0), b[idx, 2:].max(axis=0)])[None].astype(np.float32)
+            if dets.keypoints is not None:
+                k = dets.keypoints[idx]
+                part.keypoints = k[np.argmax(k[..., 2], axis=0), np.arange(k.shape[1])][None]
+        out.append(part)
+    return Detections.concat(out)
+
+
+def merge_tiles(per_tile: list[Detections], tiles: np.ndarray, shape, margin: int = 2) -> Detections:
+    """
+    Détections par tuile -> coordonnées image. Une boîte coupée par un bord intérieur est
+    écartée seulement si une autre tuile inférée la voit entière ; sinon (main plus large que
+    le recouvrement) ses morceaux sont réunis. La NMS finale reste à la charge de l'appelant.
+    """
+    whole, cut = [], []
+    for dets, t in zip(per_tile, np.asarray(tiles).tolist()):
+        if len(dets) == 0:
+            continue
+        mask = cut_mask(dets, t, shape, margin)
+        moved = dets.translated(t[0], t[1])
+        whole.append(moved.select(~mask))
+        cut.append(moved.select(mask))
+    cut = Detections.concat(cut)
+    orphans = cut.select(~contained(cut.boxes, np.asarray(tiles), shape, margin))
+    return Detections.concat(whole + [fuse_fragments(orphans)])
+
+
+class TilePlanner:
+    """
+    Découpe les frames haute résolution en tuiles recouvrantes, inférées en un seul lot.
+    - frames dont le plus grand côté est <= `min_side` : pas de découpe (None) ;
+    - coarse=True : seules les tuiles touchant les zones signalées par la passe pleine image
+      (boîtes + marge) sont inférées.
+    """
+    def __init__(self, tile: int = 640, overlap: int = 128, min_side: int = 1280,
+                 coarse: bool = False, margin: float = 1.0):
+        self.tile = int(tile)
+        self.overlap = int(min(overlap, self.tile // 2))
+        self.min_side = int(min_side)
+        self.coarse = bool(coarse)
+        self.margin = float(margin)
+        self._grid_shape = None
+        self._grid = None
+
+    def grid(self, shape) -> np.ndarray:
+        if self._grid_shape != shape[:2]:
+            self._grid_shape = shape[:2]
+            self._grid = tile_grid(shape, self.tile, self.overlap)
+        return self._grid
+
+    def plan(self, shape, flagged: Detections | None = None) -> np.ndarray | None:
+        if max(shape[:2]) <= self.min_side:
+            return None
+        tiles = self.grid(shape)
+        if not self.coarse:
+            return tiles
+        if flagged is None or len(flagged) == 0:
+            return tiles[:0]
+        zones = expand_boxes(flagged.boxes, self.margin, self.tile // 4, shape)
+        return tiles[intersecting(tiles, zones)]
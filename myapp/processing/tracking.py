@@ -0,0 +1,176 @@
+from __future__ import annotations
+import numpy as np
+
+from myapp.engines.detections import Detections
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU (len(a), len(b)) entre deux ensembles de boîtes xyxy, vectorisé."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+
+def greedy_match(iou: np.ndarray, thres: float) -> list[tuple[int, int]]:
+    """Associations (ligne, colonne) par IoU décroissante, au-dessus du seuil."""
+    pairs = []
+    if iou.size == 0:
+        return pairs
+    rows, cols = np.nonzero(iou >= thres)
+    order = np.argsort(-iou[rows, cols])
+    used_r, used_c = set(), set()
+    for k in order.tolist():
+        r, c = int(rows[k]), int(cols[k])
+        if r in used_r or c in used_c:
+            continue
+        used_r.add(r); used_c.add(c)
+        pairs.append((r, c))
+    return pairs
+
+
+def _xyxy_to_cxcywh(b):
+    return np.array([(b[0] + b[2]) / 2, (b[1] + b[3]) / 2, b[2] - b[0], b[3] - b[1]], np.float64)
+
+
+def _cxcywh_to_xyxy(s):
+    cx, cy, w, h = s[:4]
+    return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], np.float32)
+
+
+class _KalmanBox:
+    """Filtre de Kalman vitesse constante sur (cx, cy, w, h), pas = 1 frame (à la SORT)."""
+    _F = np.eye(8)
+    _F[:4, 4:] = np.eye(4)
+    _H = np.eye(4, 8)
+
+    def __init__(self, box):
+        self.x = np.zeros(8)
+        self.x[:4] = _xyxy_to_cxcywh(box)
+        h = max(self.x[3], 1.0)
+        self.P = np.diag(np.square([h / 10, h / 10, h / 10, h / 10, h / 16, h / 16, h / 16, h / 16]))
+
+    def predict(self):
+        h = max(self.x[3], 1.0)
+        q = np.square([h / 20, h / 20, h / 20, h / 20, h / 160, h / 160, h / 160, h / 160])
+        self.x = self._F @ self.x
+        self.x[2:4] = np.maximum(self.x[2:4], 1.0)
+        self.P = self._F @ self.P @ self._F.T + np.diag(q)
+
+    def update(self, box):
+        h = max(self.x[3], 1.0)
+        R = np.diag(np.square([h / 20, h / 20, h / 20, h / 20]))
+        z = _xyxy_to_cxcywh(box)
+        S = self._H @ self.P @ self._H.T + R
+        K = self.P @ self._H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - self._H @ self.x)
+        self.P = (np.eye(8) - K @ self._H) @ self.P
+
+    @property
+    def box(self) -> np.ndarray:
+        return _cxcywh_to_xyxy(self.x)
+
+
+class _Track:
+    def __init__(self, tid: int, box, score: float, cls: int, kpts):
+        self.id = tid
+        self.kf = _KalmanBox(box)
+        self.score = float(score)
+        self.cls = int(cls)
+        self.since_update = 0
+        self._set_kpts(box, kpts)
+
+    def _set_kpts(self, box, kpts):
+        # keypoints mémorisés relativement à la boîte : ils suivent translation et échelle
+        if kpts is None:
+            self.rel_kpts = None
+            return
+        wh = np.maximum(box[2:4] - box[:2], 1.0)
+        self.rel_kpts = kpts.copy()
+        self.rel_kpts[:, :2] = (kpts[:, :2] - box[:2]) / wh
+
+    def update(self, box, score, cls, kpts):
+        self.kf.update(box)
+        self.score, self.cls = float(score), int(cls)
+        self.since_update = 0
+        self._set_kpts(self.kf.box, kpts)
+
+    def keypoints(self, box):
+        if self.rel_kpts is None:
+            return None
+        k = self.rel_kpts.copy()
+        k[:, :2] = box[:2] + k[:, :2] * np.maximum(box[2:4] - box[:2], 1.0)
+        return k
+
+
+class HandTracker:
+    """
+    Suivi léger entre deux inférences : Kalman par piste + association IoU gloutonne.
+    Chaque piste garde un identifiant stable ; sa confiance décroît à chaque frame prédite.
+    """
+    def __init__(self, iou_thres: float = 0.3, max_age: int = 15, decay: float = 0.95):
+        self.iou_thres = float(iou_thres)
+        self.max_age = int(max_age)
+        self.decay = float(decay)
+        self.tracks: list[_Track] = []
+        self._next_id = 1
+
+    def predict(self) -> Detections:
+        """Avance toutes les pistes d'une frame sans détection."""
+        for t in self.tracks:
+            t.kf.predict()
+            t.since_update += 1
+            t.score *= self.decay
+        self.tracks = [t for t in self.tracks if t.since_update <= self.max_age]
+        return self.output()
+
+    def update(self, dets: Detections) -> Detections:
+        """Prédit puis corrige avec les détections de la frame courante."""
+        for t in self.tracks:
+            t.kf.predict()
+            t.since_update += 1
+        boxes = np.stack([t.kf.box for t in self.tracks]) if self.tracks else np.zeros((0, 4), np.float32)
+        matches = greedy_match(iou_matrix(boxes, dets.boxes), self.iou_thres)
+        matched_d = set()
+        for ti, di in matches:
+            kp = dets.keypoints[di] if dets.keypoints is not None else None
+            self.tracks[ti].update(dets.boxes[di], dets.scores[di], dets.classes[di], kp)
+            matched_d.add(di)
+        for di in range(len(dets)):
+            if di in matched_d:
+                continue
+            kp = dets.keypoints[di] if dets.keypoints is not None else None
+            self.tracks.append(_Track(self._next_id, dets.boxes[di], dets.scores[di], dets.classes[di], kp))
+            self._next_id += 1
+        # les pistes non revues décroissent, puis disparaissent après max_age frames
+        for t in self.tracks:
+            if t.since_update:
+                t.score *= self.decay
+        self.tracks = [t for t in self.tracks if t.since_update <= self.max_age]
+        return self.output()
+
+    def min_confidence(self) -> float:
+        return min((t.score for t in self.tracks), default=1.0)
+
+    def output(self) -> Detections:
+        if not self.tracks:
+            return Detections.empty()
+        boxes = np.stack([t.kf.box for t in self.tracks]).astype(np.float32)
+        kp = [t.keypoints(b) for t, b in zip(self.tracks, boxes)]
+        kpts = np.stack(kp).astype(np.float32) if all(k is not None for k in kp) else None
+        return Detections(
+            boxes,
+            np.array([t.score for t in self.tracks], np.float32),
+            np.array([t.cls for t in self.tracks], np.int32),
+            kpts,
+            track_ids=np.array([t.id for t in self.tracks], np.int32),
+        )
+
+    def reset(self):
+        self.tracks.clear()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+import logging, threading, time
+from dataclasses import dataclass
+from typing import Any
+
+from PySide6.QtCore import QThread, Signal
+
+from myapp.processing.base import ProcessorFailed
+
+
+@dataclass
+class InferenceResult:
+    """Sortie du worker : résultats bruts (modules analyze/render) ou frame annotée."""
+    seq: int
+    results: Any = None
+    frame: Any = None
+    duration: float = 0.0
+    source: int = 0
+    ts: float = 0.0  # horodatage monotonic de capture
+    frame_seq: int = 0  # n° de frame de la source (trous = frames perdues)
+
+
+class InferenceWorker(QThread):
+    """
+    Exécute le VideoProcessor actif hors du thread GUI.
+    Une seule frame en attente au maximum par source : submit() remplace la précédente
+    (politique drop-oldest), l'UI ne prend donc jamais de retard sur l'inférence.
+
+    Multi-caméras (sources > 1) : dès qu'une frame arrive, le worker attend au plus
+    `batch_window_ms` les autres sources, puis envoie le groupe en un seul lot
+    (processor.analyze_batch). Un InferenceResult est émis par source.
+    """
+    resultReady = Signal(object)  # InferenceResult
+    failed = Signal(str)  # processor hors service (ProcessorFailed) : le worker s'arrête
+
+    def __init__(self, processor, parent=None, sources: int = 1, batch_window_ms: float = 10.0):
+        super().__init__(parent)
+        self.processor = processor
+        self.log = logging.getLogger("myapp.worker")
+        self.sources = max(1, int(sources))
+        self.batch_window_s = max(0.0, float(batch_window_ms)) / 1000.0
+        self._cond = threading.Condition()
+        self._pending: dict[int, tuple] = {}  # source -> (seq, frame, ts, frame_seq)
+        self._running = True
+        self._seq = 0
+        self.dropped = 0
+        self.processed = 0
+
+    def submit(self, frame, source: int = 0, ts: float | None = None, frame_seq: int = 0) -> int:
+        """Dépose une copie de la frame pour inférence ; retourne son numéro."""
+        frame = frame.copy()  # l'UI dessine ensuite sur l'original
+        with self._cond:
+            if source in self._pending:
+                self.dropped += 1
+            self._seq += 1
+            self._pending[source] = (self._seq, frame, time.monotonic() if ts is None else ts, frame_seq)
+            self._cond.notify()
+            return self._seq
+
+    def _take_group(self) -> dict[int, tuple] | None:
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or not self._running)
+            if not self._running:
+                return None
+            if self.sources > 1 and len(self._pending) < self.sources and self.batch_window_s > 0:
+                self._cond.wait_for(lambda: len(self._pending) >= self.sources or not self._running,
+                                    self.batch_window_s)
+            group, self._pending = self._pending, {}
+            return group
+
+    def run(self):
+        split = self.processor.supports_split
+        while True:
+            group = self._take_group()
+            if group is None:
+                return
+            sources = sorted(group)
+            frames = [group[s][1] for s in sources]
+            t0 = time.perf_counter()
+            try:
+                if split:
+                    # multi-caméras : toujours analyze_batch (pas d'état par flux mélangé entre caméras)
+                    res = self.processor.analyze_batch(frames) if self.sources > 1 else [self.processor.analyze(frames[0])]
+                    outs = [InferenceResult(group[s][0], results=r, source=s, ts=group[s][2], frame_seq=group[s][3])
+                            for s, r in zip(sources, res)]
+                else:
+                    outs = [InferenceResult(group[s][0], frame=self.processor.process_frame(f), source=s,
+                                            ts=group[s][2], frame_seq=group[s][3])
+                            for s, f in zip(sources, frames)]
+            except ProcessorFailed as e:
+                self.failed.emit(str(e))
+                return
+            except Exception:
+                self.log.exception("Erreur traitement %s", self.processor.name)
+                continue
+            duration = time.perf_counter() - t0
+            for out in outs:
+                out.duration = duration
+                self.processed += 1
+                self.resultReady.emit(out)
+
+    def stop(self, timeout_ms: int = 2000) -> bool:
+        """Demande l'arrêt ; False si une inférence tourne encore après `timeout_ms` (le thread finira seul)."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if not self.wait(timeout_ms):
+            self.log.warning("Worker d'inférence non arrêté après %d ms", timeout_ms)
+            return False
+        return True
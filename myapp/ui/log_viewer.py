@@ -1,30 +1,139 @@
 from __future__ import annotations
-import os
+import os, re, threading
+from collections import deque
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QTabWidget, QTextEdit,
-    QDialogButtonBox, QPushButton, QFileDialog, QWidget, QHBoxLayout
+    QDialog, QVBoxLayout, QTabWidget, QPlainTextEdit, QComboBox, QLineEdit, QLabel,
+    QDialogButtonBox, QPushButton, QWidget, QHBoxLayout
 )
-from PySide6.QtCore import QTimer
-from PySide6.QtGui import QTextCursor
+from PySide6.QtCore import QThread, Signal
+
+_LEVEL_RE = re.compile(r"^\[(DEBUG|INFO|WARNING|ERROR|CRITICAL)\]")
+_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+
+class LogTail:
+    """
+    Lecture incrémentale d'un fichier de log : seuls les octets ajoutés depuis le dernier
+    appel sont lus. Rotation (autre inode) ou troncature (taille < offset) : reprise au début.
+    À l'ouverture, seuls les `initial_bytes` derniers octets sont lus (ouverture instantanée).
+    """
+    def __init__(self, path: str, initial_bytes: int = 1 << 20):
+        self.path = path
+        self.initial_bytes = int(initial_bytes)
+        self.offset: int | None = None
+        self.inode = None
+        self._partial = b""
+
+    def read_new(self) -> tuple[list[str], bool]:
+        """Retourne (nouvelles lignes complètes, reset) ; reset=True si le fichier a été remplacé."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return [], False
+        reset = False
+        if self.offset is None:
+            self.offset = max(0, st.st_size - self.initial_bytes)
+            self.inode = st.st_ino
+            skip_first = self.offset > 0  # on démarre au milieu d'une ligne
+        elif st.st_ino != self.inode or st.st_size < self.offset:
+            self.offset, self.inode, self._partial = 0, st.st_ino, b""
+            reset, skip_first = True, False
+        else:
+            skip_first = False
+        if st.st_size == self.offset:
+            return [], reset
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(st.st_size - self.offset)
+        self.offset += len(data)
+        data = self._partial + data
+        lines = data.split(b"\n")
+        self._partial = lines.pop()  # dernière ligne pas encore terminée
+        if skip_first and lines:
+            lines = lines[1:]
+        return [l.decode("utf-8", errors="ignore").rstrip("\r") for l in lines], reset
+
+
+class _TailThread(QThread):
+    """Lit les fichiers hors du thread GUI et émet les lignes ajoutées."""
+    linesReady = Signal(int, list, bool)  # index du fichier, lignes, reset
+
+    def __init__(self, paths: list[str], interval_s: float = 1.0, parent=None):
+        super().__init__(parent)
+        self.tails = [LogTail(p) for p in paths]
+        self.interval_s = interval_s
+        self._wake = threading.Event()
+        self._running = True
+
+    def run(self):
+        while self._running:
+            for i, tail in enumerate(self.tails):
+                lines, reset = tail.read_new()
+                if lines or reset:
+                    self.linesReady.emit(i, lines, reset)
+            self._wake.wait(self.interval_s)
+            self._wake.clear()
+
+    def poke(self):
+        self._wake.set()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        self.wait(2000)
+
+
+class _LogPane:
+    """Index mémoire borné (niveau, texte) d'un fichier + vue filtrée à nombre de lignes plafonné."""
+    def __init__(self, max_lines: int):
+        self.lines: deque[tuple[int, str]] = deque(maxlen=max_lines)
+        self.view = QPlainTextEdit()
+        self.view.setReadOnly(True)
+        self.view.setMaximumBlockCount(max_lines)
+        self.placeholder = False
+        self._level = 0
+
+    def add(self, lines: list[str]) -> list[tuple[int, str]]:
+        out = []
+        for text in lines:
+            m = _LEVEL_RE.match(text)
+            if m:
+                self._level = _LEVELS[m.group(1)]
+            # les lignes de traceback héritent du niveau de la ligne d'en-tête
+            out.append((self._level, text))
+        self.lines.extend(out)
+        return out
 
 
 class LogViewerDialog(QDialog):
-    def __init__(self, app_log_path: str, err_log_path: str, parent: QWidget | None = None):
+    def __init__(self, app_log_path: str, err_log_path: str, parent: QWidget | None = None,
+                 max_lines: int = 5000):
         super().__init__(parent)
         self.setWindowTitle("Logs")
         self.app_log_path = app_log_path
         self.err_log_path = err_log_path
 
+        self.panes = [_LogPane(max_lines), _LogPane(max_lines)]
         self.tabs = QTabWidget()
-        self.txt_app = QTextEdit(); self.txt_app.setReadOnly(True)
-        self.txt_err = QTextEdit(); self.txt_err.setReadOnly(True)
-        self.tabs.addTab(self.txt_app, "app.log")
-        self.tabs.addTab(self.txt_err, "erreurs.log")
+        self.tabs.addTab(self.panes[0].view, "app.log")
+        self.tabs.addTab(self.panes[1].view, "erreurs.log")
+        self.txt_app, self.txt_err = self.panes[0].view, self.panes[1].view
+
+        self.cmb_level = QComboBox()
+        for name in ("Tous", "INFO", "WARNING", "ERROR"):
+            self.cmb_level.addItem(name, _LEVELS.get(name, 0))
+        self.cmb_level.currentIndexChanged.connect(self._rebuild)
+        self.txt_filter = QLineEdit()
+        self.txt_filter.setPlaceholderText("Filtrer (texte)…")
+        self.txt_filter.textChanged.connect(self._rebuild)
 
         self.btn_refresh = QPushButton("Rafraîchir")
         self.btn_refresh.clicked.connect(self.refresh)
 
         btn_row = QHBoxLayout()
+        btn_row.addWidget(QLabel("Niveau min."))
+        btn_row.addWidget(self.cmb_level)
+        btn_row.addWidget(self.txt_filter, 1)
         btn_row.addWidget(self.btn_refresh)
 
         buttons = QDialogButtonBox(QDialogButtonBox.Close)
@@ -37,25 +146,45 @@ class LogViewerDialog(QDialog):
         root.addWidget(self.tabs)
         root.addWidget(buttons)
 
-        # Refresh initial et toutes les 3s (léger)
-        self.refresh()
-        self.timer = QTimer(self)
-        self.timer.setInterval(3000)
-        self.timer.timeout.connect(self.refresh)
-        self.timer.start()
+        for pane, path in zip(self.panes, (app_log_path, err_log_path)):
+            if not (path and os.path.isfile(path)):
+                pane.view.setPlainText(f"(fichier introuvable)\n{path}")
+                pane.placeholder = True
 
-    def _read_file(self, path: str) -> str:
-        try:
-            if path and os.path.isfile(path):
-                with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                    return f.read()
-            return f"(fichier introuvable)\n{path}"
-        except Exception as e:
-            return f"(erreur lecture) {e}\n{path}"
+        # Lecture incrémentale dans un thread (1 s) : seules les lignes ajoutées transitent
+        self.tail = _TailThread([app_log_path, err_log_path], parent=self)
+        self.tail.linesReady.connect(self._on_lines)
+        self.tail.start()
+
+    def _accepts(self, level: int, text: str) -> bool:
+        needle = self.txt_filter.text()
+        return level >= (self.cmb_level.currentData() or 0) and (not needle or needle.lower() in text.lower())
+
+    def _on_lines(self, idx: int, lines: list, reset: bool):
+        pane = self.panes[idx]
+        if pane.placeholder:
+            pane.view.clear()
+            pane.placeholder = False
+        # rotation / troncature (reset) : comme `tail -F`, on poursuit sur le nouveau fichier
+        added = [t for lvl, t in pane.add(lines) if self._accepts(lvl, t)]
+        if not added:
+            return
+        sb = pane.view.verticalScrollBar()
+        at_bottom = sb.value() >= sb.maximum() - 2
+        pane.view.appendPlainText("\n".join(added))
+        if at_bottom:
+            sb.setValue(sb.maximum())
+
+    def _rebuild(self):
+        """Filtre changé : la vue est reconstruite depuis l'index mémoire, sans relire les fichiers."""
+        for pane in self.panes:
+            pane.view.setPlainText("\n".join(t for lvl, t in pane.lines if self._accepts(lvl, t)))
+            sb = pane.view.verticalScrollBar()
+            sb.setValue(sb.maximum())
 
     def refresh(self):
-        self.txt_app.setPlainText(self._read_file(self.app_log_path))
-        self.txt_err.setPlainText(self._read_file(self.err_log_path))
-        # Scroll tout en bas du document c'est plus logique
-        self.txt_app.moveCursor(QTextCursor.End)
-        self.txt_err.moveCursor(QTextCursor.End)
+        self.tail.poke()
+
+    def done(self, result: int):
+        self.tail.stop()
+        super().done(result)
@@ -1,17 +1,24 @@
 from __future__ import annotations
-import logging, os
-from typing import Optional
-from PySide6.QtWidgets import QMainWindow, QLabel, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QMenuBar
-from PySide6.QtCore import QTimer, Qt
-from PySide6.QtGui import QPixmap, QImage, QAction
-
-from myapp.video.camera import Camera
-from myapp.ui.log_viewer import LogViewerDialog
-from myapp.ui.help_dialog import HelpDialog
-from myapp.ui.settings_dialog import SettingsDialog
-from myapp.utils.config import save_settings
+import logging, os, time
+from typing import Optional, TYPE_CHECKING
+from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton, QMenuBar,
+                               QProgressBar)
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QAction
+
+# Imports lourds (cv2, torch/ultralytics, dialogues) différés : la fenêtre s'affiche d'abord
+from myapp.ui.video_view import VideoView, to_qimage
+from myapp.ui.tasks import BackgroundTask
+from myapp.utils.config import save_settings, camera_configs, changed_keys
 from myapp.utils.logger import setup_logging
-from myapp.processing.hand_yolo import HandYolo
+from myapp.utils.metrics import get_metrics, start_exporter
+from myapp.utils.startup import get_profiler
+from myapp.processing.base import ProcessorFailed
+from myapp.processing.worker import InferenceWorker
+from myapp.processing.adaptive import QualityController
+
+if TYPE_CHECKING:
+    from myapp.video.sources import FrameSource
 
 class MainWindow(QMainWindow):
     def __init__(self, settings: dict):
@@ -38,15 +45,23 @@ class MainWindow(QMainWindow):
         m_logs.addAction(act_view_logs)
         act_view_logs.triggered.connect(self.open_logs)
 
+        m_view = menubar.addMenu("Affichage")
+        self.act_hud = QAction("Performances (HUD)", self)
+        self.act_hud.setCheckable(True)
+        m_view.addAction(self.act_hud)
+        self.act_hud.toggled.connect(self.set_hud_visible)
+
         m_help = menubar.addMenu("Aide")
         act_help = QAction("Aide…", self)
         m_help.addAction(act_help)
         act_help.triggered.connect(self.open_help)
 
-        # UI
-        self.video_label = QLabel("Flux vidéo")
-        self.video_label.setAlignment(Qt.AlignCenter)
-        self.video_label.setMinimumSize(640, 360)
+        # UI : une vue par caméra (grille), video_label = première vue
+        self.video_area = QWidget()
+        self.video_grid = QGridLayout(self.video_area)
+        self.video_grid.setContentsMargins(0, 0, 0, 0)
+        self.views: list[VideoView] = []
+        self._ensure_views(1)
 
         btn_row = QHBoxLayout()
         self.btn_none = QPushButton("Aucun"); self.btn_none.setCheckable(True); self.btn_none.setChecked(True)
@@ -57,14 +72,33 @@ class MainWindow(QMainWindow):
         self.btn_yolo.clicked.connect(lambda: self.set_processor("yolo"))
 
         layout = QVBoxLayout()
-        layout.addWidget(self.video_label)
+        layout.addWidget(self.video_area)
         layout.addLayout(btn_row)
         central = QWidget(); central.setLayout(layout)
         self.setCentralWidget(central)
 
-        # Caméra & timer
-        self.camera: Optional[Camera] = None
-        self._init_camera()
+        # Barre d'état : opérations de fond en cours (caméra, modèle)
+        self._busy: dict[str, str] = {}
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)  # indéterminé
+        self.progress.setMaximumWidth(160)
+        self.progress.hide()
+        self.statusBar().addPermanentWidget(self.progress)
+        self.profiler = get_profiler()
+        self._first_frame = False
+
+        # Tâches de fond (réouverture caméra, rechargement modèle) : gardées vivantes ici
+        self._tasks: set[BackgroundTask] = set()
+        self._camera_gen = 0
+        self._camera_task: Optional[BackgroundTask] = None
+        self._camera_reopen_again = False
+        self._processor_gen = 0
+
+        self._camera_override: dict = {}  # ex. résolution réduite par la qualité adaptative
+        # Caméra(s) & timer : ouverture en tâche de fond, la fenêtre n'attend pas le driver
+        self.camera: Optional[FrameSource] = None
+        self.cameras: list[FrameSource] = []
+        self._reopen_cameras_async()
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_frame)
         self._apply_timer_interval()
@@ -72,33 +106,171 @@ class MainWindow(QMainWindow):
         # Processor
         self.current_processor = None
         self.current_mode = "none"
+        self.worker: Optional[InferenceWorker] = None
+        self._draining: dict[InferenceWorker, object] = {}  # worker arrêté encore en inférence -> processor à fermer
+        self._last_results: dict = {}
+
+        # Métriques : HUD optionnel + export Prometheus (fichier / HTTP local)
+        self.metrics = get_metrics()
+        metrics_cfg = self.settings.get("metrics", {}) or {}
+        self.exporter = start_exporter(metrics_cfg)
+        self.hud_timer = QTimer(self)
+        self.hud_timer.setInterval(500)
+        self.hud_timer.timeout.connect(self._refresh_hud)
+        self.act_hud.setChecked(bool(metrics_cfg.get("hud", False)))
+
+        # Enregistrement optionnel des détections (chunks colonnaires écrits en tâche de fond)
+        self.recorder = None
+        self._start_recorder()
+
+        # Qualité adaptative : imgsz / stride / résolution selon la latence mesurée
+        self.quality: Optional[QualityController] = None
+        self.quality_timer = QTimer(self)
+        self.quality_timer.timeout.connect(self._adapt_quality)
+        self._start_quality()
 
     # --- Caméra / Timer ---
-    def _init_camera(self):
-        cam_cfg = self.settings.get("camera", {})
-        self._release_camera_if_needed()
-        self.camera = Camera(
-            index=cam_cfg.get("index", 0),
-            resolution=tuple(cam_cfg.get("resolution", (1280, 720))),
-            fps=cam_cfg.get("fps", 30),
-        )
-        self.log.info("Caméra initialisée.")
+    def _camera_configs(self) -> list[dict]:
+        """Configs caméra effectives : settings + surcharges d'exécution (qualité adaptative), jamais sauvées."""
+        cfgs = camera_configs(self.settings)
+        if self._camera_override and len(cfgs) == 1:
+            cfgs = [{**cfgs[0], **self._camera_override}]
+        return cfgs
+
+    @staticmethod
+    def _open_camera(cam_cfg: dict) -> FrameSource:
+        # caméra, vidéo, dossier d'images, générateur ou replay brut selon `source`
+        from myapp.video.sources import open_source
+        return open_source(cam_cfg)
+
+    def _install_cameras(self, cams: list):
+        self.cameras = cams
+        self.camera = cams[0] if cams else None
+        self._ensure_views(max(1, len(cams)))
+        # le worker groupe les frames par caméra : il doit connaître leur nombre
+        if getattr(self, "worker", None) and self.worker.sources != len(self.cameras):
+            self._stop_worker()
+            self._start_worker()
+        self.log.info("Caméra(s) initialisée(s): %d", len(self.cameras))
+
+    def _reopen_cameras_async(self):
+        """
+        Libère et rouvre les sources en tâche de fond. update_frame est en pause (liste vide)
+        mais les vues gardent leur dernière image : pas d'écran noir pendant la réouverture.
+        """
+        if self._camera_task is not None:
+            self._camera_reopen_again = True  # une réouverture à la fois : on refera avec la config finale
+            return
+        cfgs = self._camera_configs()
+        old, self.cameras, self.camera = self.cameras, [], None
+        self._set_busy("camera", "Ouverture caméra…")
+        self._camera_gen += 1
+        gen = self._camera_gen
+
+        def job():
+            for cam in old:
+                try:
+                    cam.release()
+                except Exception:
+                    self.log.exception("Libération caméra")
+            opened = []
+            try:
+                for c in cfgs:
+                    opened.append(self._open_camera(c))
+            except Exception:
+                for cam in opened:
+                    cam.release()
+                raise
+            return opened
+
+        def done(cams):
+            self._camera_task = None
+            self._set_busy("camera", None)
+            if gen != self._camera_gen:
+                for cam in cams:
+                    cam.release()
+                return
+            self._install_cameras(cams)
+            self._apply_timer_interval()
+            self.profiler.mark("caméra prête")
+            if self._camera_reopen_again:
+                self._camera_reopen_again = False
+                self._reopen_cameras_async()
+
+        def failed(msg):
+            self._camera_task = None
+            self._camera_reopen_again = False
+            self._set_busy("camera", None)
+            self.statusBar().showMessage(f"Caméra indisponible — {msg}", 10000)
+
+        self._camera_task = self._run_task(job, "ouverture caméra", done, failed)
+
+    def _set_busy(self, key: str, text: str | None):
+        """Indicateur de progression : une entrée par opération de fond en cours."""
+        if text is None:
+            self._busy.pop(key, None)
+        else:
+            self._busy[key] = text
+        self.progress.setVisible(bool(self._busy))
+        if self._busy:
+            self.statusBar().showMessage("  ".join(self._busy.values()))
+        else:
+            self.statusBar().clearMessage()
+
+    def _run_task(self, fn, name: str, on_done, on_failed=None) -> BackgroundTask:
+        task = BackgroundTask(fn, name, self)
+        self._tasks.add(task)
+        task.done.connect(lambda _r, t=task: setattr(t, "result", None))  # reçu : à la charge de on_done
+        task.done.connect(on_done)
+        if on_failed is not None:
+            task.failed.connect(on_failed)
+        task.finished.connect(lambda t=task: (self._tasks.discard(t), t.deleteLater()))
+        task.start()
+        return task
+
+    def _discard(self, obj):
+        """Libère un résultat de tâche jamais installé (sources, processor)."""
+        for item in obj if isinstance(obj, list) else [obj]:
+            try:
+                if hasattr(item, "release"):
+                    item.release()
+                elif hasattr(item, "close"):
+                    item.close()
+            except Exception:
+                self.log.exception("Libération %s", type(item).__name__)
 
     def _release_camera_if_needed(self):
-        if getattr(self, "camera", None):
+        for cam in getattr(self, "cameras", []):
             try:
-                self.camera.release()
+                cam.release()
             except Exception:
                 self.log.exception("Libération caméra")
-            self.camera = None
+        self.cameras = []
+        self.camera = None
+
+    def _ensure_views(self, n: int):
+        if len(self.views) == n:
+            return
+        for v in self.views:
+            self.video_grid.removeWidget(v)
+            v.deleteLater()
+        cols = 1 if n == 1 else 2
+        self.views = []
+        for i in range(n):
+            v = VideoView("Flux vidéo" if n == 1 else f"Caméra {i + 1}")
+            v.setMinimumSize(640 // cols, 360 // cols)
+            self.video_grid.addWidget(v, i // cols, i % cols)
+            self.views.append(v)
+        self.video_label = self.views[0]
 
     def _apply_timer_interval(self):
-        fps = int(self.settings.get("camera", {}).get("fps", 30) or 30)
+        fps = max(int(c.get("fps", 30) or 30) for c in camera_configs(self.settings))
         self.timer.stop()
         self.timer.start(int(1000 / max(1, fps)))
 
     # --- Menus ---
     def open_logs(self):
+        from myapp.ui.log_viewer import LogViewerDialog
         log_cfg = self.settings.get("logging", {})
         handlers = log_cfg.get("handlers", {})
         app_log = os.path.abspath(handlers.get("file", "log/app.log"))
@@ -109,84 +281,385 @@ class MainWindow(QMainWindow):
         dlg.exec()
 
     def open_help(self):
+        from myapp.ui.help_dialog import HelpDialog
         dlg = HelpDialog(self)
         dlg.resize(520, 300)
         dlg.exec()
 
     # --- Processor ---
+    def _build_processor(self, mode: str):
+        """Construit le processor du mode (chargement des poids) ; peut tourner hors du thread GUI."""
+        if mode != "yolo":
+            return None
+        proc_cfg = self.settings.get("processing", {}) or {}
+        pipe_cfg = proc_cfg.get("pipeline", {}) or {}
+        mp_cfg = proc_cfg.get("multiprocess", {}) or {}
+        if pipe_cfg.get("enabled", False):
+            # tous les modules de processing.modules, en parallèle
+            from myapp.processing.pipeline import build_pipeline
+            return build_pipeline(self.settings)
+        eng_cfg = dict(self.settings.get("engines", {}).get("yolo", {}))
+        if mp_cfg.get("enabled", False):
+            # HandYolo dans des process séparés (frames en mémoire partagée)
+            from myapp.processing.mp_pool import MultiprocessProcessor
+            return MultiprocessProcessor(
+                "myapp.processing.hand_yolo.HandYolo", eng_cfg, workers=mp_cfg.get("workers", 2),
+                sync=mp_cfg.get("sync", False), timeout_s=mp_cfg.get("timeout_s", 5.0),
+                max_restarts=mp_cfg.get("max_restarts", 5),
+                config=self.settings)
+        from myapp.processing.hand_yolo import HandYolo  # importe torch/ultralytics : hors thread GUI
+        proc = HandYolo(name="HandYolo", config=self.settings, **eng_cfg)
+        proc.warmup()
+        return proc
+
     def set_processor(self, mode: str):
-        if self.current_processor:
-            try:
-                self.current_processor.close()
-            except Exception:
-                self.log.exception("close() processor")
-            self.current_processor = None
+        if mode == "yolo":
+            # import + chargement + warm-up en tâche de fond ; le flux vidéo continue pendant ce temps
+            self._load_processor_async("Chargement du modèle…")
+            return
+        self._install_processor(None, mode)
+
+    def _install_processor(self, proc, mode: str):
+        self._processor_gen += 1  # un chargement en cours devient obsolète
+        self._set_busy("model", None)
+        self._stop_worker(close_processor=self.current_processor)
+        self.current_processor = None
 
         self.btn_none.setChecked(mode == "none")
         self.btn_yolo.setChecked(mode == "yolo")
+        self.current_processor = proc
 
-        if mode == "yolo":
-            try:
-                eng_cfg = dict(self.settings.get("engines", {}).get("yolo", {}))
-                self.current_processor = HandYolo(name="HandYolo", config=self.settings, **eng_cfg)
-            except Exception:
-                self.log.exception("Init HandYolo échouée")
-                mode = "none"
+        if self.current_processor and self.quality is not None:
+            lvl = self.quality.level
+            self.current_processor.set_quality(imgsz=lvl["imgsz"], stride=lvl["stride"])
+
+        if self.current_processor and self.settings.get("processing", {}).get("threaded_inference", True):
+            self._start_worker()
 
         self.current_mode = mode
         self.log.info("Mode actif: %s", mode)
 
+    def _load_processor_async(self, message: str = "Rechargement du modèle…"):
+        """Construit le processor YOLO en tâche de fond ; l'ancien (s'il existe) tourne jusqu'à l'échange."""
+        self._processor_gen += 1
+        gen = self._processor_gen
+        self.btn_yolo.setChecked(True)
+        self.btn_none.setChecked(False)
+        self._set_busy("model", message)
+
+        def done(proc):
+            if gen != self._processor_gen:  # remplacé entre-temps (bouton, autre rechargement)
+                if proc is not None:
+                    proc.close()
+                return
+            self._set_busy("model", None)
+            self._install_processor(proc, "yolo")
+            self.statusBar().showMessage("Modèle prêt", 3000)
+            self.profiler.mark("modèle prêt")
+
+        def failed(msg):
+            if gen != self._processor_gen:
+                return
+            self._set_busy("model", None)
+            if self.current_processor is None:
+                self._install_processor(None, "none")
+            self.statusBar().showMessage(f"Chargement du modèle échoué — {msg}", 10000)
+
+        self._run_task(lambda: self._build_processor("yolo"), "chargement du modèle", done, failed)
+
+    def _reconfigure_processor(self, old: dict, new: dict):
+        """Seuils / imgsz de engines.yolo : à chaud ; le reste (poids, backend, modules...) : rechargement."""
+        if self.current_mode != "yolo" or self.current_processor is None:
+            return
+        proc_changed = changed_keys(old.get("processing"), new.get("processing"))
+        engines_changed = changed_keys(old.get("engines"), new.get("engines"))
+        yolo_changed = changed_keys((old.get("engines") or {}).get("yolo"), (new.get("engines") or {}).get("yolo"))
+        if not proc_changed and not engines_changed:
+            return
+        if not proc_changed and set(engines_changed) == {"yolo"}:
+            try:
+                if self.current_processor.reconfigure(yolo_changed):
+                    return
+            except Exception:
+                self.log.exception("reconfigure %s", self.current_processor.name)
+        self._load_processor_async()
+
+    def _start_worker(self):
+        proc_cfg = self.settings.get("processing", {})
+        self.worker = InferenceWorker(self.current_processor, self, sources=len(self.cameras),
+                                      batch_window_ms=proc_cfg.get("batch_window_ms", 10))
+        self.worker.resultReady.connect(self._on_result)
+        self.worker.failed.connect(self._on_worker_failed)
+        self.worker.start()
+
+    def _stop_worker(self, close_processor=None):
+        """
+        Arrête le worker. S'il est encore dans analyze() après le délai, il n'est ni détruit
+        ni privé de son processor : les deux sont libérés à la sortie effective du thread.
+        """
+        worker, self.worker = self.worker, None
+        self._last_results = {}
+        if worker is None or worker.stop():
+            if worker is not None:
+                worker.deleteLater()
+            self._close_processor(close_processor)
+            return
+        self._draining[worker] = close_processor
+        worker.finished.connect(lambda w=worker: self._reap_worker(w))
+        if worker.isFinished():  # terminé avant la connexion
+            self._reap_worker(worker)
+
+    def _reap_worker(self, worker, wait: bool = False):
+        if worker not in self._draining:  # déjà traité
+            return
+        if wait:
+            worker.wait()
+        self._close_processor(self._draining.pop(worker))
+        worker.deleteLater()
+
+    def _close_processor(self, proc):
+        if proc is None:
+            return
+        try:
+            proc.close()
+        except Exception:
+            self.log.exception("close() processor")
+
+    def _on_result(self, result):
+        # Signal émis depuis le worker : ignore les résultats d'un processor déjà remplacé
+        if self.worker is not None and self.sender() is self.worker:
+            self._last_results[result.source] = result
+            if self.recorder and result.results is not None:
+                self._record(result.source, result.frame_seq, result.ts, result.results)
+
+    def _on_worker_failed(self, msg: str):
+        if self.worker is not None and self.sender() is self.worker:
+            self._on_processor_failed(msg)
+
+    def _on_processor_failed(self, msg: str):
+        self.log.error("Module %s hors service : %s", self.current_mode, msg)
+        self._install_processor(None, "none")
+        self.statusBar().showMessage(f"Module arrêté — {msg}", 10000)
+
+    # --- Enregistrement ---
+    def _start_recorder(self):
+        cfg = self.settings.get("recorder", {}) or {}
+        if not cfg.get("enabled", False):
+            return
+        try:
+            from myapp.processing.recorder import DetectionRecorder
+            self.recorder = DetectionRecorder(cfg.get("dir", "recordings"), chunk_rows=cfg.get("chunk_rows", 65536),
+                                              nkpt=cfg.get("nkpt", 21), fmt=cfg.get("format", "npy"))
+        except Exception:
+            self.log.exception("Démarrage de l'enregistrement")
+
+    def _stop_recorder(self):
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def _record(self, source: int, frame_seq: int, ts: float, results):
+        try:
+            self.recorder.add(frame_seq, ts, source, results)
+        except Exception:
+            self.log.exception("Enregistrement des détections")
+
     # --- Affichage ---
     def update_frame(self):
-        if not self.camera:
+        if not self.cameras:
             return
-        frame = self.camera.get_frame()
-        if frame is None:
+        m = self.metrics
+        frames = {}
+        for i, cam in enumerate(self.cameras):
+            t0 = time.perf_counter()
+            frame = cam.get_frame()
+            if frame is not None:
+                m.observe("capture", time.perf_counter() - t0)
+                frames[i] = frame
+        if not frames:
             return
-        if self.current_processor:
+        if self.worker:
+            for i, frame in frames.items():
+                cam = self.cameras[i]
+                self.worker.submit(frame, source=i, ts=cam.last_ts, frame_seq=cam.last_seq)
+                frames[i] = self._render_last_result(frame, i)
+            m.set("worker_dropped", self.worker.dropped)
+        elif self.current_processor:
             try:
-                frame = self.current_processor.process_frame(frame)
+                frames = self._process_inline(frames)
+            except ProcessorFailed as e:
+                self._on_processor_failed(str(e))
             except Exception:
                 self.log.exception("Erreur YOLO")
-        qimg = self._to_qimage(frame)
-        if qimg:
-            self.video_label.setPixmap(QPixmap.fromImage(qimg))
+        for i, frame in frames.items():
+            t1 = time.perf_counter()
+            self.views[i].set_frame(frame)
+            m.observe("display", time.perf_counter() - t1)
+            m.observe("end_to_end", time.monotonic() - self.cameras[i].last_ts)
+        m.tick("display")
+        m.inc("frames_displayed", len(frames))
+        if not self._first_frame:
+            self._first_frame = True
+            self.profiler.mark("première image affichée")
+            self.profiler.report()
+        m.set("camera_dropped", sum(c.dropped for c in self.cameras))
+
+    def _process_inline(self, frames: dict) -> dict:
+        p = self.current_processor
+        if p.supports_split and (len(self.cameras) > 1 or self.recorder):
+            keys = sorted(frames)
+            if len(keys) > 1:
+                results = p.analyze_batch([frames[k] for k in keys])  # un seul lot pour toutes les caméras
+            else:
+                results = [p.analyze(frames[keys[0]])]
+            if self.recorder:
+                for k, r in zip(keys, results):
+                    self._record(k, self.cameras[k].last_seq, self.cameras[k].last_ts, r)
+            return {k: p.render(frames[k], r) for k, r in zip(keys, results)}
+        return {k: p.process_frame(f) for k, f in frames.items()}
+
+    def _adapt_quality(self):
+        level = self.quality.evaluate(self.metrics)
+        if level is None:
+            return
+        self._apply_quality(level)
+
+    def _apply_quality(self, level: dict):
+        if self.current_processor:
+            try:
+                self.current_processor.set_quality(imgsz=level["imgsz"], stride=level["stride"])
+            except Exception:
+                self.log.exception("set_quality %s", self.current_processor.name)
+        res = level.get("resolution")
+        if not res or len(camera_configs(self.settings)) != 1:
+            return
+        # surcharge d'exécution seulement : self.settings (dialogue, settings.yaml) garde la résolution choisie
+        configured = list(camera_configs(self.settings)[0].get("resolution", []))
+        override = {} if list(res) == configured else {"resolution": list(res)}
+        if override != self._camera_override:
+            self._camera_override = override
+            self._reopen_cameras_async()
+
+    def _start_quality(self):
+        """(Re)crée le régulateur ; son palier 0 reprend imgsz, stride et résolution configurés."""
+        self.quality_timer.stop()
+        self.quality = None
+        adaptive_cfg = self.settings.get("adaptive", {}) or {}
+        if not adaptive_cfg.get("enabled", False):
+            return
+        yolo_cfg = (self.settings.get("engines", {}) or {}).get("yolo", {}) or {}
+        cams = camera_configs(self.settings)
+        base = {
+            "imgsz": yolo_cfg.get("imgsz"),
+            "stride": (yolo_cfg.get("tracking") or {}).get("detect_every", 1),
+            "resolution": cams[0].get("resolution") if len(cams) == 1 else None,
+        }
+        self.quality = QualityController(adaptive_cfg, base)
+        self.quality_timer.start(int(float(adaptive_cfg.get("interval_s", 1.0)) * 1000))
+
+    def set_hud_visible(self, visible: bool):
+        if visible:
+            self.hud_timer.start()
+            self._refresh_hud()
+        else:
+            self.hud_timer.stop()
+            self.video_label.set_hud(None)
+
+    def _refresh_hud(self):
+        self.video_label.set_hud(self.metrics.hud_lines())
+
+    def _render_last_result(self, frame, source: int = 0):
+        """Dessine les derniers résultats connus de cette caméra sur la frame fraîche."""
+        res = self._last_results.get(source)
+        if res is None:
+            return frame
+        if res.frame is not None:
+            # module sans analyze/render : on affiche sa dernière frame annotée
+            return res.frame
+        try:
+            return self.current_processor.render(frame, res.results)
+        except Exception:
+            self.log.exception("Erreur rendu %s", self.current_processor.name)
+            return frame
 
     @staticmethod
     def _to_qimage(frame):
-        import cv2
-        if frame is None: return None
-        if frame.ndim == 2:
-            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
-        else:
-            frame = frame[:, :, ::-1].copy()
-        h, w, _ = frame.shape
-        return QImage(frame.data, w, h, 3*w, QImage.Format_RGB888)
+        """QImage BGR sans copie sur le buffer de `frame` (qui doit rester vivant)."""
+        return to_qimage(frame)
 
     def closeEvent(self, e):
         try: self.timer.stop()
         except Exception: pass
-        if self.current_processor:
-            try: self.current_processor.close()
-            except Exception: pass
+        self.hud_timer.stop()
+        self.quality_timer.stop()
+        if self.exporter:
+            self.exporter.stop()
+        self._stop_worker(close_processor=self.current_processor)
+        self.current_processor = None
+        for worker in list(self._draining):
+            self._reap_worker(worker, wait=True)  # un QThread détruit en cours d'exécution fait avorter Qt
+        self._stop_recorder()
+        for task in list(self._tasks):
+            # pas de délai : détruire la fenêtre (parent) pendant que le thread tourne fait avorter Qt
+            for sig in (task.done, task.failed):
+                try:
+                    sig.disconnect()
+                except (RuntimeError, TypeError):
+                    pass
+            task.wait()
+            self._discard(task.result)  # caméras ouvertes / modèle chargé pendant la fermeture
         self._release_camera_if_needed()
         super().closeEvent(e)
         
     # ---------- UI actions ----------
     def open_settings(self):
+        from myapp.ui.settings_dialog import SettingsDialog
         dlg = SettingsDialog(self.settings, self)
         dlg.settingsChanged.connect(self._on_settings_changed)
         dlg.exec()
 
     def _on_settings_changed(self, new_settings: dict):
-        """Applique les changements, sauve YAML, reconfigure logging/caméra à chaud."""
-        # sauvegarder d'abord
+        """Sauve YAML puis applique seulement ce qui a changé, au plus petit périmètre."""
+        old = self.settings
         save_settings(new_settings)
         self.settings = new_settings
-        # reconfigure logging
-        setup_logging(self.settings.get("logging"))
-        logging.getLogger("myapp").info("Configuration rechargée depuis la fenêtre Paramètres.")
+        changed = changed_keys(old, new_settings)
+        changed.pop("_settings_path", None)
+        if not changed:
+            return
+        if "logging" in changed:
+            setup_logging(self.settings.get("logging"))
+        logging.getLogger("myapp").info("Configuration modifiée: %s", ", ".join(sorted(changed)))
+        # nouvelle base de qualité : paliers recalculés, surcharges d'exécution abandonnées
+        quality_base_changed = bool({"adaptive", "camera", "engines"} & set(changed))
+        if quality_base_changed and self._camera_override:
+            self._camera_override = {}
+            self._reopen_cameras_async()
 
-        # reconfigure caméra + timer
-        self._init_camera()
-        self._apply_timer_interval()
+        if "camera" in changed:
+            old_cams, new_cams = camera_configs(old), camera_configs(new_settings)
+            without_fps = lambda cfgs: [{k: v for k, v in c.items() if k != "fps"} for c in cfgs]
+            if without_fps(old_cams) != without_fps(new_cams) or self._camera_task is not None:
+                # réouverture en cours : self.cameras est vide, la nouvelle cadence passe par la suivante
+                self._reopen_cameras_async()
+            else:
+                # fps seul : nouvelle cadence demandée aux sources et au timer, sans réouverture
+                for cam, cfg in zip(self.cameras, new_cams):
+                    cam.set_fps(cfg.get("fps", 30))
+                self._apply_timer_interval()
+
+        if "engines" in changed or "processing" in changed:
+            self._reconfigure_processor(old, new_settings)
+
+        if "metrics" in changed:
+            if self.exporter:
+                self.exporter.stop()
+            self.exporter = start_exporter(self.settings.get("metrics", {}) or {})
+
+        if "recorder" in changed:
+            # nouvelle session (dossier horodaté) avec les nouveaux réglages
+            self._stop_recorder()
+            self._start_recorder()
+
+        if quality_base_changed:
+            self._start_quality()
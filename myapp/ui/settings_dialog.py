@@ -2,9 +2,10 @@ from __future__ import annotations
 import os
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QDialogButtonBox,
-    QSpinBox, QLineEdit, QComboBox, QPushButton, QFileDialog, QGroupBox
+    QSpinBox, QDoubleSpinBox, QLineEdit, QComboBox, QPushButton, QFileDialog, QGroupBox
 )
 from PySide6.QtCore import Signal
+from myapp.utils.config import camera_configs
 
 class SettingsDialog(QDialog):
     """Fenêtre de paramètres pour éditer settings.yaml et notifier les changements."""
@@ -23,7 +24,7 @@ class SettingsDialog(QDialog):
         self.sb_height = QSpinBox(); self.sb_height.setRange(120, 4320); self.sb_height.setSingleStep(10)
         self.sb_fps = QSpinBox(); self.sb_fps.setRange(1, 240)
 
-        cam = settings.get("camera", {})
+        cam = camera_configs(settings)[0]  # multi-caméras : on édite la première
         self.sb_cam_index.setValue(int(cam.get("index", 0)))
         res = cam.get("resolution", [1280, 720])
         self.sb_width.setValue(int(res[0] if len(res) > 0 else 1280))
@@ -34,6 +35,26 @@ class SettingsDialog(QDialog):
         cam_form.addRow("Largeur:", self.sb_width)
         cam_form.addRow("Hauteur:", self.sb_height)
         cam_form.addRow("FPS:", self.sb_fps)
+
+        # --- Widgets YOLO (appliqués à chaud, sans recharger les poids) ---
+        yolo_grp = QGroupBox("YOLO")
+        yolo_form = QFormLayout(yolo_grp)
+        yolo = (settings.get("engines", {}) or {}).get("yolo", {}) or {}
+        self.sb_conf = QDoubleSpinBox(); self.sb_conf.setRange(0.01, 1.0); self.sb_conf.setSingleStep(0.05)
+        self.sb_iou = QDoubleSpinBox(); self.sb_iou.setRange(0.05, 1.0); self.sb_iou.setSingleStep(0.05)
+        self.sb_imgsz = QSpinBox(); self.sb_imgsz.setRange(160, 1920); self.sb_imgsz.setSingleStep(32)
+        self.le_classes = QLineEdit(); self.le_classes.setPlaceholderText("toutes (ex: 0,1)")
+        self.sb_conf.setValue(float(yolo.get("conf", 0.3)))
+        self.sb_iou.setValue(float(yolo.get("iou", 0.45)))
+        imgsz = yolo.get("imgsz", 640)
+        self.sb_imgsz.setValue(int(imgsz if isinstance(imgsz, int) else max(imgsz)))
+        classes = yolo.get("classes")
+        self.le_classes.setText(",".join(str(c) for c in classes) if classes else "")
+
+        yolo_form.addRow("Confiance min.:", self.sb_conf)
+        yolo_form.addRow("Seuil NMS (IoU):", self.sb_iou)
+        yolo_form.addRow("imgsz:", self.sb_imgsz)
+        yolo_form.addRow("Classes:", self.le_classes)
         
         # --- Boutons OK/Cancel ---
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -43,17 +64,36 @@ class SettingsDialog(QDialog):
         # --- Layout principal ---
         root = QVBoxLayout(self)
         root.addWidget(cam_grp)
+        root.addWidget(yolo_grp)
         root.addWidget(buttons)
 
     def get_settings(self) -> dict:
         """Construit un nouveau dict settings depuis les widgets."""
         s = dict(self._settings)  # copie superficielle
         # caméra
-        s["camera"] = {
+        cams = camera_configs(self._settings)
+        edited = {
+            **cams[0],  # conserve les options non éditées ici
             "index": int(self.sb_cam_index.value()),
             "resolution": [int(self.sb_width.value()), int(self.sb_height.value())],
             "fps": int(self.sb_fps.value()),
         }
+        s["camera"] = [edited] + cams[1:] if isinstance(self._settings.get("camera"), list) else edited
+
+        # yolo : seules les valeurs réellement modifiées changent (imgsz [w, h] conservé sinon)
+        engines = dict(self._settings.get("engines", {}) or {})
+        yolo = dict(engines.get("yolo", {}) or {})
+        txt = self.le_classes.text().replace(" ", "")
+        classes = [int(c) for c in txt.split(",") if c.isdigit()] or None
+        edits = {"conf": round(self.sb_conf.value(), 3), "iou": round(self.sb_iou.value(), 3), "classes": classes}
+        imgsz = yolo.get("imgsz", 640)
+        if int(self.sb_imgsz.value()) != (imgsz if isinstance(imgsz, int) else max(imgsz)):
+            edits["imgsz"] = int(self.sb_imgsz.value())
+        for k, v in edits.items():
+            if yolo.get(k, None if k == "classes" else v) != v:
+                yolo[k] = v
+        engines["yolo"] = yolo
+        s["engines"] = engines
         
         if "_settings_path" in self._settings:
             s["_settings_path"] = self._settings["_settings_path"]
@@ -0,0 +1,30 @@
+from __future__ import annotations
+import logging, traceback
+
+from PySide6.QtCore import QThread, Signal
+
+
+class BackgroundTask(QThread):
+    """
+    Exécute fn() hors du thread GUI (ouverture caméra, chargement de modèle...).
+    Résultat via `done(objet)` ou `failed(message)`, reçus sur le thread GUI.
+    """
+    done = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, fn, name: str = "tâche", parent=None):
+        super().__init__(parent)
+        self.fn = fn
+        self.name = name
+        self.result = None  # gardé pour l'appelant qui attend le thread sans boucle d'événements
+        self.log = logging.getLogger("myapp.ui.tasks")
+
+    def run(self):
+        try:
+            result = self.fn()
+        except Exception as e:
+            self.log.error("Échec %s:\n%s", self.name, traceback.format_exc())
+            self.failed.emit(f"{self.name}: {e}")
+            return
+        self.result = result
+        self.done.emit(result)
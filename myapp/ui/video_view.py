@@ -0,0 +1,96 @@
+from __future__ import annotations
+import numpy as np
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QPainter, QColor, QFont
+
+
+def to_qimage(frame) -> QImage | None:
+    """
+    QImage BGR (ou niveaux de gris) posée directement sur le buffer numpy, sans copie.
+    `frame` doit être C-contiguë ; l'appelant garde une référence dessus tant que la QImage vit.
+    """
+    if frame is None:
+        return None
+    h, w = frame.shape[:2]
+    fmt = QImage.Format_Grayscale8 if frame.ndim == 2 else QImage.Format_BGR888
+    return QImage(frame.data, w, h, frame.strides[0], fmt)
+
+
+def fit_frame(frame, width: int, height: int, buf: np.ndarray | None = None) -> np.ndarray:
+    """
+    Réduit `frame` pour tenir dans width x height (jamais d'agrandissement), dans `buf`
+    si sa forme convient (sinon un nouveau buffer). Retourne la frame d'origine si elle tient déjà.
+    """
+    fh, fw = frame.shape[:2]
+    scale = min(width / fw, height / fh)
+    if scale >= 1.0:
+        return frame
+    shape = (max(1, int(fh * scale)), max(1, int(fw * scale))) + frame.shape[2:]
+    if buf is None or buf.shape != shape:
+        buf = np.empty(shape, np.uint8)
+    import cv2  # différé : le module est importé au démarrage de la fenêtre
+    cv2.resize(frame, (shape[1], shape[0]), dst=buf, interpolation=cv2.INTER_AREA)
+    return buf
+
+
+class VideoView(QWidget):
+    """
+    Affichage vidéo : au plus une copie par frame (réduction unique vers la taille du widget
+    dans un buffer réutilisé), puis dessin direct de la QImage BGR sans QPixmap intermédiaire.
+    """
+    def __init__(self, text: str = "", parent: QWidget | None = None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self._text = text
+        self._buf: np.ndarray | None = None
+        self._frame = None  # garde vivant le buffer sous la QImage
+        self._img: QImage | None = None
+        self._hud: list[str] | None = None
+        self._hud_font = QFont("monospace", 9)
+        self._hud_font.setStyleHint(QFont.Monospace)
+
+    def set_hud(self, lines: list[str] | None):
+        """Texte superposé en haut à gauche (dessiné par Qt, la frame n'est pas modifiée)."""
+        self._hud = lines
+        self.update()
+
+    def _scaled(self, frame):
+        # taille native centrée si la frame tient (comme l'ancien QLabel), sinon une seule réduction
+        out = fit_frame(frame, self.width(), self.height(), self._buf)
+        if out is not frame:
+            self._buf = out
+        return out
+
+    def set_frame(self, frame):
+        if frame is None:
+            return
+        frame = self._scaled(frame)
+        if not frame.flags["C_CONTIGUOUS"]:
+            frame = np.ascontiguousarray(frame)
+        self._frame = frame
+        self._img = to_qimage(self._frame)
+        self.update()
+
+    def paintEvent(self, e):
+        p = QPainter(self)
+        p.fillRect(self.rect(), QColor(0, 0, 0) if self._img is not None else self.palette().window().color())
+        if self._img is None:
+            p.drawText(self.rect(), Qt.AlignCenter, self._text)
+        else:
+            x = (self.width() - self._img.width()) // 2
+            y = (self.height() - self._img.height()) // 2
+            p.drawImage(x, y, self._img)
+        if self._hud:
+            self._paint_hud(p)
+        p.end()
+
+    def _paint_hud(self, p: QPainter):
+        p.setFont(self._hud_font)
+        fm = p.fontMetrics()
+        lh = fm.height()
+        w = max(fm.horizontalAdvance(line) for line in self._hud) + 12
+        p.fillRect(4, 4, w, lh * len(self._hud) + 8, QColor(0, 0, 0, 160))
+        p.setPen(QColor(0, 255, 0))
+        for i, line in enumerate(self._hud):
+            p.drawText(10, 8 + fm.ascent() + i * lh, line)
@@ -3,7 +3,7 @@ from pathlib import Path
 import yaml, logging
 
 _DEFAULTS = {
-    "camera": {"index": 0, "resolution": [1280,720], "fps": 30},
+    "camera": {"source": "camera", "index": 0, "resolution": [1280,720], "fps": 30, "threaded": False, "buffer_size": 1},
     "engines": {"yolo": {}},
     "logging": {
         "level": "INFO",
@@ -20,7 +20,10 @@ def load_settings(candidates):
             with open(p, "r", encoding="utf-8") as f:
                 data = yaml.safe_load(f) or {}
             merged = {**_DEFAULTS, **data}
-            merged["camera"] = {**_DEFAULTS["camera"], **data.get("camera", {})}
+            cam = data.get("camera", {}) or {}
+            # camera: un dict (une caméra) ou une liste de dicts (multi-caméras)
+            merged["camera"] = ([{**_DEFAULTS["camera"], **c} for c in cam] if isinstance(cam, list)
+                                else {**_DEFAULTS["camera"], **cam})
             merged["engines"] = {**_DEFAULTS["engines"], **data.get("engines", {})}
             merged["logging"] = {**_DEFAULTS["logging"], **data.get("logging", {})}
             merged["_settings_path"] = str(p.resolve())
@@ -31,6 +34,17 @@ def load_settings(candidates):
     logging.getLogger("myapp.config").warning("Aucun settings.yaml trouvé, defaults utilisés.")
     return merged
 
+def camera_configs(settings: dict) -> list[dict]:
+    """Liste des configurations caméra, que `camera` soit un dict ou une liste."""
+    cam = settings.get("camera", {}) or {}
+    items = cam if isinstance(cam, list) else [cam]
+    return [{**_DEFAULTS["camera"], **(c or {})} for c in items]
+
+def changed_keys(old: dict | None, new: dict | None) -> dict:
+    """Clés dont la valeur diffère entre deux dicts (clé -> nouvelle valeur, None si supprimée)."""
+    old, new = old or {}, new or {}
+    return {k: new.get(k) for k in set(old) | set(new) if old.get(k) != new.get(k)}
+
 def save_settings(settings: dict, path: str | Path | None = None) -> None:
     out = dict(settings)
     out.pop("_settings_path", None)
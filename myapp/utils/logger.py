@@ -1,8 +1,145 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+_LISTENER: QueueListener | None = None
+
+
+class RateLimitedQueueHandler(QueueHandler):
+    """
+    Envoie les records dans une file (aucune E/S dans le thread appelant) et limite les
+    répétitions : au-delà de `burst` occurrences d'un même warning/erreur dans `window_s`,
+    les suivantes sont comptées puis résumées en une ligne « même erreur ×N ».
+    Le test a lieu avant le formatage : une traceback masquée ne coûte presque rien.
+    """
+    def __init__(self, q, window_s: float = 20.0, burst: int = 3):
+        super().__init__(q)
+        self.window_s = float(window_s)
+        self.burst = max(1, int(burst))
+        self._seen: dict[tuple, list] = {}  # clé -> [début fenêtre, occurrences, record exemple]
+        self._lock = threading.Lock()
+        # les résumés des rafales terminées sont écrits sans attendre le prochain warning
+        self._closed = threading.Event()
+        self._ticker = threading.Thread(target=self._tick, name="log-dedup", daemon=True)
+        self._ticker.start()
+
+    @staticmethod
+    def _key(record: logging.LogRecord) -> tuple:
+        exc = record.exc_info[1] if record.exc_info else None
+        return (record.name, record.levelno, str(record.msg),
+                type(exc).__name__ if exc else None, str(exc)[:200] if exc else None)
+
+    def _summary(self, sample: logging.LogRecord, suppressed: int, span: float) -> logging.LogRecord:
+        return logging.makeLogRecord({
+            "name": sample.name, "levelno": sample.levelno, "levelname": sample.levelname,
+            "msg": "%s (même erreur ×%d dans les %.0f dernières s)",
+            "args": (sample.getMessage(), suppressed, span),
+        })
+
+    def _flush_expired(self, now: float, force: bool = False):
+        out = []
+        for key, (start, count, sample) in list(self._seen.items()):
+            if force or now - start >= self.window_s:
+                del self._seen[key]
+                if count > self.burst:
+                    out.append(self._summary(sample, count - self.burst, now - start))
+        return out
+
+    def _tick(self):
+        period = max(0.5, min(5.0, self.window_s / 4))
+        while not self._closed.wait(period):
+            with self._lock:
+                pending = self._flush_expired(time.monotonic())
+            for rec in pending:
+                super().emit(rec)
+
+    def close(self):
+        self._closed.set()
+        super().close()
+
+    def flush_repeats(self):
+        with self._lock:
+            pending = self._flush_expired(time.monotonic(), force=True)
+        for rec in pending:
+            super().emit(rec)
+
+    def emit(self, record: logging.LogRecord):
+        if record.levelno < logging.WARNING:
+            super().emit(record)
+            return
+        now = time.monotonic()
+        with self._lock:
+            pending = self._flush_expired(now)
+            key = self._key(record)
+            entry = self._seen.get(key)
+            if entry is None:
+                entry = self._seen[key] = [now, 0, record]
+            entry[1] += 1
+            keep = entry[1] <= self.burst
+        for rec in pending:
+            super().emit(rec)
+        if keep:
+            super().emit(record)
+
+
+class _Redispatch(logging.Handler):
+    """Réinjecte un record venu d'un process enfant dans le logging du parent (dédup, fichiers)."""
+    def emit(self, record: logging.LogRecord):
+        logging.getLogger(record.name).handle(record)
+
+
+class ChildLogForwarder:
+    """
+    File multiprocessing à passer aux process enfants (setup_child_logging) : leurs records
+    sont écrits par le parent, seul propriétaire des fichiers — rotation sûre, pas de lignes perdues.
+    """
+    def __init__(self, ctx):
+        self.queue = ctx.Queue()
+        self._listener = QueueListener(self.queue, _Redispatch())
+        self._listener.start()
+
+    def stop(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+def setup_child_logging(q, cfg: dict | None):
+    """Logging d'un process enfant : aucun handler fichier, tout part vers la file du parent."""
+    level = getattr(logging, str((cfg or {}).get("level", "INFO")).upper(), logging.INFO)
+    logger = logging.getLogger()
+    for h in logger.handlers[:]:
+        logger.removeHandler(h)
+    logger.setLevel(level)
+    logger.addHandler(QueueHandler(q))
+
+
+def _stop_listener():
+    global _LISTENER
+    if _LISTENER is None:
+        return
+    for h in logging.getLogger().handlers:
+        if isinstance(h, RateLimitedQueueHandler):
+            h.flush_repeats()
+    _LISTENER.stop()
+    for h in _LISTENER.handlers:
+        h.close()
+    _LISTENER = None
+
+
+atexit.register(_stop_listener)
+
 
 def setup_logging(cfg: dict | None):
-    """Configure le logging global avec console + fichiers séparés."""
+    """
+    Configure le logging global avec console + fichiers séparés (rotation par taille).
+    Les handlers tournent dans un thread d'écoute (QueueListener) : les threads GUI et
+    d'inférence ne font jamais d'E/S disque ; les erreurs répétées sont dédupliquées.
+    """
     if not cfg:
         logging.basicConfig(level=logging.INFO)
         return
@@ -10,21 +147,29 @@ def setup_logging(cfg: dict | None):
     fmt = cfg.get("format", "[%(levelname)s] %(asctime)s - %(name)s - %(message)s")
     level = getattr(logging, cfg.get("level", "INFO").upper(), logging.INFO)
     handlers_cfg = cfg.get("handlers", {})
+    rotation = cfg.get("rotation", {}) or {}
+    max_bytes = int(float(rotation.get("max_mb", 10)) * 1024 * 1024)
+    backups = int(rotation.get("backups", 5))
+    dedup = cfg.get("dedup", {}) or {}
 
     logger = logging.getLogger()
     logger.setLevel(level)
 
+    # reconfiguration (changement de settings) : on vide d'abord la file de l'ancien listener
+    _stop_listener()
     for h in logger.handlers[:]:
         logger.removeHandler(h)
+        h.close()
 
     formatter = logging.Formatter(fmt)
+    handlers = []
 
     # --- Console ---
     if handlers_cfg.get("console", True):
         ch = logging.StreamHandler()
         ch.setLevel(level)
         ch.setFormatter(formatter)
-        logger.addHandler(ch)
+        handlers.append(ch)
 
     # --- Fichier général ---
     file_path = handlers_cfg.get("file")
@@ -33,15 +178,21 @@ def setup_logging(cfg: dict | None):
         if log_dir:
             os.makedirs(log_dir, exist_ok=True)
 
-        fh = logging.FileHandler(file_path, encoding="utf-8")
+        fh = RotatingFileHandler(file_path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
         fh.setLevel(level)
         fh.setFormatter(formatter)
-        logger.addHandler(fh)
+        handlers.append(fh)
 
         err_path = os.path.join(log_dir, "erreurs.log")
-        eh = logging.FileHandler(err_path, encoding="utf-8")
+        eh = RotatingFileHandler(err_path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
         eh.setLevel(logging.ERROR)
         eh.setFormatter(formatter)
-        logger.addHandler(eh)
-
+        handlers.append(eh)
 
+    global _LISTENER
+    q = queue.SimpleQueue()
+    qh = RateLimitedQueueHandler(q, window_s=dedup.get("window_s", 20.0), burst=dedup.get("burst", 3))
+    qh.setLevel(level)
+    logger.addHandler(qh)
+    _LISTENER = QueueListener(q, *handlers, respect_handler_level=True)
+    _LISTENER.start()
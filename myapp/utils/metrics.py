@@ -0,0 +1,214 @@
+from __future__ import annotations
+import logging, os, threading, time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Étages standards de la chaîne (ordre d'affichage)
+STAGES = ("capture", "preprocess", "inference", "postprocess", "draw", "display", "end_to_end")
+
+
+class RingBuffer:
+    """
+    Anneau préalloué des derniers échantillons. Sans verrou : chaque anneau n'a qu'un
+    seul écrivain (un thread par étage) ; les lecteurs prennent un instantané approximatif.
+    """
+    def __init__(self, size: int = 512):
+        self._data = np.zeros(int(size), np.float64)
+        self._n = 0  # nb total d'écritures
+
+    def push(self, value: float):
+        self._data[self._n % self._data.shape[0]] = value
+        self._n += 1
+
+    @property
+    def count(self) -> int:
+        return self._n
+
+    def values(self) -> np.ndarray:
+        n = min(self._n, self._data.shape[0])
+        return self._data[:n].copy()
+
+    def since(self, count: int) -> np.ndarray:
+        """Échantillons écrits après la position `count` (au plus la taille de l'anneau)."""
+        size = self._data.shape[0]
+        k = min(self._n - count, size)
+        if k <= 0:
+            return np.zeros(0, np.float64)
+        idx = np.arange(self._n - k, self._n) % size
+        return self._data[idx]
+
+    def last(self) -> float | None:
+        return float(self._data[(self._n - 1) % self._data.shape[0]]) if self._n else None
+
+
+class Metrics:
+    """Latences par étage (secondes), compteurs, jauges et cadences (ticks horodatés)."""
+    def __init__(self, size: int = 512):
+        self.size = size
+        self._lock = threading.Lock()  # uniquement pour créer les séries
+        self._latency: dict[str, RingBuffer] = {}
+        self._ticks: dict[str, RingBuffer] = {}
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, float] = {}
+
+    def _series(self, table: dict, name: str) -> RingBuffer:
+        rb = table.get(name)
+        if rb is None:
+            with self._lock:
+                rb = table.setdefault(name, RingBuffer(self.size))
+        return rb
+
+    def observe(self, stage: str, seconds: float):
+        self._series(self._latency, stage).push(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - t0)
+
+    def tick(self, name: str):
+        self._series(self._ticks, name).push(time.monotonic())
+
+    def inc(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def series(self, stage: str) -> RingBuffer | None:
+        return self._latency.get(stage)
+
+    def rate(self, name: str) -> float:
+        """Cadence (Hz) sur la fenêtre des derniers ticks."""
+        rb = self._ticks.get(name)
+        if rb is None:
+            return 0.0
+        ts = rb.values()
+        if ts.shape[0] < 2:
+            return 0.0
+        span = ts.max() - ts.min()
+        return (ts.shape[0] - 1) / span if span > 0 else 0.0
+
+    def percentiles(self, stage: str, qs=(50, 95, 99)) -> dict | None:
+        rb = self._latency.get(stage)
+        if rb is None or rb.count == 0:
+            return None
+        vals = rb.values()
+        return dict(zip(qs, np.percentile(vals, qs).tolist())) | {"count": rb.count}
+
+    def stages(self) -> list[str]:
+        known = [s for s in STAGES if s in self._latency]
+        return known + sorted(s for s in self._latency if s not in STAGES)
+
+    def hud_lines(self) -> list[str]:
+        lines = [f"FPS affichage {self.rate('display'):5.1f}   inférence {self.rate('inference'):5.1f}"]
+        for stage in self.stages():
+            p = self.percentiles(stage)
+            if p:
+                lines.append(f"{stage:<12} p50 {p[50]*1000:6.1f}  p95 {p[95]*1000:6.1f}  p99 {p[99]*1000:6.1f} ms")
+        dropped = {k: int(v) for k, v in self.gauges.items() if k.endswith("dropped")}
+        if dropped:
+            lines.append("perdues: " + "  ".join(f"{k.replace('_dropped', '')}={v}" for k, v in dropped.items()))
+        return lines
+
+    def prometheus_text(self, prefix: str = "myapp") -> str:
+        out = [f"# TYPE {prefix}_stage_latency_seconds summary"]
+        for stage in self.stages():
+            p = self.percentiles(stage)
+            if not p:
+                continue
+            for q in (50, 95, 99):
+                out.append(f'{prefix}_stage_latency_seconds{{stage="{stage}",quantile="{q/100:g}"}} {p[q]:.6f}')
+            out.append(f'{prefix}_stage_latency_seconds_count{{stage="{stage}"}} {p["count"]}')
+        out.append(f"# TYPE {prefix}_rate_hz gauge")
+        for name in sorted(self._ticks):
+            out.append(f'{prefix}_rate_hz{{name="{name}"}} {self.rate(name):.3f}')
+        for name, v in sorted(self.counters.items()):
+            out.append(f"# TYPE {prefix}_{name}_total counter")
+            out.append(f"{prefix}_{name}_total {v}")
+        for name, v in sorted(self.gauges.items()):
+            out.append(f"# TYPE {prefix}_{name} gauge")
+            out.append(f"{prefix}_{name} {v}")
+        return "\n".join(out) + "\n"
+
+
+_METRICS = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _METRICS
+
+
+class MetricsExporter:
+    """
+    Export périodique au format texte Prometheus : fichier (écriture atomique) et/ou
+    endpoint HTTP local (127.0.0.1:<port>/metrics).
+    """
+    def __init__(self, metrics: Metrics, file: str | None = None, http_port: int | None = None,
+                 interval_s: float = 5.0):
+        self.log = logging.getLogger("myapp.metrics")
+        self.metrics = metrics
+        self.file = file
+        self.http_port = http_port
+        self.interval_s = max(0.5, float(interval_s))
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._server: ThreadingHTTPServer | None = None
+
+    def start(self):
+        if self.file:
+            self._thread = threading.Thread(target=self._file_loop, name="metrics-file", daemon=True)
+            self._thread.start()
+        if self.http_port:
+            metrics = self.metrics
+
+            class _Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    body = metrics.prometheus_text().encode("utf-8")
+                    self.send_response(200 if self.path in ("/", "/metrics") else 404)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer(("127.0.0.1", int(self.http_port)), _Handler)
+            threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+            self.log.info("Métriques exposées sur http://127.0.0.1:%s/metrics", self.http_port)
+        return self
+
+    def _file_loop(self):
+        d = os.path.dirname(self.file)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        while not self._stop.wait(self.interval_s):
+            try:
+                tmp = self.file + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(self.metrics.prometheus_text())
+                os.replace(tmp, self.file)
+            except Exception:
+                self.log.exception("Écriture métriques %s", self.file)
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def start_exporter(cfg: dict | None) -> MetricsExporter | None:
+    """Démarre l'export selon la section `metrics` des settings (None si rien à exporter)."""
+    cfg = cfg or {}
+    if not cfg.get("file") and not cfg.get("http_port"):
+        return None
+    return MetricsExporter(get_metrics(), cfg.get("file"), cfg.get("http_port"),
+                           cfg.get("interval_s", 5.0)).start()
@@ -1,7 +1,9 @@
 from __future__ import annotations
 import importlib, logging
+from functools import lru_cache
 from typing import Any, List
 
+@lru_cache(maxsize=None)
 def _resolve(path: str):
     mod_name, cls_name = path.rsplit(".", 1)
     mod = importlib.import_module(mod_name)
@@ -15,18 +17,34 @@ def _engine_kwargs(module_cfg: dict, settings: dict) -> dict:
     kwargs.update(eng_cfg)
     return kwargs
 
+class ModuleSpec:
+    """Entrée activée de processing.modules ; la classe n'est importée qu'à la création."""
+    def __init__(self, module_cfg: dict, settings: dict):
+        self.name = module_cfg.get("name")
+        self.class_path = module_cfg["class"]
+        self.settings = settings
+        self.kwargs = _engine_kwargs(module_cfg, settings)
+
+    @property
+    def cls(self):
+        return _resolve(self.class_path)
+
+    def create(self):
+        return self.cls(name=self.name, config=self.settings, **self.kwargs)
+
+def module_specs(settings: dict) -> List[ModuleSpec]:
+    """Modules activés, sans aucun import (ex: lister les modules au démarrage)."""
+    modules_cfg = settings.get("processing", {}).get("modules", [])
+    return [ModuleSpec(m, settings) for m in modules_cfg if m.get("enabled", False)]
+
 def load_modules(settings: dict) -> List[Any]:
     log = logging.getLogger("myapp.plugins")
-    modules_cfg = settings.get("processing", {}).get("modules", [])
     instances = []
-    for m in modules_cfg:
-        if not m.get("enabled", False): continue
-        cls = _resolve(m["class"])
-        kwargs = _engine_kwargs(m, settings)
+    for spec in module_specs(settings):
         try:
-            inst = cls(name=m.get("name"), config=settings, **kwargs)
+            inst = spec.create()
             instances.append(inst)
-            log.info("Module chargé: %s", m.get("name", cls.__name__))
+            log.info("Module chargé: %s", spec.name or spec.cls.__name__)
         except Exception:
-            log.exception("Échec chargement module %s", m["class"])
+            log.exception("Échec chargement module %s", spec.class_path)
     return instances
@@ -0,0 +1,69 @@
+from __future__ import annotations
+import logging, sys, time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    Chronologie du démarrage : phases synchrones (durée) et jalons asynchrones
+    (caméra prête, première image, modèle prêt...) datés depuis le lancement.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = bool(enabled)
+        self.t0 = time.perf_counter()
+        self.phases: list[tuple[str, float]] = []
+        self.marks: list[tuple[str, float]] = []
+        self.reported = False
+
+    @contextmanager
+    def phase(self, name: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - t))
+
+    def mark(self, name: str):
+        """Jalon (une seule fois par nom) ; affiché immédiatement si le rapport est déjà sorti."""
+        if any(n == name for n, _ in self.marks):
+            return
+        at = time.perf_counter() - self.t0
+        self.marks.append((name, at))
+        if self.enabled and self.reported:
+            self._emit([f"  +{at * 1000:8.1f} ms  {name}"])
+
+    def report_lines(self) -> list[str]:
+        lines = ["Démarrage — phases :"]
+        for name, dt in self.phases:
+            lines.append(f"  {dt * 1000:9.1f} ms  {name}")
+        lines.append(f"  {sum(dt for _, dt in self.phases) * 1000:9.1f} ms  total synchrone")
+        if self.marks:
+            lines.append("Jalons (depuis le lancement) :")
+            lines += [f"  +{at * 1000:8.1f} ms  {name}" for name, at in self.marks]
+        return lines
+
+    def report(self):
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        self._emit(self.report_lines())
+
+    @staticmethod
+    def _emit(lines: list[str]):
+        text = "\n".join(lines)
+        print(text, file=sys.stderr, flush=True)
+        logging.getLogger("myapp.startup").info("\n%s", text)
+
+
+_PROFILER = StartupProfiler()
+
+
+def get_profiler() -> StartupProfiler:
+    return _PROFILER
+
+
+def start_profiler(enabled: bool) -> StartupProfiler:
+    """Réinitialise la chronologie (appelé au tout début de main)."""
+    global _PROFILER
+    _PROFILER = StartupProfiler(enabled)
+    return _PROFILER
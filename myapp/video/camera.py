@@ -1,8 +1,86 @@
 from __future__ import annotations
-import cv2, logging
+import cv2, logging, threading, time
+from collections import deque
 
-class Camera:
-    def __init__(self, index=0, resolution=(1280,720), fps=30):
+import numpy as np
+
+from myapp.video.sources import FrameSource
+
+
+def fourcc_str(value) -> str:
+    """Code FOURCC entier (CAP_PROP_FOURCC) -> chaîne lisible, ex. 'MJPG'."""
+    v = int(value)
+    return "".join(chr((v >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00") or "?"
+
+
+def measure_capture(cap, n_frames: int = 30, warmup: int = 5) -> dict:
+    """Lit n_frames images : cadence réellement délivrée et latence de read() (ms)."""
+    for _ in range(warmup):
+        cap.read()
+    lat = []
+    t_start = time.perf_counter()
+    for _ in range(int(n_frames)):
+        t0 = time.perf_counter()
+        ok, _ = cap.read()
+        if ok:
+            lat.append(time.perf_counter() - t0)
+    span = time.perf_counter() - t_start
+    if not lat:
+        return {"fps": 0.0, "read_ms_p50": None, "read_ms_p95": None, "frames": 0}
+    p50, p95 = np.percentile(np.asarray(lat) * 1000.0, (50, 95)).tolist()
+    return {"fps": round(len(lat) / span, 2), "read_ms_p50": round(p50, 2),
+            "read_ms_p95": round(p95, 2), "frames": len(lat)}
+
+
+class FrameBuffer:
+    """
+    Petit anneau borné des dernières images capturées (seq, timestamp, frame).
+    Les images les plus anciennes sont écrasées : on ne garde que les plus fraîches.
+    """
+    def __init__(self, size: int = 1):
+        self._frames = deque(maxlen=max(1, int(size)))
+        self._cond = threading.Condition()
+        self.seq = 0
+
+    def put(self, frame, ts: float) -> int:
+        with self._cond:
+            self.seq += 1
+            self._frames.append((self.seq, ts, frame))
+            self._cond.notify_all()
+            return self.seq
+
+    def latest(self):
+        """Retourne (seq, ts, frame) de l'image la plus récente, ou None."""
+        with self._cond:
+            return self._frames[-1] if self._frames else None
+
+    def wait_newer(self, seq: int, timeout: float | None = None):
+        """Attend une image de numéro > seq ; retourne (seq, ts, frame) ou None au timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.seq > seq, timeout):
+                return None
+            return self._frames[-1]
+
+    def snapshot(self) -> list:
+        with self._cond:
+            return list(self._frames)
+
+
+class Camera(FrameSource):
+    """
+    Capture webcam via OpenCV (FrameSource temps réel).
+    - threaded=False : get_frame() appelle cap.read() (bloquant) à chaque appel.
+    - threaded=True  : un thread lecteur possède la capture et remplit un FrameBuffer ;
+      get_frame() retourne instantanément la dernière image non encore consommée.
+    Profil de capture : fourcc ("MJPG" débloque souvent 30+ fps en 720p sur USB, "YUYV" est
+    non compressé), driver_buffer (file interne du driver), conversion en niveaux de gris et
+    réduction (scale < 1) appliquées dès la capture. Le profil réellement obtenu est relu et
+    journalisé ; measure_frames > 0 mesure aussi la cadence et la latence de lecture à l'ouverture.
+    """
+    def __init__(self, index=0, resolution=(1280,720), fps=30, threaded: bool = False, buffer_size: int = 1,
+                 fourcc: str | None = None, driver_buffer: int | None = None, grayscale: bool = False,
+                 scale: float = 1.0, measure_frames: int = 0):
+        super().__init__(fps=fps, realtime=True)
         self.log = logging.getLogger("myapp.camera")
         self.index = index
         self.cap = cv2.VideoCapture(index, cv2.CAP_DSHOW) if hasattr(cv2, "CAP_DSHOW") else cv2.VideoCapture(index)
@@ -10,16 +88,131 @@ class Camera:
             self.log.error("Impossible d'ouvrir la caméra %s", index)
             raise RuntimeError(f"Impossible d'ouvrir la caméra {index}")
         w,h = resolution
+        if fourcc:
+            # avant la résolution : certains drivers n'exposent les grands modes qu'en MJPG
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*str(fourcc)[:4].ljust(4)))
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
         self.cap.set(cv2.CAP_PROP_FPS, fps)
-        self.log.info("Caméra ouverte index=%s res=%sx%s fps=%s", index, w, h, fps)
+        if driver_buffer is None and threaded:
+            driver_buffer = 1  # le thread lecteur vide déjà la file : on la réduit au minimum
+        if driver_buffer is not None:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, int(driver_buffer))
+        self.grayscale = bool(grayscale)
+        self.scale = float(scale or 1.0)
+        self.profile = self.read_profile()
+        self.log.info("Caméra ouverte index=%s demandé %sx%s@%s %s -> obtenu %sx%s@%.1f %s (buffer=%s, gris=%s, scale=%.2f)",
+                      index, w, h, fps, fourcc or "défaut", self.profile["width"], self.profile["height"],
+                      self.profile["fps"], self.profile["fourcc"], self.profile["buffer"], self.grayscale, self.scale)
+        if (self.profile["width"], self.profile["height"]) != (int(w), int(h)):
+            self.log.warning("Résolution %sx%s non supportée par la caméra %s", w, h, index)
+        if fourcc and self.profile["fourcc"] != str(fourcc)[:4]:
+            self.log.warning("FOURCC %s refusé par la caméra %s (%s utilisé)", fourcc, index, self.profile["fourcc"])
+        self.measured = None
+        if measure_frames:
+            self.measured = measure_capture(self.cap, measure_frames)
+            self.log.info("Capture mesurée: %.1f fps, read p50 %s ms p95 %s ms",
+                          self.measured["fps"], self.measured["read_ms_p50"], self.measured["read_ms_p95"])
+
+        self.threaded = bool(threaded)
+        self.buffer = FrameBuffer(buffer_size)
+        # self.dropped : images capturées mais jamais consommées
+        self._stop = threading.Event()
+        self._pending_fps: float | None = None
+        self._thread: threading.Thread | None = None
+        if self.threaded:
+            self._thread = threading.Thread(target=self._reader, name=f"camera-{index}", daemon=True)
+            self._thread.start()
+            self.log.info("Capture threadée activée (buffer=%s)", buffer_size)
+
+    def read_profile(self) -> dict:
+        """Mode effectivement négocié avec le driver."""
+        return {
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": float(self.cap.get(cv2.CAP_PROP_FPS)),
+            "fourcc": fourcc_str(self.cap.get(cv2.CAP_PROP_FOURCC)),
+            "buffer": int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+        }
+
+    def set_fps(self, fps: float):
+        """Demande la nouvelle cadence au driver sans rouvrir la capture."""
+        super().set_fps(fps)
+        if self.threaded:
+            self._pending_fps = self.fps  # appliqué par le thread lecteur (VideoCapture non thread-safe)
+        else:
+            self._apply_fps(self.fps)
+
+    def _apply_fps(self, fps: float):
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.log.info("Caméra %s : fps demandé %s, obtenu %.1f", self.index, fps, self.cap.get(cv2.CAP_PROP_FPS))
+
+    def _convert(self, frame):
+        if self.scale < 1.0:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        if self.grayscale and frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return frame
+
+    def _reader(self):
+        try:
+            while not self._stop.is_set():
+                if self._pending_fps is not None:
+                    fps, self._pending_fps = self._pending_fps, None
+                    self._apply_fps(fps)
+                ok, frame = self.cap.read()
+                if not ok:
+                    # Pas d'image (driver en pause / débranchement) : on évite de boucler à vide
+                    time.sleep(0.005)
+                    continue
+                self.buffer.put(self._convert(frame), time.monotonic())
+        finally:
+            # le lecteur possède la capture : il la libère lui-même, même sorti tard d'un read() bloqué
+            self._release_cap()
 
     def get_frame(self):
-        ok, frame = self.cap.read()
-        return frame if ok else None
+        if not self.threaded:
+            ok, frame = self.cap.read()
+            if not ok:
+                return None
+            self.last_seq += 1
+            self.last_ts = time.monotonic()
+            return self._convert(frame)
+        item = self.buffer.latest()
+        if item is None or item[0] == self.last_seq:
+            return None  # pas de nouvelle image depuis le dernier appel
+        self._consume(item)
+        return item[2]
+
+    def read_latest(self, timeout: float | None = None):
+        """Mode threadé : attend une image plus récente que la dernière lue ; retourne (seq, ts, frame) ou None."""
+        if not self.threaded:
+            frame = self.get_frame()
+            return None if frame is None else (self.last_seq, self.last_ts, frame)
+        item = self.buffer.wait_newer(self.last_seq, timeout)
+        if item is not None:
+            self._consume(item)
+        return item
+
+    def _consume(self, item):
+        seq, ts, _ = item
+        if self.last_seq and seq > self.last_seq + 1:
+            self.dropped += seq - self.last_seq - 1
+        self.last_seq, self.last_ts = seq, ts
 
     def release(self):
-        if self.cap:
-            self.cap.release()
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=1.0)
+            if self._thread.is_alive():
+                self.log.warning("Caméra %s : lecture bloquée dans le driver, libération à la sortie du lecteur",
+                                 self.index)
+            self._thread = None
+            return
+        self._release_cap()
+
+    def _release_cap(self):
+        cap, self.cap = self.cap, None
+        if cap is not None:
+            cap.release()
             self.log.info("Caméra libérée.")
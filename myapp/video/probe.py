@@ -0,0 +1,74 @@
+from __future__ import annotations
+import argparse, json, logging
+
+import cv2
+
+from myapp.video.camera import fourcc_str, measure_capture
+
+# Modes essayés par défaut (largeur, hauteur, fps)
+DEFAULT_MODES = (
+    (640, 480, 30), (1280, 720, 30), (1280, 720, 60),
+    (1920, 1080, 30), (1920, 1080, 60), (3840, 2160, 30),
+)
+
+
+def probe_modes(index: int = 0, modes=DEFAULT_MODES, fourccs=("MJPG", "YUYV"), n_frames: int = 30) -> list[dict]:
+    """
+    Essaie chaque combinaison FOURCC x mode sur une capture fraîche ; relit le mode obtenu
+    et mesure la cadence réelle et la latence de lecture. `supported` = mode obtenu == demandé.
+    """
+    log = logging.getLogger("myapp.camera.probe")
+    out = []
+    for fcc in fourccs:
+        for w, h, fps in modes:
+            cap = cv2.VideoCapture(index, cv2.CAP_DSHOW) if hasattr(cv2, "CAP_DSHOW") else cv2.VideoCapture(index)
+            if not cap.isOpened():
+                log.error("Impossible d'ouvrir la caméra %s", index)
+                return out
+            try:
+                cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fcc))
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+                cap.set(cv2.CAP_PROP_FPS, fps)
+                got = {
+                    "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                    "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                    "fps": float(cap.get(cv2.CAP_PROP_FPS)),
+                    "fourcc": fourcc_str(cap.get(cv2.CAP_PROP_FOURCC)),
+                }
+                row = {"requested": {"width": w, "height": h, "fps": fps, "fourcc": fcc}, "actual": got,
+                       "supported": (got["width"], got["height"], got["fourcc"]) == (w, h, fcc)}
+                row["measured"] = measure_capture(cap, n_frames) if row["supported"] else None
+            finally:
+                cap.release()
+            log.info("%s %sx%s@%s -> %sx%s@%.1f %s %s", fcc, w, h, fps, got["width"], got["height"],
+                     got["fps"], got["fourcc"], row["measured"] or "(non supporté)")
+            out.append(row)
+    return out
+
+
+def _cell(v) -> str:
+    """Valeur de tableau ; None (mode négocié mais aucune image reçue) -> "-"."""
+    return "-" if v is None else str(v)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="myapp probe", description="Liste les modes caméra et mesure leur débit réel.")
+    ap.add_argument("--index", type=int, default=0)
+    ap.add_argument("--frames", type=int, default=30, help="images lues par mode pour la mesure")
+    ap.add_argument("--fourcc", nargs="+", default=["MJPG", "YUYV"])
+    ap.add_argument("--json", help="écrit aussi le résultat complet dans ce fichier")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    rows = probe_modes(args.index, fourccs=args.fourcc, n_frames=args.frames)
+    print(f"{'fourcc':<6} {'demandé':>16} {'obtenu':>18} {'fps mesuré':>10} {'read p50':>9} {'read p95':>9}")
+    for r in rows:
+        q, a, m = r["requested"], r["actual"], r["measured"] or {}
+        print(f"{q['fourcc']:<6} {q['width']:>5}x{q['height']:<5}@{q['fps']:<4} "
+              f"{a['width']:>5}x{a['height']:<5}@{a['fps']:<5.1f} {a['fourcc']:<4} "
+              f"{_cell(m.get('fps')):>10} {_cell(m.get('read_ms_p50')):>9} {_cell(m.get('read_ms_p95')):>9}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return 0 if rows else 1
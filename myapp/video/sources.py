@@ -0,0 +1,321 @@
+from __future__ import annotations
+import argparse, logging, struct, time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+RAW_EXT = ".myraw"
+
+
+class FrameSource:
+    """
+    Source d'images commune (caméra, vidéo, dossier, synthétique, replay brut).
+    - get_frame() : nouvelle image, ou None si rien de neuf (ou fin : `eof` passe à True) ;
+    - read_latest(timeout) : (seq, ts, frame) ou None, comme Camera ;
+    - itération : (index, frame) jusqu'à la fin ou `max_frames`.
+    realtime=True cadence la lecture à `fps` ; sinon aussi vite que possible (batch, benchmarks).
+    """
+    def __init__(self, fps: float = 30.0, realtime: bool = False, loop: bool = False,
+                 max_frames: int | None = None):
+        self.log = logging.getLogger("myapp.source")
+        self.fps = float(fps) if fps and fps > 0 else 30.0
+        self.realtime = bool(realtime)
+        self.loop = bool(loop)
+        self.max_frames = int(max_frames) if max_frames else None
+        self.last_seq = 0
+        self.last_ts = 0.0
+        self.dropped = 0
+        self.eof = False
+        self._next_due = 0.0
+
+    # --- à fournir par les sources fichier ---
+    def _read(self):
+        """Image suivante, ou None en fin de source."""
+        raise NotImplementedError
+
+    def _rewind(self) -> bool:
+        """Retour au début (loop) ; False si impossible."""
+        return False
+
+    # --- API commune ---
+    def get_frame(self):
+        if self.eof:
+            return None
+        if self.realtime:
+            now = time.monotonic()
+            if now < self._next_due:
+                return None
+            period = 1.0 / self.fps
+            # en retard de plus d'une période : on repart de maintenant plutôt que de rattraper en rafale
+            self._next_due = self._next_due + period if now - self._next_due < period else now + period
+        frame = self._read()
+        if frame is None and self.loop and self._rewind():
+            frame = self._read()
+        if frame is None:
+            self.eof = True
+            return None
+        self.last_seq += 1
+        self.last_ts = time.monotonic()
+        return frame
+
+    def set_fps(self, fps: float):
+        """Nouvelle cadence à chaud (sources temps réel)."""
+        self.fps = float(fps) if fps and fps > 0 else self.fps
+
+    def read_latest(self, timeout: float | None = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            frame = self.get_frame()
+            if frame is not None:
+                return self.last_seq, self.last_ts, frame
+            if self.eof or (deadline is not None and time.monotonic() >= deadline):
+                return None
+            time.sleep(max(0.0, min(0.002, self._next_due - time.monotonic())))
+
+    def __iter__(self):
+        i = 0
+        while self.max_frames is None or i < self.max_frames:
+            frame = self.get_frame()
+            if frame is None:
+                if self.eof:
+                    return
+                time.sleep(0.001)  # source temps réel : pas encore d'image
+                continue
+            yield i, frame
+            i += 1
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class VideoFileSource(FrameSource):
+    """Fichier vidéo décodé par OpenCV ; fps lu dans le conteneur."""
+    def __init__(self, path, loop: bool = False, realtime: bool = False, fps: float | None = None, **kwargs):
+        self.path = Path(path)
+        self.cap = cv2.VideoCapture(str(self.path))
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Impossible d'ouvrir {self.path}")
+        super().__init__(fps=fps or self.cap.get(cv2.CAP_PROP_FPS), realtime=realtime, loop=loop, **kwargs)
+
+    def _read(self):
+        ok, frame = self.cap.read()
+        return frame if ok else None
+
+    def _rewind(self) -> bool:
+        return bool(self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0))
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageDirSource(FrameSource):
+    """Dossier d'images, ordre alphabétique ; les fichiers illisibles sont ignorés."""
+    def __init__(self, path, fps: float = 30.0, loop: bool = False, realtime: bool = False, **kwargs):
+        super().__init__(fps=fps, realtime=realtime, loop=loop, **kwargs)
+        self.path = Path(path)
+        self.files = sorted(p for p in self.path.iterdir() if p.suffix.lower() in IMAGE_EXTS)
+        self._i = 0
+
+    def _read(self):
+        while self._i < len(self.files):
+            f = self.files[self._i]
+            self._i += 1
+            frame = cv2.imread(str(f), cv2.IMREAD_COLOR)
+            if frame is not None:
+                return frame
+            self.log.warning("Image illisible ignorée: %s", f)
+        return None
+
+    def _rewind(self) -> bool:
+        self._i = 0
+        return bool(self.files)
+
+
+class SyntheticSource(FrameSource):
+    """Générateur déterministe (bruit fixe + carré mobile) : un nouveau buffer par image, comme cap.read()."""
+    def __init__(self, resolution=(1280, 720), fps: float = 30.0, seed: int = 0, realtime: bool = False, **kwargs):
+        super().__init__(fps=fps, realtime=realtime, **kwargs)
+        w, h = resolution
+        rng = np.random.default_rng(seed)
+        self._base = rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+        self._i = 0
+
+    def _read(self):
+        self._i += 1
+        frame = self._base.copy()
+        h, w = frame.shape[:2]
+        s = max(8, h // 6)
+        x = (self._i * 7) % max(1, w - s)
+        frame[h // 3:h // 3 + s, x:x + s] = (40, 180, 220)
+        return frame
+
+
+# --- Format brut mappé en mémoire ---
+# En-tête 64 octets : magic, hauteur, largeur, canaux, dtype numpy, fps ; puis les frames à la suite.
+_RAW_MAGIC = b"MYRAW\x00\x01\x00"
+_RAW_HEADER = struct.Struct("<8sIII8sd")
+_RAW_HEADER_SIZE = 64
+
+
+class RawWriter:
+    """Écrit des frames de forme fixe au format brut ; ajout possible à l'infini, nb de frames = taille fichier."""
+    def __init__(self, path, fps: float = 30.0):
+        self.path = Path(path)
+        self.fps = float(fps)
+        self.shape = None
+        self.count = 0
+        self._f = None
+
+    def write(self, frame):
+        shape = frame.shape if frame.ndim == 3 else frame.shape + (1,)  # gris -> 1 canal
+        if self._f is None:
+            self.shape = shape
+            self.dtype = frame.dtype
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._f = open(self.path, "wb")
+            header = _RAW_HEADER.pack(_RAW_MAGIC, *self.shape, frame.dtype.str.encode().ljust(8, b"\x00"), self.fps)
+            self._f.write(header.ljust(_RAW_HEADER_SIZE, b"\x00"))
+        elif shape != self.shape or frame.dtype != self.dtype:  # canaux compris : sinon fichier corrompu
+            raise ValueError(f"Frame {frame.shape} {frame.dtype} incompatible avec l'enregistrement {self.shape}")
+        self._f.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+        self.count += 1
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+class RawReplaySource(FrameSource):
+    """
+    Rejoue un enregistrement brut via np.memmap : ni décodage ni copie disque -> mémoire
+    au-delà du cache de pages. Chaque get_frame() rend une copie modifiable (dessin en place).
+    """
+    def __init__(self, path, loop: bool = False, realtime: bool = False, fps: float | None = None, **kwargs):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            magic, h, w, c, dtype, rec_fps = _RAW_HEADER.unpack(f.read(_RAW_HEADER.size))
+        if magic != _RAW_MAGIC:
+            raise RuntimeError(f"{self.path} n'est pas un enregistrement {RAW_EXT}")
+        super().__init__(fps=fps or rec_fps, realtime=realtime, loop=loop, **kwargs)
+        dt = np.dtype(dtype.rstrip(b"\x00").decode())
+        frame_bytes = h * w * c * dt.itemsize
+        n = (self.path.stat().st_size - _RAW_HEADER_SIZE) // frame_bytes
+        self.frames = np.memmap(self.path, dtype=dt, mode="r", offset=_RAW_HEADER_SIZE, shape=(n, h, w, c))
+        self._squeeze = c == 1
+        self._i = 0
+
+    def __len__(self) -> int:
+        return int(self.frames.shape[0])
+
+    def _read(self):
+        if self._i >= len(self):
+            return None
+        frame = np.array(self.frames[self._i])
+        self._i += 1
+        return frame[..., 0] if self._squeeze else frame
+
+    def _rewind(self) -> bool:
+        self._i = 0
+        return len(self) > 0
+
+    def release(self):
+        self.frames = None
+
+
+def source_config(spec) -> dict:
+    """Config de source depuis un chemin (dossier, .myraw, vidéo) ou un index caméra."""
+    if isinstance(spec, dict):
+        return spec
+    if isinstance(spec, int) or str(spec).isdigit():
+        return {"source": "camera", "index": int(spec)}
+    p = Path(spec)
+    if p.is_dir():
+        return {"source": "images", "path": str(p)}
+    if p.suffix.lower() == RAW_EXT:
+        return {"source": "raw", "path": str(p)}
+    return {"source": "video", "path": str(p)}
+
+
+def open_source(cfg) -> FrameSource:
+    """
+    Ouvre la source décrite par une entrée `camera` de settings.yaml (ou un chemin) :
+    source = camera (défaut) | video | images | synthetic | raw.
+    """
+    cfg = source_config(cfg)
+    kind = cfg.get("source") or "camera"
+    common = {"max_frames": cfg.get("max_frames")}
+    if kind == "camera":
+        from myapp.video.camera import Camera
+        cam = Camera(
+            index=cfg.get("index", 0),
+            resolution=tuple(cfg.get("resolution", (1280, 720))),
+            fps=cfg.get("fps", 30),
+            threaded=bool(cfg.get("threaded", False)),
+            buffer_size=int(cfg.get("buffer_size", 1)),
+            fourcc=cfg.get("fourcc"),
+            driver_buffer=cfg.get("driver_buffer"),
+            grayscale=bool(cfg.get("grayscale", False)),
+            scale=float(cfg.get("scale", 1.0)),
+            measure_frames=int(cfg.get("measure_frames", 0)),
+        )
+        cam.max_frames = common["max_frames"]
+        return cam
+    play = {"loop": bool(cfg.get("loop", False)), "realtime": bool(cfg.get("realtime", False)), **common}
+    if kind == "video":
+        return VideoFileSource(cfg["path"], fps=cfg.get("source_fps"), **play)
+    if kind == "images":
+        return ImageDirSource(cfg["path"], fps=cfg.get("fps", 30), **play)
+    if kind == "raw":
+        return RawReplaySource(cfg["path"], fps=cfg.get("source_fps"), **play)
+    if kind == "synthetic":
+        return SyntheticSource(tuple(cfg.get("resolution", (1280, 720))), fps=cfg.get("fps", 30),
+                               seed=int(cfg.get("seed", 0)), realtime=play["realtime"], **common)
+    raise ValueError(f"Source inconnue: {kind}")
+
+
+def record_raw(source: FrameSource, path, max_frames: int | None = None) -> int:
+    """Enregistre une source au format brut (replay déterministe sans décodage)."""
+    writer = RawWriter(path, source.fps)
+    try:
+        for i, frame in source:
+            if max_frames is not None and i >= max_frames:
+                break
+            writer.write(frame)
+    finally:
+        writer.close()
+    return writer.count
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="myapp record", description=f"Enregistre une source au format brut {RAW_EXT}.")
+    ap.add_argument("input", help="vidéo, dossier d'images, index caméra ou 'synthetic'")
+    ap.add_argument("output", help=f"fichier de sortie ({RAW_EXT})")
+    ap.add_argument("--frames", type=int, default=None, help="nb max de frames (obligatoire pour une caméra)")
+    ap.add_argument("--resolution", default="1280x720", help="résolution du générateur synthétique")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    if args.input == "synthetic":
+        w, h = (int(v) for v in args.resolution.lower().split("x"))
+        cfg = {"source": "synthetic", "resolution": (w, h)}
+    else:
+        cfg = source_config(args.input)
+    if cfg["source"] in ("camera", "synthetic") and not args.frames:
+        ap.error("--frames est requis pour une source sans fin")
+    src = open_source(cfg)
+    try:
+        n = record_raw(src, args.output, args.frames)
+    finally:
+        src.release()
+    logging.getLogger("myapp.source").info("%d frames écrites dans %s", n, args.output)
+    return 0
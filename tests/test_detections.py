@@ -0,0 +1,39 @@
+import numpy as np
+
+from myapp.engines.detections import Detections, nms
+
+
+def _dets(boxes, scores, classes=None, track_ids=None, nkpt=0):
+    boxes = np.asarray(boxes, np.float32).reshape(-1, 4)
+    n = len(boxes)
+    classes = np.zeros(n, np.int32) if classes is None else np.asarray(classes, np.int32)
+    kpts = np.zeros((n, nkpt, 3), np.float32) if nkpt else None
+    ids = None if track_ids is None else np.asarray(track_ids, np.int32)
+    return Detections(boxes, np.asarray(scores, np.float32), classes, kpts, ids)
+
+
+def test_concat_keeps_optional_fields_only_when_all_have_them():
+    a = _dets([[0, 0, 10, 10]], [0.9], track_ids=[1], nkpt=21)
+    b = _dets([[5, 5, 20, 20], [1, 1, 2, 2]], [0.8, 0.7], track_ids=[2, 3], nkpt=21)
+    out = Detections.concat([a, None, Detections.empty(), b])
+    assert len(out) == 3
+    assert out.track_ids.tolist() == [1, 2, 3]
+    assert out.keypoints.shape == (3, 21, 3)
+
+    mixed = Detections.concat([a, _dets([[0, 0, 1, 1]], [0.5])])
+    assert len(mixed) == 2 and mixed.track_ids is None and mixed.keypoints is None
+    assert len(Detections.concat([])) == 0
+
+
+def test_nms_keeps_best_of_overlapping_boxes():
+    dets = _dets([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]], [0.6, 0.9, 0.8], track_ids=[7, 8, 9])
+    out = nms(dets, iou_thres=0.5)
+    assert out.scores.tolist() == [np.float32(0.9), np.float32(0.8)]
+    assert out.track_ids.tolist() == [8, 9]
+
+
+def test_nms_class_aware():
+    boxes = [[0, 0, 10, 10], [0, 0, 10, 10]]
+    dets = _dets(boxes, [0.9, 0.8], classes=[0, 1])
+    assert len(nms(dets, class_aware=True)) == 2
+    assert len(nms(dets, class_aware=False)) == 1
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+from myapp.ui.log_viewer import LogTail  # noqa: E402
+
+
+def test_reads_only_appended_complete_lines(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("a\nb\n")
+    tail = LogTail(str(path))
+    assert tail.read_new() == (["a", "b"], False)
+    with open(path, "a") as f:
+        f.write("c\npartiel")
+    assert tail.read_new() == (["c"], False)
+    with open(path, "a") as f:
+        f.write(" fin\n")
+    assert tail.read_new() == (["partiel fin"], False)
+    assert tail.read_new() == ([], False)
+
+
+def test_initial_read_skips_cut_first_line(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("ligne longue 1\nligne 2\n")
+    tail = LogTail(str(path), initial_bytes=10)
+    assert tail.read_new() == (["ligne 2"], False)
+
+
+def test_rotation_and_truncation_restart_from_start(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("ancien 1\nancien 2\n")
+    tail = LogTail(str(path))
+    tail.read_new()
+    os.replace(path, tmp_path / "app.log.1")  # RotatingFileHandler : renommage puis nouveau fichier
+    path.write_text("nouveau et plus long que l'ancien\n")
+    assert tail.read_new() == (["nouveau et plus long que l'ancien"], True)
+    path.write_text("x\n")  # troncature
+    assert tail.read_new() == (["x"], True)
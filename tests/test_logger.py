@@ -0,0 +1,64 @@
+import logging
+import queue
+
+from myapp.utils.logger import RateLimitedQueueHandler
+
+
+def _record(msg="caméra perdue", level=logging.WARNING, name="myapp.test"):
+    return logging.makeLogRecord({"name": name, "levelno": level, "levelname": logging.getLevelName(level),
+                                  "msg": msg, "args": ()})
+
+
+def _drain(q):
+    out = []
+    while True:
+        try:
+            out.append(q.get_nowait())
+        except queue.Empty:
+            return out
+
+
+def test_repeats_beyond_burst_are_summarized():
+    q = queue.Queue()
+    h = RateLimitedQueueHandler(q, window_s=60.0, burst=2)
+    try:
+        for _ in range(5):
+            h.emit(_record())
+        h.emit(_record("autre message"))
+        assert [r.getMessage() for r in _drain(q)] == ["caméra perdue"] * 2 + ["autre message"]
+        h.flush_repeats()
+        (summary,) = _drain(q)
+        assert summary.levelno == logging.WARNING
+        assert "caméra perdue" in summary.getMessage() and "×3" in summary.getMessage()
+    finally:
+        h.close()
+
+
+def test_info_is_never_rate_limited():
+    q = queue.Queue()
+    h = RateLimitedQueueHandler(q, window_s=60.0, burst=1)
+    try:
+        for _ in range(4):
+            h.emit(_record(level=logging.INFO))
+        assert len(_drain(q)) == 4
+        h.flush_repeats()
+        assert _drain(q) == []
+    finally:
+        h.close()
+
+
+def test_window_expiry_reopens_the_burst(monkeypatch):
+    import myapp.utils.logger as logger_mod
+    now = [1000.0]
+    monkeypatch.setattr(logger_mod.time, "monotonic", lambda: now[0])
+    q = queue.Queue()
+    h = RateLimitedQueueHandler(q, window_s=10.0, burst=1)
+    try:
+        h.emit(_record())
+        h.emit(_record())  # masqué
+        now[0] += 11.0
+        h.emit(_record())  # nouvelle fenêtre : résumé de la précédente puis le record
+        msgs = [r.getMessage() for r in _drain(q)]
+        assert msgs[0] == "caméra perdue" and "×1" in msgs[1] and msgs[2] == "caméra perdue"
+    finally:
+        h.close()
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from myapp.video.sources import RawReplaySource, RawWriter, open_source
+
+
+def _record(path, frames, fps=25.0):
+    w = RawWriter(path, fps=fps)
+    for f in frames:
+        w.write(f)
+    w.close()
+    return w
+
+
+def test_raw_round_trip_color(tmp_path):
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (48, 64, 3), np.uint8) for _ in range(5)]
+    path = tmp_path / "clip.myraw"
+    assert _record(path, frames).count == 5
+
+    src = RawReplaySource(path)
+    assert len(src) == 5 and src.fps == 25.0
+    out = [f for _, f in src]
+    assert len(out) == 5 and src.eof
+    for a, b in zip(frames, out):
+        np.testing.assert_array_equal(a, b)
+    out[0][:] = 0  # copie modifiable : le fichier mappé n'est pas touché
+    np.testing.assert_array_equal(src.frames[0], frames[0])
+
+
+def test_raw_round_trip_gray_keeps_2d_frames(tmp_path):
+    frames = [np.full((32, 40), i * 10, np.uint8) for i in range(3)]
+    path = tmp_path / "gray.myraw"
+    _record(path, frames)
+
+    src = open_source(str(path))
+    assert isinstance(src, RawReplaySource)
+    out = [f for _, f in src]
+    assert [f.shape for f in out] == [(32, 40)] * 3
+    for a, b in zip(frames, out):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_raw_loop_and_max_frames(tmp_path):
+    frames = [np.full((8, 8, 3), i, np.uint8) for i in range(3)]
+    path = tmp_path / "loop.myraw"
+    _record(path, frames)
+    src = RawReplaySource(path, loop=True, max_frames=7)
+    assert [int(f[0, 0, 0]) for _, f in src] == [0, 1, 2, 0, 1, 2, 0]
+
+
+def test_raw_writer_rejects_other_shape_or_channels(tmp_path):
+    w = RawWriter(tmp_path / "bad.myraw")
+    w.write(np.zeros((16, 16, 3), np.uint8))
+    with pytest.raises(ValueError):
+        w.write(np.zeros((16, 16), np.uint8))  # même hauteur/largeur, 1 canal
+    with pytest.raises(ValueError):
+        w.write(np.zeros((16, 16, 3), np.float32))
+    w.close()
+    assert len(RawReplaySource(tmp_path / "bad.myraw")) == 1
+
+
+def test_raw_replay_rejects_foreign_file(tmp_path):
+    path = tmp_path / "not.myraw"
+    path.write_bytes(b"\x00" * 128)
+    with pytest.raises(RuntimeError):
+        RawReplaySource(path)
@@ -0,0 +1,37 @@
+import numpy as np
+
+from myapp.engines.detections import Detections
+from myapp.processing.tiling import merge_tiles, tile_grid
+
+SHAPE = (1080, 1920, 3)
+
+
+def _clip_to_tiles(box, tiles):
+    """Ce que verrait le modèle : la boîte rognée à chaque tuile qu'elle touche (coordonnées tuile)."""
+    out = []
+    for x0, y0, x1, y1 in tiles.tolist():
+        bx0, by0 = max(box[0], x0), max(box[1], y0)
+        bx1, by1 = min(box[2], x1), min(box[3], y1)
+        if bx0 >= bx1 or by0 >= by1:
+            out.append(Detections.empty())
+            continue
+        b = np.array([[bx0 - x0, by0 - y0, bx1 - x0, by1 - y0]], np.float32)
+        out.append(Detections(b, np.array([0.9], np.float32), np.array([0], np.int32)))
+    return out
+
+
+def test_box_wider_than_overlap_spanning_two_tiles_is_kept_whole():
+    tiles = tile_grid(SHAPE, 640, 128)
+    box = [400, 100, 900, 400]  # 500 px de large, à cheval sur deux tuiles
+    dets = merge_tiles(_clip_to_tiles(box, tiles), tiles, SHAPE)
+    assert len(dets) == 1
+    np.testing.assert_allclose(dets.boxes[0], box)
+
+
+def test_cut_copy_dropped_when_another_tile_sees_the_box_whole():
+    tiles = tile_grid(SHAPE, 640, 128)
+    x1 = tiles[0, 2]  # coupée par le bord droit de la 1re tuile, entière dans la 2e
+    box = [x1 - 40, 100, x1 + 60, 200]
+    dets = merge_tiles(_clip_to_tiles(box, tiles), tiles, SHAPE)
+    assert len(dets) == 1
+    np.testing.assert_allclose(dets.boxes[0], box)